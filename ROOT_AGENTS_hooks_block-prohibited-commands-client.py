@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Client for the block-prohibited-commands guard daemon (opt-in).
+
+Run by block-prohibited-commands.sh as `python3 -S <this> <guard.py>` when
+AGENT_GUARD_DAEMON=1, with the hook payload on stdin. It forwards the payload
+to the guard daemon over a unix socket, starting the daemon (`<guard.py>
+--serve SOCKET`, detached) when none is listening, and mirrors its answer:
+exit 0 = allow, exit 2 = block (stderr = reason).
+
+Deliberately tiny (no site, and the C _socket module instead of socket, which
+pulls in enum/selectors): the point is to skip the guard's cold start. Any
+other outcome -- no AF_UNIX/posix_spawn, an unsafe socket directory, a daemon
+that does not answer in time or answers 3 -- exits 3, and the wrapper then
+runs the guard in-process, so the decision and the fail-closed behavior never
+depend on the daemon.
+
+The socket lives in a per-user 0700 directory (${XDG_RUNTIME_DIR:-/tmp}/
+agent-guard-<uid>) and is named after the guard file's mtime and size, so a
+sync that changes the guard starts a fresh daemon; the old one idles out.
+"""
+
+from __future__ import annotations
+
+import _socket
+import os
+import stat
+import sys
+import time
+
+EXIT_FALLBACK = 3
+CONNECT_TIMEOUT_S = 2.0
+REPLY_TIMEOUT_S = 10.0
+
+
+def socket_path(guard: str) -> str | None:
+    """Per-user socket path for this guard file, or None if unsafe."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    directory = os.path.join(base, f"agent-guard-{os.getuid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        return None  # someone else could answer for the guard: do not trust
+    guard_st = os.stat(guard)
+    key = f"{guard_st.st_mtime_ns:x}-{guard_st.st_size:x}"
+    return os.path.join(directory, f"guard-{key}.sock")
+
+
+def _spawn(guard: str, path: str) -> None:
+    devnull = [
+        (os.POSIX_SPAWN_OPEN, fd, os.devnull, flags, 0)
+        for fd, flags in ((0, os.O_RDONLY), (1, os.O_WRONLY), (2, os.O_WRONLY))
+    ]
+    os.posix_spawn(
+        sys.executable,
+        [sys.executable, guard, "--serve", path],
+        os.environ,
+        file_actions=devnull,
+        setsid=True,
+    )
+
+
+def _connect(guard: str, path: str) -> _socket.socket:
+    deadline = time.monotonic() + CONNECT_TIMEOUT_S
+    spawned = False
+    delay = 0.005
+    while True:
+        sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+            return sock
+        except (FileNotFoundError, ConnectionRefusedError):
+            sock.close()
+            if time.monotonic() >= deadline:
+                raise
+            if not spawned:
+                _spawn(guard, path)
+                spawned = True
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 2 or not hasattr(_socket, "AF_UNIX"):
+        return EXIT_FALLBACK
+    if not hasattr(os, "posix_spawn"):
+        return EXIT_FALLBACK
+    payload = sys.stdin.buffer.read()
+    try:
+        path = socket_path(argv[1])
+        if path is None:
+            return EXIT_FALLBACK
+        sock = _connect(argv[1], path)
+        try:
+            sock.settimeout(REPLY_TIMEOUT_S)
+            sock.sendall(payload)
+            sock.shutdown(_socket.SHUT_WR)
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+        finally:
+            sock.close()
+    except OSError:
+        return EXIT_FALLBACK
+    code, sep, message = b"".join(chunks).partition(b"\n")
+    if not sep or code not in (b"0", b"2"):
+        return EXIT_FALLBACK
+    sys.stderr.buffer.write(message)
+    return int(code)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -31,17 +31,31 @@ If tokenization still fails after heredoc separation, tooling guards fall
 back to the previous line-based quote-strip regex scan — never worse than
 the old implementation. Known accepted long tail: quoted invocations
 (bash -c "npm i") and wrapper forms outside the known set (mise exec -- ...).
+
+Daemon mode (opt-in, AGENT_GUARD_DAEMON=1 in the wrapper): `--serve SOCKET`
+keeps the compiled guards in a long-lived process answering payloads over a
+unix socket (one request per connection: payload in, "<exit code>\n<stderr>"
+out) and exits after AGENT_GUARD_IDLE_S seconds without a request. The
+wrapper talks to it through block-prohibited-commands-client.py, which starts
+it on first use; any daemon error makes the wrapper run this file in-process.
 """
 
 from __future__ import annotations
 
 import json
+import os
 import re
 import shlex
 import sys
 
 EXIT_ALLOW = 0
 EXIT_BLOCK = 2
+# Daemon reply for "could not decide": the client makes the wrapper fall back
+# to the in-process guard, so the daemon never answers differently from it.
+EXIT_FALLBACK = 3
+
+IDLE_TIMEOUT_S = 900.0
+REQUEST_TIMEOUT_S = 5.0
 
 MSG_PIP = (
     "Python package management is 'uv' only (uv add / uv sync / uv run). "
@@ -130,9 +144,12 @@ RAW_GUARDS: list[tuple[re.Pattern[str], str]] = [
 ]
 
 
+class Blocked(Exception):
+    """Raised by block(); turned into exit 2 (or the daemon's reply) once."""
+
+
 def block(reason: str) -> None:
-    print(f"BLOCKED: {reason}", file=sys.stderr)
-    sys.exit(EXIT_BLOCK)
+    raise Blocked(reason)
 
 
 def _basename(token: str) -> str:
@@ -318,16 +335,81 @@ def analyze(text: str, depth: int = 0) -> None:
         analyze(body, depth + 1)
 
 
-def main() -> int:
+def decide(raw: bytes) -> tuple[int, str]:
+    """Decide one hook payload: (exit code, stderr text)."""
     try:
-        payload = json.load(sys.stdin)
+        payload = json.loads(raw)
     except (json.JSONDecodeError, UnicodeDecodeError):
-        return EXIT_ALLOW
+        return EXIT_ALLOW, ""
     command = (payload.get("tool_input") or {}).get("command") or ""
     if not isinstance(command, str) or not command.strip():
+        return EXIT_ALLOW, ""
+    try:
+        analyze(command)
+    except Blocked as e:
+        return EXIT_BLOCK, f"BLOCKED: {e}\n"
+    return EXIT_ALLOW, ""
+
+
+def serve(path: str) -> int:
+    """Answer payloads on the unix socket ``path`` until idle.
+
+    The socket directory is created and checked by the client (0700, owned by
+    us). An flock on ``<path>.lock`` keeps racing first-use starts down to
+    one daemon; a loser exits quietly and its client connects to the winner.
+    socket/fcntl are imported here: the in-process path never needs them.
+    """
+    import fcntl
+    import socket
+
+    def _handle(conn: socket.socket) -> None:
+        conn.settimeout(REQUEST_TIMEOUT_S)
+        chunks = []
+        while chunk := conn.recv(65536):
+            chunks.append(chunk)
+        try:
+            code, message = decide(b"".join(chunks))
+        except Exception:  # noqa: BLE001 - the in-process run reports it
+            code, message = EXIT_FALLBACK, ""
+        conn.sendall(f"{code}\n{message}".encode())
+
+    lock = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
         return EXIT_ALLOW
-    analyze(command)
-    return EXIT_ALLOW
+    idle = float(os.environ.get("AGENT_GUARD_IDLE_S") or IDLE_TIMEOUT_S)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        if os.path.exists(path):
+            os.unlink(path)  # left by a daemon that died without cleanup
+        server.bind(path)
+        server.listen(64)
+        server.settimeout(idle)
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                return EXIT_ALLOW
+            with conn:
+                try:
+                    _handle(conn)
+                except OSError:
+                    continue  # client gave up; it falls back on its own
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+        os.close(lock)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) == 2 and args[0] == "--serve":
+        return serve(args[1])
+    code, message = decide(sys.stdin.buffer.read())
+    sys.stderr.write(message)
+    return code
 
 
 if __name__ == "__main__":
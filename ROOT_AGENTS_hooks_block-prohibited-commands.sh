@@ -7,6 +7,10 @@
 # The companion's filename differs between the dotfiles repo root (sync source
 # naming) and a deployed agent home (hooks/), so both are tried.
 #
+# With AGENT_GUARD_DAEMON=1 the payload goes to a long-lived guard daemon via
+# the -client.py companion (started on first use, exits when idle); if the
+# client cannot get an answer (exit 3), the guard runs in-process as usual.
+#
 # Exit-code contract:
 #   exit 0  -> allow
 #   exit 2  -> BLOCK (stderr -> Claude). exit 1 would NOT block.
@@ -17,6 +21,18 @@ for candidate in \
   "$dir/block-prohibited-commands.py" \
   "$dir/ROOT_AGENTS_hooks_block-prohibited-commands.py"; do
   if [ -f "$candidate" ]; then
+    if [ "${AGENT_GUARD_DAEMON:-0}" = 1 ]; then
+      client="${candidate%.py}-client.py"
+      if [ -f "$client" ]; then
+        payload="$(cat)"
+        status=0
+        printf '%s' "$payload" | python3 -S "$client" "$candidate" || status=$?
+        case "$status" in
+          0 | 2) exit "$status" ;;
+        esac
+        exec python3 "$candidate" <<<"$payload"
+      fi
+    fi
     exec python3 "$candidate"
   fi
 done
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Single-process dispatcher for the agent PreToolUse / PostToolUse hooks.
+
+Invoked by the thin dispatch.sh wrapper as `dispatch.sh <event>` with the
+Claude Code hook payload on stdin. The payload is parsed once and every rule
+that applies to the tool runs in this process, replacing one bash + jq
+process chain per registered hook:
+
+    PreToolUse  Bash                 command guard (block-prohibited-commands.py)
+    PreToolUse  Write|Edit|...       file naming (block-prohibited-files.sh)
+                                     secrets (block-secrets.py)
+    PostToolUse Write|Edit           formatting (format-after-edit.sh)
+
+The per-hook scripts stay the reference semantics (and keep working when
+registered on their own): the command guard and the secret scanner are their
+companions, imported; the naming and formatting rules are mirrored. Plugin
+scope hooks are not dispatched here: each plugin ships its own hooks.json.
+
+Exit-code contract: 0 = allow, 2 = block with every blocking rule's reason on
+stderr (one "BLOCKED: ..." line each). PostToolUse never blocks; formatter
+feedback goes to stderr with exit 0. The event comes from the payload's
+hook_event_name, falling back to the wrapper's argument.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import sys
+from collections.abc import Callable
+from types import ModuleType
+
+EXIT_ALLOW = 0
+EXIT_BLOCK = 2
+
+HOOKS_DIR = os.path.dirname(os.path.realpath(__file__))
+# Companions: deployed name (agent home hooks/), then the sync-source name.
+COMMAND_GUARD = "block-prohibited-commands.py"
+SECRET_SCANNER = "block-secrets.py"
+
+WRITE_TOOLS = {"Write", "Edit", "MultiEdit", "NotebookEdit"}
+FORMAT_TOOLS = {"Write", "Edit", "MultiEdit"}
+
+
+@functools.cache
+def _load_companion(name: str) -> ModuleType | None:
+    """Import a hook companion module (its filename has dashes), once."""
+    import importlib.util
+
+    for candidate in (name, f"ROOT_AGENTS_hooks_{name}"):
+        path = os.path.join(HOOKS_DIR, candidate)
+        if os.path.isfile(path):
+            module_name = name[: -len(".py")].replace("-", "_")
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            if spec is None or spec.loader is None:
+                break
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+    return None
+
+
+def _missing(name: str) -> list[str]:
+    return [
+        f"companion {name} not found next to the dispatcher (incomplete "
+        "sync?) — failing closed."
+    ]
+
+
+def check_command(tool_input: dict) -> list[str]:
+    """Bash: the parser-based command guard, run in-process."""
+    command = tool_input.get("command") or ""
+    if not isinstance(command, str) or not command.strip():
+        return []
+    guard = _load_companion(COMMAND_GUARD)
+    if guard is None:
+        return _missing(COMMAND_GUARD)
+    try:
+        guard.analyze(command)
+    except guard.Blocked as e:
+        return [str(e)]
+    return []
+
+
+def check_file_name(tool_input: dict) -> list[str]:
+    """Write/Edit: .yml and Compose v1 names (see block-prohibited-files.sh)."""
+    file_path = tool_input.get("file_path") or ""
+    if not file_path:
+        return []
+    base = os.path.basename(file_path)
+    # Self-reference exemption: the policy files may name prohibited patterns.
+    if base in {"AGENTS.md", "CLAUDE.md"} or "/docs/agents/" in file_path:
+        return []
+    if base in {"docker-compose.yaml", "docker-compose.yml"}:
+        return [
+            f"'{base}' is the deprecated Compose v1 name. Use 'compose.yaml' "
+            "(Compose Spec v2+)."
+        ]
+    if base.endswith(".yml"):
+        return [
+            f"'{base}' uses '.yml'. This project uses '.yaml' exclusively. "
+            f"Rename to '{base[:-4]}.yaml'."
+        ]
+    return []
+
+
+def check_secrets(tool_input: dict) -> list[str]:
+    """Write/Edit/NotebookEdit: obvious credentials (block-secrets.py)."""
+    scanner = _load_companion(SECRET_SCANNER)
+    if scanner is None:
+        return _missing(SECRET_SCANNER)
+    content = scanner.written_content(tool_input)
+    if content and scanner.find_secret(content, scanner.env_min_entropy()):
+        return [scanner.MSG_SECRET]
+    return []
+
+
+def format_file(tool_input: dict) -> list[str]:
+    """PostToolUse: single-file ruff / gofmt (see format-after-edit.sh)."""
+    file_path = tool_input.get("file_path") or ""
+    if not file_path or not os.path.isfile(file_path):
+        return []
+    import shutil  # PostToolUse only: keep PreToolUse startup lean
+    import subprocess
+
+    def run(*argv: str) -> str:
+        result = subprocess.run(argv, capture_output=True, text=True, check=False)
+        return result.stdout + result.stderr
+
+    if file_path.endswith(".py") and shutil.which("uv"):
+        # --frozen: never touch uv.lock (format-after-edit.sh has the why).
+        run("uv", "run", "--frozen", "ruff", "format", file_path)
+        run("uv", "run", "--frozen", "ruff", "check", "--fix", file_path)
+        remaining = run("uv", "run", "--frozen", "ruff", "check", file_path)
+        if remaining and "All checks passed" not in remaining:
+            return [f"ruff still reports issues in {file_path}:\n{remaining}"]
+    elif file_path.endswith(".go") and shutil.which("gofmt"):
+        run("gofmt", "-w", file_path)
+    return []
+
+
+Rule = Callable[[dict], list[str]]
+
+RULES: dict[str, list[tuple[set[str], Rule]]] = {
+    "PreToolUse": [
+        ({"Bash"}, check_command),
+        (WRITE_TOOLS - {"NotebookEdit"}, check_file_name),
+        (WRITE_TOOLS, check_secrets),
+    ],
+    "PostToolUse": [
+        (FORMAT_TOOLS, format_file),
+    ],
+}
+
+
+def dispatch(payload: dict, event: str) -> tuple[int, str]:
+    """Run every rule for (event, tool): (exit code, stderr text)."""
+    event = payload.get("hook_event_name") or event
+    tool = payload.get("tool_name") or ""
+    tool_input = payload.get("tool_input") or {}
+    if not isinstance(tool_input, dict):
+        return EXIT_ALLOW, ""
+    messages: list[str] = []
+    for tools, rule in RULES.get(event, []):
+        # No tool_name (hand-fed payloads): run every rule of the event.
+        if not tool or tool in tools:
+            messages.extend(rule(tool_input))
+    if not messages:
+        return EXIT_ALLOW, ""
+    if event == "PreToolUse":
+        return EXIT_BLOCK, "".join(f"BLOCKED: {m}\n" for m in messages)
+    return EXIT_ALLOW, "".join(f"{m}\n" for m in messages)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    try:
+        payload = json.load(sys.stdin)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return EXIT_ALLOW
+    if not isinstance(payload, dict):
+        return EXIT_ALLOW
+    code, message = dispatch(payload, args[0] if args else "PreToolUse")
+    sys.stderr.write(message)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
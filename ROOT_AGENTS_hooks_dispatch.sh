@@ -0,0 +1,27 @@
+#!/usr/bin/env bash
+# .claude/hooks/dispatch.sh
+# Single registered entry for the PreToolUse (Bash|Write|Edit|NotebookEdit) and
+# PostToolUse (Write|Edit) hooks: `dispatch.sh <event>`. Thin wrapper — the
+# payload is parsed once and every applicable rule (command guard, file
+# naming, secrets, formatting) runs in the stdlib-only companion
+# dispatch.py. See docs/agents/enforcement.md for the rules.
+#
+# The companion's filename differs between the dotfiles repo root (sync source
+# naming) and a deployed agent home (hooks/), so both are tried.
+#
+# Exit-code contract:
+#   exit 0  -> allow
+#   exit 2  -> BLOCK (stderr -> Claude). exit 1 would NOT block.
+set -euo pipefail
+
+dir="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+for candidate in \
+  "$dir/dispatch.py" \
+  "$dir/ROOT_AGENTS_hooks_dispatch.py"; do
+  if [ -f "$candidate" ]; then
+    exec python3 "$candidate" "$@"
+  fi
+done
+
+echo "BLOCKED: companion dispatcher dispatch.py not found next to the wrapper (incomplete sync?) — failing closed." >&2
+exit 2
@@ -0,0 +1,332 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+"""Per-call latency benchmarks for the agent hooks (ROOT_AGENTS_hooks_*).
+
+Replays a corpus of synthetic tool-call payloads through each PreToolUse hook
+and times every call, two ways:
+
+    subprocess   `bash <hook>.sh` with the payload on stdin, as Claude Code
+                 runs it (bash + interpreter start-up included)
+    in-process   the hook's Python companion called directly (decide() /
+                 dispatch()): the rule cost alone
+
+Corpus (--large-mb scales the two big payloads):
+
+    short-command    Bash: `git status`
+    pipeline         Bash: a 120-stage grep/sed/awk pipeline
+    heredoc          Bash: `cat <<'EOF' > notes.md` with a --large-mb body
+    write-small      Write: a 2 KiB Python module
+    write-large      Write: a --large-mb lockfile
+    edit             Edit: a one-line new_string
+
+Each hook only sees the payloads of its tools. Every case reports p50/p95/p99
+latency (nearest rank over --iterations calls, after one warm-up) plus calls/s
+and MB/s at the median; the subprocess and in-process verdicts must agree.
+
+--budget PATTERN=MS (repeatable) fails the run (exit 1) when the p95 of any
+case whose "hook/payload/mode" key matches the fnmatch PATTERN exceeds MS,
+e.g. `--budget '*/short-command/subprocess=150' --budget '*/in-process=50'`.
+format-after-edit (PostToolUse) is not benchmarked: its cost is ruff/gofmt.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import importlib.util
+import json
+import math
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+
+RESULTS_VERSION = 1
+REPO = Path(__file__).resolve().parents[1]
+MODES = ("subprocess", "in-process")
+BASH_TOOLS = frozenset({"Bash"})
+WRITE_TOOLS = frozenset({"Write", "Edit", "MultiEdit", "NotebookEdit"})
+
+
+@dataclass(frozen=True)
+class Hook:
+    """One hook: its wrapper, the tools it is registered for, its companion."""
+
+    name: str
+    tools: frozenset[str]
+    args: tuple[str, ...] = ()
+    companion: str | None = None  # ROOT_AGENTS_hooks_<companion>.py
+    needs: tuple[str, ...] = ("bash", "python3")
+
+    @property
+    def script(self) -> Path:
+        base = self.name.split(":")[0]
+        return REPO / f"ROOT_AGENTS_hooks_{base}.sh"
+
+
+HOOKS = (
+    Hook(
+        "block-prohibited-commands",
+        BASH_TOOLS,
+        companion="block-prohibited-commands",
+    ),
+    Hook("block-prohibited-files", WRITE_TOOLS, needs=("bash", "jq")),
+    Hook("block-secrets", WRITE_TOOLS, companion="block-secrets"),
+    Hook(
+        "dispatch:PreToolUse",
+        BASH_TOOLS | WRITE_TOOLS,
+        args=("PreToolUse",),
+        companion="dispatch",
+    ),
+)
+HOOK_NAMES = tuple(h.name for h in HOOKS)
+
+
+@dataclass(frozen=True)
+class Payload:
+    name: str
+    tool: str
+    data: bytes
+
+
+def _payload(name: str, tool: str, tool_input: dict) -> Payload:
+    raw = {"hook_event_name": "PreToolUse", "tool_name": tool, "tool_input": tool_input}
+    return Payload(name, tool, json.dumps(raw).encode())
+
+
+def _fill(line: str, size: int) -> str:
+    return (line * (size // len(line) + 1))[:size]
+
+
+def build_corpus(large_mb: float = 2.0) -> list[Payload]:
+    """The replayed payloads; none of them should be blocked."""
+    large = int(large_mb * 1024 * 1024)
+    stages = ["grep -v vendor", "sed 's/foo/bar/'", "awk '{print $1}'"] * 40
+    module = _fill('def handler(event):\n    return {"ok": True, "n": 1}\n\n', 2048)
+    lockfile = _fill(
+        '[[package]]\nname = "pkg-example"\nversion = "1.2.3"\n'
+        'source = { registry = "https://pypi.org/simple" }\n\n',
+        large,
+    )
+    prose = _fill("- the sync now stats each tree once; see the bench notes\n", large)
+    return [
+        _payload("short-command", "Bash", {"command": "git status"}),
+        _payload(
+            "pipeline",
+            "Bash",
+            {"command": " | ".join(["git log --oneline", *stages, "sort -u"])},
+        ),
+        _payload(
+            "heredoc",
+            "Bash",
+            {"command": f"cat <<'EOF' > notes.md\n{prose}EOF"},
+        ),
+        _payload(
+            "write-small", "Write", {"file_path": "app/handler.py", "content": module}
+        ),
+        _payload("write-large", "Write", {"file_path": "uv.lock", "content": lockfile}),
+        _payload(
+            "edit",
+            "Edit",
+            {
+                "file_path": "README.md",
+                "old_string": "old",
+                "new_string": "Run `just check` before pushing.",
+            },
+        ),
+    ]
+
+
+def _load(companion: str) -> ModuleType:
+    path = REPO / f"ROOT_AGENTS_hooks_{companion}.py"
+    spec = importlib.util.spec_from_file_location(companion.replace("-", "_"), path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def in_process(hook: Hook) -> Callable[[bytes], int] | None:
+    """The hook's verdict function (raw payload -> exit code), if it has one."""
+    if hook.companion is None:
+        return None
+    module = _load(hook.companion)
+    if hook.companion == "dispatch":
+        event = hook.args[0]
+        return lambda raw: module.dispatch(json.loads(raw), event)[0]
+    return lambda raw: module.decide(raw)[0]
+
+
+def as_subprocess(hook: Hook, cwd: str) -> Callable[[bytes], int]:
+    bash = shutil.which("bash") or "bash"
+    argv = [bash, str(hook.script), *hook.args]
+
+    def run(raw: bytes) -> int:
+        result = subprocess.run(argv, input=raw, capture_output=True, cwd=cwd)
+        return result.returncode
+
+    return run
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of a non-empty sample."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(call: Callable[[bytes], int], data: bytes, iterations: int) -> dict:
+    """Time ``iterations`` calls after one warm-up."""
+    code = call(data)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call(data)
+        samples.append(time.perf_counter() - start)
+    p50 = percentile(samples, 50)
+    return {
+        "exit": code,
+        "bytes": len(data),
+        "p50_ms": round(p50 * 1e3, 3),
+        "p95_ms": round(percentile(samples, 95) * 1e3, 3),
+        "p99_ms": round(percentile(samples, 99) * 1e3, 3),
+        "calls_per_s": round(1 / p50, 1) if p50 else None,
+        "mb_per_s": round(len(data) / p50 / 1e6, 1) if p50 else None,
+    }
+
+
+def _rate(value: float | None) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def over_budget(results: dict[str, dict], budgets: list[tuple[str, float]]) -> list:
+    """(case, p95_ms, budget_ms) for every case over a matching budget."""
+    failed = []
+    for case, result in results.items():
+        for pattern, limit in budgets:
+            if fnmatch.fnmatchcase(case, pattern) and result["p95_ms"] > limit:
+                failed.append((case, result["p95_ms"], limit))
+    return failed
+
+
+def _parse_budget(text: str) -> tuple[str, float]:
+    pattern, _, ms = text.rpartition("=")
+    try:
+        limit = float(ms)
+    except ValueError:
+        limit = None
+    if not pattern or limit is None:
+        raise argparse.ArgumentTypeError(f"expected PATTERN=MS, got {text!r}")
+    return pattern, limit
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(REPO), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--hooks", nargs="+", choices=HOOK_NAMES, default=HOOK_NAMES)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--large-mb",
+        type=float,
+        default=2.0,
+        help="size of the heredoc and write-large payloads (default: 2)",
+    )
+    parser.add_argument(
+        "--budget",
+        type=_parse_budget,
+        action="append",
+        default=[],
+        metavar="PATTERN=MS",
+        help="max p95 for cases matching hook/payload/mode (repeatable)",
+    )
+    parser.add_argument("--out", type=Path, help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    if args.iterations < 1 or args.large_mb <= 0:
+        print("❌ Error: --iterations and --large-mb must be > 0", file=sys.stderr)
+        return 2
+
+    corpus = build_corpus(args.large_mb)
+    results: dict[str, dict] = {}
+    mismatched = []
+    print(
+        f"{'hook/payload/mode':<52} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'calls/s':>8} {'MB/s':>7}"
+    )
+    with tempfile.TemporaryDirectory(prefix="bench-hooks-") as cwd:
+        for hook in (h for h in HOOKS if h.name in args.hooks):
+            calls = {}
+            if "subprocess" in args.modes:
+                missing = [tool for tool in hook.needs if shutil.which(tool) is None]
+                if missing:
+                    needs = ", ".join(missing)
+                    print(f"⏭  {hook.name}: subprocess skipped (no {needs})")
+                else:
+                    calls["subprocess"] = as_subprocess(hook, cwd)
+            if "in-process" in args.modes and (call := in_process(hook)):
+                calls["in-process"] = call
+            for payload in (p for p in corpus if p.tool in hook.tools):
+                verdicts = set()
+                for mode, call in calls.items():
+                    case = f"{hook.name}/{payload.name}/{mode}"
+                    result = measure(call, payload.data, args.iterations)
+                    results[case] = result
+                    verdicts.add(result["exit"])
+                    print(
+                        f"{case:<52} {result['p50_ms']:>8.2f} "
+                        f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                        f"{_rate(result['calls_per_s']):>8} "
+                        f"{_rate(result['mb_per_s']):>7}"
+                    )
+                if len(verdicts) > 1:
+                    mismatched.append(f"{hook.name}/{payload.name}")
+
+    if args.out is not None:
+        report = {
+            "version": RESULTS_VERSION,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {"iterations": args.iterations, "large_mb": args.large_mb},
+            "budgets": dict(args.budget),
+            "results": results,
+        }
+        args.out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\n📝 Results written to {args.out}")
+
+    if mismatched:
+        names = ", ".join(mismatched)
+        print(f"\n❌ subprocess and in-process verdicts differ: {names}")
+        return 1
+    failed = over_budget(results, args.budget)
+    for case, p95, limit in failed:
+        print(f"❌ {case}: p95 {p95:.2f} ms > budget {limit:g} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+"""Synthetic-tree benchmarks for scripts/sync_agents.py.
+
+Builds a throwaway dotfiles source and K agent homes at a configurable scale
+(N skills x M files plus C commands of a given size, a fraction of source
+files changed since the last sync, a fraction of extra target-only commands
+per home), then measures each mode on a fresh copy of that world:
+
+    preview      preview_mode
+    sync         sync_mode(auto_yes=True)
+    import-only  import_only_mode
+    orphans      orphans_mode
+
+Every measurement runs in its own spawned process with HOME pointed into the
+scratch directory, so no real agent home (or ~/.agents object store) is ever
+touched and peak RSS covers one mode (plus building its world). File
+operations come from sync_agents' --timings counters (files stat'ed, bytes
+read, bytes written).
+
+Results are written as JSON; --baseline compares median wall time against an
+earlier results file and exits 1 when a mode regressed beyond --threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sync_agents import AgentTarget
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None  # type: ignore[assignment]
+
+RESULTS_VERSION = 1
+SCENARIOS = ("preview", "sync", "import-only", "orphans")
+
+
+@dataclass(frozen=True)
+class WorldParams:
+    """Scale of the synthetic world."""
+
+    skills: int = 50
+    files: int = 10
+    commands: int = 20
+    size: int = 2048
+    homes: int = 3
+    changed: float = 0.1
+    orphaned: float = 0.05
+    seed: int = 0
+
+
+def _write(path: Path, size: int, rng: random.Random) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = f"# {path.name} {rng.random()}\n"
+    path.write_text((line * (size // len(line) + 1))[:size], encoding="utf-8")
+
+
+def build_world(root: Path, params: WorldParams) -> tuple[Path, list[AgentTarget]]:
+    """Create dotfiles + homes under root, synced once, then drifted.
+
+    Returns (dotfiles_dir, agents). The first home is claude-like (overlay,
+    hooks, import source); the rest receive the base only.
+    """
+    import sync_agents  # deferred: HOME must point into the scratch dir first
+
+    rng = random.Random(params.seed)
+    dotfiles = root / "dotfiles"
+    dotfiles.mkdir(parents=True)
+    (dotfiles / "ROOT_AGENTS.md").write_text(
+        "# Base\n\nSee docs/agents/testing.md\n", encoding="utf-8"
+    )
+    (dotfiles / "ROOT_CLAUDE.md").write_text("# Overlay\n@AGENTS.md\n")
+    _write(dotfiles / "ROOT_AGENTS_docs_agents_testing.md", params.size, rng)
+    _write(dotfiles / "ROOT_AGENTS_hooks_guard.sh", 256, rng)
+    source_files: list[Path] = []
+    for i in range(params.commands):
+        path = dotfiles / "commands" / f"cmd-{i:04d}.md"
+        _write(path, params.size, rng)
+        source_files.append(path)
+    for i in range(params.skills):
+        skill = dotfiles / "skills" / f"skill-{i:04d}"
+        _write(skill / "SKILL.md", params.size, rng)
+        for j in range(max(0, params.files - 1)):
+            path = skill / "refs" / f"ref-{j:04d}.md"
+            _write(path, params.size, rng)
+            source_files.append(path)
+
+    agents = [
+        sync_agents.AgentTarget(
+            root / "homes" / "claude",
+            "Claude",
+            key="claude",
+            main_file="CLAUDE.md",
+            is_import_source=True,
+            overlay_main=True,
+            base_secondary="AGENTS.md",
+            receives_hooks=True,
+        ),
+        *(
+            sync_agents.AgentTarget(
+                root / "homes" / f"home-{i}",
+                f"Home {i}",
+                key=f"home-{i}",
+                main_file="AGENTS.md",
+            )
+            for i in range(1, params.homes)
+        ),
+    ][: params.homes]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync_agents.sync_mode(dotfiles, auto_yes=True, agents=agents)
+
+    for path in rng.sample(source_files, int(len(source_files) * params.changed)):
+        _write(path, params.size, rng)
+    # Target-only commands: imported from the claude home, orphans elsewhere.
+    for agent in agents:
+        for i in range(int(params.commands * params.orphaned)):
+            stray = agent.directory / "commands" / f"stray-{agent.key}-{i:04d}.md"
+            _write(stray, params.size, rng)
+    return dotfiles, agents
+
+
+def _peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS: bytes
+
+
+def _measure(scenario: str, params: WorldParams, workdir: str | None) -> dict:
+    """Build a fresh world and time one mode on it (runs in a child process)."""
+    with tempfile.TemporaryDirectory(prefix="bench-sync-", dir=workdir) as tmp:
+        root = Path(tmp)
+        os.environ["HOME"] = os.environ["USERPROFILE"] = str(root / "home")
+        import sync_agents  # after HOME: its default paths derive from it
+
+        dotfiles, agents = build_world(root, params)
+        runs = {
+            "preview": lambda: sync_agents.preview_mode(dotfiles, agents=agents),
+            "sync": lambda: sync_agents.sync_mode(
+                dotfiles, auto_yes=True, agents=agents
+            ),
+            "import-only": lambda: sync_agents.import_only_mode(
+                dotfiles, agents=agents
+            ),
+            "orphans": lambda: sync_agents.orphans_mode(dotfiles, agents=agents),
+        }
+        timings = sync_agents._Timings()
+        sync_agents._TIMINGS = timings
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            runs[scenario]()
+        wall = time.perf_counter() - start
+        sync_agents._TIMINGS = None
+        timings.finish()
+
+    phases: dict[str, float] = {}
+    for span in timings.spans:
+        ms = (span.end_ns - span.start_ns) / 1e6
+        phases[span.name] = round(phases.get(span.name, 0.0) + ms, 3)
+    return {
+        "wall_s": wall,
+        "peak_rss_kb": _peak_rss_kb(),
+        **timings.root.counters,
+        "phases": phases,
+    }
+
+
+def run_scenario(
+    scenario: str, params: WorldParams, repeat: int = 3, workdir: str | None = None
+) -> dict:
+    """Median/min over ``repeat`` isolated runs of one scenario."""
+    ctx = multiprocessing.get_context("spawn")
+    samples = []
+    with ctx.Pool(1, maxtasksperchild=1) as pool:
+        for _ in range(repeat):
+            samples.append(pool.apply(_measure, (scenario, params, workdir)))
+    walls = [s["wall_s"] for s in samples]
+    rss = [s["peak_rss_kb"] for s in samples if s["peak_rss_kb"] is not None]
+    last = samples[-1]
+    return {
+        "wall_s": statistics.median(walls),
+        "wall_s_min": min(walls),
+        "peak_rss_kb": max(rss) if rss else None,
+        "stat": last["stat"],
+        "read": last["read"],
+        "written": last["written"],
+        "phases": last["phases"],
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(Path(__file__).resolve().parent), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print median wall time deltas; return the scenarios that regressed."""
+    regressed = []
+    print(f"\n{'scenario':<12} {'base s':>9} {'now s':>9} {'delta':>8}")
+    for name, now in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<12} {'-':>9} {now['wall_s']:>9.3f} {'new':>8}")
+            continue
+        delta = now["wall_s"] / base["wall_s"] - 1 if base["wall_s"] else 0.0
+        flag = ""
+        if delta > threshold:
+            regressed.append(name)
+            flag = "  ❌"
+        print(
+            f"{name:<12} {base['wall_s']:>9.3f} {now['wall_s']:>9.3f} "
+            f"{delta:>+8.1%}{flag}"
+        )
+    if baseline.get("params") != results["params"]:
+        print("⚠️  baseline was recorded with different world parameters")
+    return regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    defaults = WorldParams()
+    parser.add_argument("--skills", type=int, default=defaults.skills)
+    parser.add_argument(
+        "--files", type=int, default=defaults.files, help="files per skill"
+    )
+    parser.add_argument(
+        "--size", type=int, default=defaults.size, help="bytes per file"
+    )
+    parser.add_argument("--commands", type=int, default=defaults.commands)
+    parser.add_argument("--homes", type=int, default=defaults.homes)
+    parser.add_argument(
+        "--changed",
+        type=float,
+        default=defaults.changed,
+        help="fraction of command/skill files edited after the initial sync",
+    )
+    parser.add_argument(
+        "--orphaned",
+        type=float,
+        default=defaults.orphaned,
+        help="target-only commands per home, as a fraction of --commands",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=list(SCENARIOS),
+    )
+    parser.add_argument(
+        "--workdir", help="scratch directory parent (default: system temp)"
+    )
+    parser.add_argument("--out", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="max tolerated median wall-time slowdown (default: 0.2 = +20%%)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.homes < 1 or args.repeat < 1:
+        print("❌ Error: --homes and --repeat must be >= 1", file=sys.stderr)
+        return 2
+
+    params = WorldParams(
+        skills=args.skills,
+        files=args.files,
+        commands=args.commands,
+        size=args.size,
+        homes=args.homes,
+        changed=args.changed,
+        orphaned=args.orphaned,
+        seed=args.seed,
+    )
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": asdict(params),
+        "repeat": args.repeat,
+        "results": {},
+    }
+    print(f"{'scenario':<12} {'wall s':>9} {'rss KiB':>9} {'stat':>8} {'written':>11}")
+    for scenario in args.scenarios:
+        result = run_scenario(scenario, params, args.repeat, args.workdir)
+        results["results"][scenario] = result
+        print(
+            f"{scenario:<12} {result['wall_s']:>9.3f} "
+            f"{result['peak_rss_kb'] or '-':>9} {result['stat']:>8} "
+            f"{result['written']:>11}"
+        )
+
+    if args.out is not None:
+        args.out.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\n📝 Results written to {args.out}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("version") != RESULTS_VERSION:
+            print(f"❌ Error: unsupported baseline version in {args.baseline}")
+            return 2
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            names = ", ".join(regressed)
+            print(f"\n❌ Regressed beyond +{args.threshold:.0%}: {names}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
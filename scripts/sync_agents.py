@@ -23,21 +23,49 @@ The '_' in filenames (after ROOT_AGENTS_) are converted to '/' for target path.
 Public API:
     - main(): CLI entry point
     - preview_mode(): Show sync plan without applying
+    - simulate_mode(): Project the file-level outcome of a sync in memory
     - sync_mode(): Apply sync with optional auto-confirm
+    - apply_plan_mode(): Apply a reviewed --plan-out file without rescanning
+    - watch_mode(): Apply dotfiles edits to agent homes as they happen
+    - verify_mode(): Report drift of deployed agent homes as JSON (read-only)
+    - export_bundle_mode() / install_bundle_mode(): Provision a home from one
+      rendered archive
 """
 
 import argparse
+import contextlib
+import ctypes
+import errno
 import filecmp
+import fnmatch
+import functools
+import hashlib
+import io
+import itertools
 import json
+import os
 import platform
+import select
 import shutil
+import stat
+import struct
+import subprocess
 import sys
-import tempfile
+import tarfile
+import threading
+import time
 import tomllib
-from collections.abc import Callable
-from dataclasses import dataclass, field
+import urllib.request
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Literal
+from typing import BinaryIO, Literal, NamedTuple, TextIO, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # Windows: no ioctl, reflink mode falls back to copy2
+    fcntl = None  # type: ignore[assignment]
 
 # --- Configuration ---
 
@@ -100,9 +128,9 @@ def _load_skills_sync_exclude(dotfiles_dir: Path) -> frozenset[str]:
     `exclude` value raises (fail loud) so a typo never silently syncs junk.
     """
     exclude_file = dotfiles_dir / SKILLS_SYNC_EXCLUDE_FILE
-    if not exclude_file.is_file():
+    if not _FS.is_file(exclude_file):
         return frozenset()
-    with exclude_file.open("rb") as f:
+    with _FS.open(exclude_file) as f:
         data = tomllib.load(f)
     exclude = data.get("exclude", [])
     if not isinstance(exclude, list) or not all(
@@ -124,10 +152,20 @@ def _is_syncable_skill(path: Path, name: str, exclude: frozenset[str]) -> bool:
     """
     if name in exclude:
         return False
-    resolved = path.resolve()
-    if not resolved.is_dir():
-        return False
-    return any(resolved.rglob("SKILL.md"))
+    resolved = _FS.resolve(path)
+    return _FS.is_dir(resolved) and _has_skill_md(resolved)
+
+
+def _has_skill_md(directory: Path) -> bool:
+    """Whether a SKILL.md sits anywhere under a directory (like rglob, symlinked
+    subdirectories are not descended into); stops at the first hit."""
+    entries = _FS.scandir(directory)
+    if any(e.name == "SKILL.md" for e in entries):
+        return True
+    return any(
+        e.is_dir() and not e.is_symlink() and _has_skill_md(Path(e.path))
+        for e in entries
+    )
 
 
 @dataclass
@@ -311,15 +349,580 @@ def _select_agents(keys: list[str]) -> list[AgentTarget]:
 
 
 MANIFEST_FILE = ".sync-manifest.json"
-MANIFEST_VERSION = 1
+MANIFEST_VERSION = 2
+
+
+@dataclass(frozen=True)
+class _SyncedState:
+    """Per-agent record of its last complete sync (for --incremental).
+
+    ``commit`` / ``dirty`` are the dotfiles HEAD and its uncommitted paths at
+    that time; ``target`` is the home's _target_state_digest right after.
+    """
+
+    commit: str
+    dirty: tuple[str, ...]
+    target: str
+
+
+@dataclass(frozen=True)
+class _ManifestItem:
+    """Per-item manifest record (v2, internal use).
+
+    ``digest`` is the item's content digest when last synced ("" = unknown:
+    migrated from v1, imported, or an additive item, which is compared by
+    existence only); ``files`` / ``size`` its file count and total bytes;
+    ``agents`` the keys of the homes it was last applied to at that digest.
+    """
+
+    digest: str = ""
+    files: int = 0
+    size: int = 0
+    agents: tuple[str, ...] = ()
 
 
 @dataclass
 class _SyncManifest:
-    """Tracks managed items per sync directory."""
+    """Tracks managed items per sync directory.
+
+    ``fingerprint`` is the _sync_fingerprint recorded after the last complete
+    sync ("" = none); an unchanged fingerprint short-circuits the next run.
+    ``synced`` holds each agent's _SyncedState, keyed by AgentTarget.key.
+    ``records`` holds a _ManifestItem per "<dir>/<name>" item, decoded from
+    the loaded file on first use (most runs stop at the fingerprint check).
+    """
 
     version: int = MANIFEST_VERSION
     items: dict[str, list[str]] = field(default_factory=dict)
+    fingerprint: str = ""
+    synced: dict[str, _SyncedState] = field(default_factory=dict)
+    _raw_records: dict[str, list] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    _records: dict[str, _ManifestItem] | None = field(
+        default=None, compare=False, repr=False
+    )
+    # The file as loaded / last saved: an unchanged manifest is not rewritten.
+    _text: str = field(default="", compare=False, repr=False)
+
+    @property
+    def records(self) -> dict[str, _ManifestItem]:
+        if self._records is None:
+            self._records = {
+                rel: _ManifestItem(digest, files, size, tuple(agents))
+                for rel, (digest, files, size, agents) in self._raw_records.items()
+            }
+        return self._records
+
+    def encoded_record(self, rel: str) -> list:
+        """On-disk form of an item's record: [digest, files, size, agents]."""
+        if self._records is None:
+            return self._raw_records.get(rel, ["", 0, 0, []])
+        record = self._records.get(rel, _ManifestItem())
+        return [record.digest, record.files, record.size, list(record.agents)]
+
+
+# --- Timings (--timings / --timings-jsonl / --timings-otlp) ---
+
+_COUNTERS = ("stat", "read", "written")
+
+
+@dataclass
+class _Span:
+    """One timed phase (internal use). Counters: files stat'ed, bytes read,
+    bytes written (characters for rendered/settings text writes)."""
+
+    name: str
+    attrs: dict[str, str]
+    span_id: str
+    parent_id: str
+    start_ns: int
+    end_ns: int = 0
+    counters: dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(_COUNTERS, 0)
+    )
+
+
+class _Timings:
+    """Per-run span recorder; spans nest per thread under one root span."""
+
+    def __init__(self) -> None:
+        self.trace_id = os.urandom(16).hex()
+        self.root = _Span("sync-agents", {}, os.urandom(8).hex(), "", time.time_ns())
+        self.spans: list[_Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> list[_Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self) -> _Span:
+        stack = self._stack()
+        return stack[-1] if stack else self.root
+
+    @contextlib.contextmanager
+    def phase(self, name: str, **attrs: str) -> Iterator[None]:
+        span = _Span(
+            name, attrs, os.urandom(8).hex(), self.current().span_id, time.time_ns()
+        )
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield
+        finally:
+            stack.pop()
+            span.end_ns = time.time_ns()
+            with self._lock:
+                self.spans.append(span)
+
+    def count(self, **amounts: int) -> None:
+        """Add to the calling thread's innermost span. Threads with no open
+        phase (pool workers) all land on the root span, so that one is locked."""
+        span = self.current()
+        lock = self._lock if span is self.root else contextlib.nullcontext()
+        with lock:
+            for key, value in amounts.items():
+                span.counters[key] += value
+
+    def finish(self) -> None:
+        self.root.end_ns = time.time_ns()
+        for span in self.spans:
+            for key, value in span.counters.items():
+                self.root.counters[key] += value
+
+
+# Active recorder for this process (set by main under --timings*); None keeps
+# every instrumentation point a single global lookup.
+_TIMINGS: _Timings | None = None
+
+
+def _phase(name: str, **attrs: str) -> contextlib.AbstractContextManager[None]:
+    """Time a phase under the active recorder (no-op when timings are off)."""
+    if _TIMINGS is None:
+        return contextlib.nullcontext()
+    return _TIMINGS.phase(name, **attrs)
+
+
+def _count(stat: int = 0, read: int = 0, written: int = 0) -> None:
+    """Add to the innermost active phase's counters (no-op when timings are off)."""
+    if _TIMINGS is None:
+        return
+    _TIMINGS.count(stat=stat, read=read, written=written)
+
+
+def _print_timings(timings: _Timings, out: TextIO | None = None) -> None:
+    """Summary table: one row per phase name, summed over agents/threads."""
+    rows: dict[str, list[int]] = {}
+    for span in timings.spans:
+        row = rows.setdefault(span.name, [0, 0, 0, 0, 0])
+        row[0] += 1
+        row[1] += span.end_ns - span.start_ns
+        for i, key in enumerate(_COUNTERS, start=2):
+            row[i] += span.counters[key]
+    print("\n⏱️  Timings", file=out)
+    header = f"  {'phase':<18} {'n':>3} {'wall ms':>9} {'stat':>7} {'read':>11} "
+    print(header + f"{'written':>11}", file=out)
+    root = timings.root
+    total = [1, root.end_ns - root.start_ns, *(root.counters[k] for k in _COUNTERS)]
+    for name, row in [*rows.items(), ("total", total)]:
+        print(
+            f"  {name:<18} {row[0]:>3} {row[1] / 1e6:>9.1f} {row[2]:>7} "
+            f"{row[3]:>11} {row[4]:>11}",
+            file=out,
+        )
+
+
+def _span_records(timings: _Timings) -> list[dict]:
+    """Spans (root last) as flat dicts, the JSONL export format."""
+    return [
+        {
+            "trace_id": timings.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "attrs": span.attrs,
+            "start_ns": span.start_ns,
+            "end_ns": span.end_ns,
+            "duration_ms": (span.end_ns - span.start_ns) / 1e6,
+            **span.counters,
+        }
+        for span in [*timings.spans, timings.root]
+    ]
+
+
+def _write_timings_jsonl(timings: _Timings, path: Path) -> None:
+    """Append one JSON object per span to path."""
+    with path.open("a", encoding="utf-8") as f:
+        for record in _span_records(timings):
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def _otlp_traces_endpoint() -> str:
+    """OTLP/HTTP traces URL from the standard OTEL_EXPORTER_OTLP_* variables."""
+    endpoint = os.environ.get("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+    if not endpoint:
+        base = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
+        endpoint = base.rstrip("/") + "/v1/traces"
+    if "://" not in endpoint:
+        endpoint = f"http://{endpoint}"
+    return endpoint
+
+
+def _otlp_payload(timings: _Timings) -> dict:
+    """ExportTraceServiceRequest in OTLP/JSON encoding (hex ids, string ints)."""
+
+    def _attrs(span: _Span) -> list[dict]:
+        return [
+            *({"key": k, "value": {"stringValue": v}} for k, v in span.attrs.items()),
+            *(
+                {"key": f"sync.{k}", "value": {"intValue": str(v)}}
+                for k, v in span.counters.items()
+            ),
+        ]
+
+    spans = [
+        {
+            "traceId": timings.trace_id,
+            "spanId": span.span_id,
+            **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _attrs(span),
+        }
+        for span in [timings.root, *timings.spans]
+    ]
+    resource = {"key": "service.name", "value": {"stringValue": "sync-agents"}}
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [resource]},
+                "scopeSpans": [{"scope": {"name": "sync_agents"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+def _export_timings_otlp(timings: _Timings) -> None:
+    """POST the run's spans to the OTLP/HTTP collector (telemetry/ stack).
+
+    Export failures only warn: timings must never fail a sync.
+    """
+    endpoint = _otlp_traces_endpoint()
+    request = urllib.request.Request(
+        endpoint,
+        data=json.dumps(_otlp_payload(timings)).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5):
+            pass
+    except OSError as e:
+        print(f"⚠️  OTLP export to {endpoint} failed: {e}", file=sys.stderr)
+
+
+# Persistent per-file content digests, one index per tree root: the dotfiles dir
+# (next to MANIFEST_FILE) and every agent home. Entries are reused while the
+# file's stat signature (size, mtime_ns, inode) is unchanged, so change
+# detection only re-reads files that were actually touched since the last run.
+DIGEST_INDEX_FILE = ".sync-digests.json"
+DIGEST_INDEX_VERSION = 1
+# Racy-entry guard (same idea as git's racily-clean index entries): a file whose
+# mtime falls this close to the index write time may have been modified again
+# within the filesystem's timestamp granularity, so its cached digest is not
+# trusted and it is re-hashed on the next run.
+_RACY_WINDOW_NS = 2_000_000_000
+# dircmp's default ignore list; the digest comparison mirrors it so it reports
+# "synced" for exactly the trees _compare_directories would.
+_DIGEST_IGNORES = frozenset(filecmp.DEFAULT_IGNORES)
+
+
+@dataclass
+class _DigestIndex:
+    """Cached file digests for one tree root (internal use).
+
+    ``entries`` maps a root-relative posix path to ``[size, mtime_ns, inode,
+    sha256]``. An index built in memory and never saved is a plain per-run
+    cache, so callers that pass none get the uncached behavior. ``seen``
+    holds the keys _cached_digest looked up this run (see _save_digest_index).
+    """
+
+    root: Path
+    entries: dict[str, list] = field(default_factory=dict)
+    written_ns: int = 0
+    dirty: bool = False
+    seen: set[str] = field(default_factory=set)
+
+
+def _load_digest_index(root: Path) -> _DigestIndex:
+    """Load the digest index stored under root (empty when missing or unreadable).
+
+    The index is a pure cache: a corrupt or foreign-version file is discarded
+    rather than raised, and rebuilt on the next save.
+    """
+    index_path = root / DIGEST_INDEX_FILE
+    try:
+        data = json.loads(_FS.read_text(index_path, encoding="utf-8"))
+    except (OSError, ValueError):
+        return _DigestIndex(root=root)
+    if not isinstance(data, dict) or data.get("version") != DIGEST_INDEX_VERSION:
+        return _DigestIndex(root=root)
+    return _DigestIndex(
+        root=root,
+        entries=data.get("entries", {}),
+        written_ns=data.get("written_ns", 0),
+    )
+
+
+def _save_digest_index(index: _DigestIndex, prune: bool = False) -> None:
+    """Persist the index if it changed (never creates the root directory).
+
+    With ``prune``, entries this run never looked up are dropped first unless
+    their file still has the recorded stat signature, so deleted and rewritten
+    files do not pile up. That costs a stat per unseen entry: only runs that
+    planned the whole tree prune; partial ones leave it to the next full run.
+    """
+    if not index.dirty or not _FS.is_dir(index.root):
+        return
+    if prune:
+        unseen = [key for key in index.entries if key not in index.seen]
+        for key in unseen:
+            try:
+                st = _FS.stat(index.root / key)
+            except OSError:
+                st = None
+            signature = None if st is None else [st.st_size, st.st_mtime_ns, st.st_ino]
+            if index.entries[key][:3] != signature:
+                del index.entries[key]
+        _count(stat=len(unseen))
+    index.written_ns = time.time_ns()
+    data = {
+        "version": DIGEST_INDEX_VERSION,
+        "written_ns": index.written_ns,
+        "entries": dict(sorted(index.entries.items())),
+    }
+    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False) + "\n"
+    _FS.write_bytes(index.root / DIGEST_INDEX_FILE, text.encode())
+    index.dirty = False
+
+
+def _index_key(index: _DigestIndex, path: Path) -> str:
+    """Root-relative posix key for path (absolute for paths outside the root)."""
+    try:
+        return path.relative_to(index.root).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def _hash_file(path: Path, fs: "_DiskFS | None" = None) -> str:
+    """sha256 of a file's bytes, read in 1 MiB chunks (``fs``: see _FS)."""
+    digest = hashlib.sha256()
+    read = 0
+    with (fs or _FS).open(path) as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+            read += len(chunk)
+    _count(read=read)
+    return digest.hexdigest()
+
+
+def _file_digest(
+    path: Path,
+    index: _DigestIndex,
+    st: os.stat_result | None = None,
+    fs: "_DiskFS | None" = None,
+) -> str:
+    """Content digest of a file, served from the index while its stat is unchanged."""
+    if st is None:
+        st = (fs or _FS).stat(path)
+        _count(stat=1)
+    return _cached_digest(path, index, st.st_size, st.st_mtime_ns, st.st_ino, fs)
+
+
+def _cached_digest(
+    path: Path,
+    index: _DigestIndex,
+    size: int,
+    mtime_ns: int,
+    ino: int,
+    fs: "_DiskFS | None" = None,
+) -> str:
+    """_file_digest for a stat signature the caller already holds."""
+    key = _index_key(index, path)
+    index.seen.add(key)
+    signature = [size, mtime_ns, ino]
+    cached = index.entries.get(key)
+    if (
+        cached is not None
+        and cached[:3] == signature
+        and mtime_ns + _RACY_WINDOW_NS < index.written_ns
+    ):
+        return cached[3]
+    digest = _hash_file(path, fs)
+    index.entries[key] = [*signature, digest]
+    index.dirty = True
+    return digest
+
+
+@dataclass(frozen=True)
+class _TreeEntry:
+    """One entry of a scanned directory tree (internal use).
+
+    kind: "d" directory, "f" file, "x" dangling symlink. The stat fields are
+    only filled for files scanned with_stat=True.
+    """
+
+    rel: str
+    kind: Literal["d", "f", "x"]
+    size: int = 0
+    mtime_ns: int = 0
+    ino: int = 0
+
+
+@dataclass(frozen=True)
+class _DirChild:
+    """One child of a directory listed by _list_dir (internal use).
+
+    Types come from the os.scandir entry: free from d_type for regular
+    entries, one cached stat for symlinks. ``is_dir`` / ``exists`` follow
+    symlinks (``exists`` is False for a dangling one).
+    """
+
+    name: str
+    path: Path
+    is_symlink: bool
+    is_dir: bool
+    exists: bool
+
+
+def _list_dir(path: Path, fs: "_DiskFS | None" = None) -> tuple[_DirChild, ...] | None:
+    """List a directory's children (sorted by name) with one os.scandir.
+
+    Returns None when path is not a directory, replacing the usual
+    is_dir() + iterdir() + per-child is_symlink()/is_dir()/exists() calls.
+    ``fs`` is the backend to list (None = the active one, _FS).
+    """
+    try:
+        entries = (fs or _FS).scandir(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    children = []
+    for entry in entries:
+        is_symlink = entry.is_symlink()
+        is_dir = entry.is_dir()
+        children.append(
+            _DirChild(
+                name=entry.name,
+                path=path / entry.name,
+                is_symlink=is_symlink,
+                is_dir=is_dir,
+                exists=not is_symlink or is_dir or entry.is_file(),
+            )
+        )
+    return tuple(children)
+
+
+def _scan_tree(
+    path: Path, with_stat: bool = True, fs: "_DiskFS | None" = None
+) -> tuple[_TreeEntry, ...]:
+    """Walk a directory tree once with os.scandir, as _compare_directories sees it.
+
+    Entries come out sorted by relative path; excluded children
+    (EXCLUDE_PATTERNS) and dircmp's default ignores are skipped at every
+    level, and symlinks are followed like dircmp and copytree(symlinks=False).
+    ``fs`` is the backend to walk (None = the active one, _FS).
+    """
+    scandir = (fs or _FS).scandir
+    entries: list[_TreeEntry] = []
+    stats = 0
+
+    def _walk(directory: str, dir_name: str, rel: str) -> None:
+        nonlocal stats
+        for entry in scandir(directory):
+            if entry.name in _DIGEST_IGNORES or _is_excluded_child(
+                dir_name, entry.name
+            ):
+                continue
+            child_rel = f"{rel}{entry.name}"
+            if entry.is_dir():
+                entries.append(_TreeEntry(child_rel, "d"))
+                _walk(entry.path, entry.name, f"{child_rel}/")
+                continue
+            if not with_stat:
+                kind = "f" if entry.is_file() else "x"
+                entries.append(_TreeEntry(child_rel, kind))
+                continue
+            stats += 1
+            try:
+                st = entry.stat()
+            except OSError:
+                # dangling symlink: compared by name only (dircmp "funny")
+                entries.append(_TreeEntry(child_rel, "x"))
+                continue
+            entries.append(
+                _TreeEntry(child_rel, "f", st.st_size, st.st_mtime_ns, st.st_ino)
+            )
+
+    _walk(os.fspath(path), path.name, "")
+    _count(stat=stats)
+    return tuple(entries)
+
+
+def _entries_digest(
+    root: Path, entries: tuple[_TreeEntry, ...], index: _DigestIndex
+) -> str:
+    """Digest over scanned entries: every relative path, its type and content."""
+    digest = hashlib.sha256()
+    for entry in entries:
+        if entry.kind == "f":
+            file_digest = _cached_digest(
+                root / entry.rel, index, entry.size, entry.mtime_ns, entry.ino
+            )
+            digest.update(f"f\0{entry.rel}\0{file_digest}\0".encode())
+        else:
+            digest.update(f"{entry.kind}\0{entry.rel}\0".encode())
+    return digest.hexdigest()
+
+
+def _tree_digest(path: Path, index: _DigestIndex) -> str:
+    """Digest of a directory tree as _compare_directories sees it.
+
+    Two trees compare equal exactly when their digests match (see _scan_tree
+    for what is skipped and followed).
+    """
+    return _entries_digest(path, _scan_tree(path), index)
+
+
+def _same_content(
+    source: Path,
+    target: Path,
+    source_index: _DigestIndex | None = None,
+    target_index: _DigestIndex | None = None,
+    fs: "_DiskFS | None" = None,
+) -> bool:
+    """Whether two files hold the same bytes, by content digest.
+
+    Digests come from the given caches (the ones planning filled, so the
+    apply agrees with the plan); without them a throwaway cache hashes both.
+    Different sizes short-circuit without reading either file.
+    """
+    if fs is None:
+        fs = _FS
+    src_st, dst_st = fs.stat(source), fs.stat(target)
+    _count(stat=2)
+    if src_st.st_size != dst_st.st_size:
+        return False
+    if source_index is None:
+        source_index = _DigestIndex(root=source.parent)
+    if target_index is None:
+        target_index = _DigestIndex(root=target.parent)
+    return _file_digest(source, source_index, src_st, fs) == _file_digest(
+        target, target_index, dst_st, fs
+    )
 
 
 @dataclass
@@ -344,6 +947,8 @@ class _SyncAction:
     # (docs/agents/ references rewritten to the agent's absolute path) instead of
     # a byte-for-byte copy. Set for the base, overlay, and spoke .md files.
     render: bool = False
+    # The rendered bytes computed while planning, reused by the apply.
+    rendered: bytes | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass
@@ -358,11 +963,19 @@ class _DeleteAction:
 
 @dataclass
 class _SyncPlan:
-    """Sync plan for a single agent (internal use)."""
+    """Sync plan for a single agent (internal use).
+
+    ``target_index`` is the agent home's digest cache used while planning,
+    kept so a plan file can record target pre-states without re-hashing;
+    ``source_index`` is the dotfiles one. The apply compares files with the
+    same two caches, so it writes exactly what the plan called changed.
+    """
 
     agent: AgentTarget
     items: list[_SyncAction]
     deletions: list[_DeleteAction] = field(default_factory=list)
+    target_index: _DigestIndex | None = field(default=None, repr=False)
+    source_index: _DigestIndex | None = field(default=None, repr=False)
 
 
 # Patterns excluded from sync (skill-creator workspace directories, etc.)
@@ -384,7 +997,7 @@ def _is_internal_symlink(path: Path, parent_dir: Path) -> bool:
     Used to skip symlinks created by link-learned-skills (e.g. skills/foo -> learned/foo).
     """
     try:
-        link_target = path.resolve()
+        link_target = _FS.resolve(path)
         return link_target.is_relative_to(parent_dir)
     except (OSError, ValueError):
         return False
@@ -404,38 +1017,107 @@ def _make_copytree_ignore() -> Callable[[str, list[str]], set[str]]:
 
 
 def _load_manifest(dotfiles_dir: Path) -> _SyncManifest:
-    """Load manifest from disk, or initialize from current dotfiles contents."""
+    """Load manifest from disk, or initialize from current dotfiles contents.
+
+    A v1 file (bare item names per sync dir) migrates to v2 with empty
+    records; the next save writes it back as v2.
+    """
     manifest_path = dotfiles_dir / MANIFEST_FILE
-    if manifest_path.exists():
-        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if _FS.exists(manifest_path):
+        text = _FS.read_text(manifest_path, encoding="utf-8")
+        data = json.loads(text)
+        items: dict[str, list[str]] = {}
+        raw_records: dict[str, list] = {}
+        for dir_name, entries in data.get("items", {}).items():
+            items[dir_name] = sorted(entries)
+            if isinstance(entries, dict):  # v2: name -> record
+                for name, record in entries.items():
+                    raw_records[f"{dir_name}/{name}"] = record
         return _SyncManifest(
-            version=data.get("version", MANIFEST_VERSION),
-            items=data.get("items", {}),
+            items=items,
+            fingerprint=data.get("fingerprint", ""),
+            synced={
+                key: _SyncedState(
+                    commit=state["commit"],
+                    dirty=tuple(state.get("dirty", ())),
+                    target=state["target"],
+                )
+                for key, state in data.get("synced", {}).items()
+            },
+            _raw_records=raw_records,
+            _text=text,
         )
     # Auto-initialize from current dotfiles contents
-    items: dict[str, list[str]] = {}
+    items = {}
     for dir_name in SYNC_DIRECTORIES:
-        dir_path = dotfiles_dir / dir_name
-        if not dir_path.is_dir():
+        children = _list_dir(dotfiles_dir / dir_name)
+        if children is None:
             continue
-        children = sorted(
-            child.name for child in dir_path.iterdir() if not child.name.startswith(".")
-        )
-        items[dir_name] = children
+        items[dir_name] = [c.name for c in children if not c.name.startswith(".")]
     return _SyncManifest(items=items)
 
 
 def _save_manifest(dotfiles_dir: Path, manifest: _SyncManifest) -> None:
-    """Persist manifest to disk."""
+    """Persist manifest to disk: v2, compact, atomic, skipped when unchanged.
+
+    Each sync dir maps item name -> [digest, files, size, agents]; records of
+    names no longer in ``items`` are dropped.
+    """
     manifest_path = dotfiles_dir / MANIFEST_FILE
-    data = {
-        "version": manifest.version,
-        "items": {k: sorted(v) for k, v in manifest.items.items()},
+    data: dict[str, object] = {
+        "version": MANIFEST_VERSION,
+        "items": {
+            dir_name: {
+                name: manifest.encoded_record(f"{dir_name}/{name}")
+                for name in sorted(set(names))
+            }
+            for dir_name, names in sorted(manifest.items.items())
+        },
     }
-    manifest_path.write_text(
-        json.dumps(data, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
+    if manifest.fingerprint:
+        data["fingerprint"] = manifest.fingerprint
+    if manifest.synced:
+        data["synced"] = {
+            key: {"commit": st.commit, "dirty": list(st.dirty), "target": st.target}
+            for key, st in sorted(manifest.synced.items())
+        }
+    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False) + "\n"
+    if text == manifest._text:
+        return
+    _FS.write_bytes(manifest_path, text.encode())
+    manifest._text = text
+
+
+def _record_items(
+    manifest: _SyncManifest,
+    snapshot: "_SourceSnapshot",
+    in_sync: dict[str, set[str]],
+) -> None:
+    """Refresh the records of the snapshot's items after an apply.
+
+    ``in_sync`` maps agent key -> relative paths that match dotfiles in that
+    home after this run. An agent keeps its place in ``agents`` only while
+    the digest is unchanged and it was not part of this run.
+    """
+    for dir_items in snapshot.items.values():
+        for item in dir_items:
+            rel = item.relative_path
+            if item.is_directory:
+                files = [e for e in snapshot.trees.get(rel, ()) if e.kind == "f"]
+            else:
+                entry = snapshot.files.get(rel)
+                files = [entry] if entry is not None else []
+            digest = "" if _is_additive_item(rel) else snapshot.digest(item)
+            old = manifest.records.get(rel, _ManifestItem())
+            kept = old.agents if old.digest == digest else ()
+            agents = {key for key in kept if key not in in_sync}
+            agents |= {key for key, paths in in_sync.items() if rel in paths}
+            manifest.records[rel] = _ManifestItem(
+                digest=digest,
+                files=len(files),
+                size=sum(e.size for e in files),
+                agents=tuple(sorted(agents)),
+            )
 
 
 def _convert_path(source_name: str) -> str:
@@ -445,8 +1127,216 @@ def _convert_path(source_name: str) -> str:
     return result
 
 
+_SPOKE_PREFIX = "docs/agents/"
+
+
+@dataclass(frozen=True)
+class _Template:
+    """A rendered source compiled once (internal use).
+
+    ``parts`` is the text split at every ``docs/agents/`` reference, so
+    rendering for an agent is a single join with its absolute prefix.
+    """
+
+    parts: tuple[str, ...]
+
+    @classmethod
+    def compile(cls, text: str) -> "_Template":
+        _count(read=len(text))
+        return cls(tuple(text.split(_SPOKE_PREFIX)))
+
+    def render(self, agent: AgentTarget) -> str:
+        return f"{agent.directory}/{_SPOKE_PREFIX}".join(self.parts)
+
+
+def _render_for_agent(text: str, agent: AgentTarget) -> str:
+    """Rewrite on-demand spoke references to the agent's absolute location.
+
+    The base/overlay/spoke prose references playbooks as `docs/agents/X.md`
+    (relative). When distributed globally, a relative path would resolve against
+    the working project, not the agent's home, so it is rewritten to an absolute
+    `<agent_home>/docs/agents/X.md`. Deterministic -> idempotent.
+    """
+    return _Template.compile(text).render(agent)
+
+
+def _encode_rendered(text: str) -> bytes:
+    """On-disk bytes of rendered text: UTF-8 with platform newlines.
+
+    Same bytes write_text(encoding="utf-8") produces, so digests of rendered
+    output compare against the written targets on every OS.
+    """
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
+
+
+@dataclass(frozen=True)
+class _SourceSnapshot:
+    """Immutable view of the dotfiles sync sources, scanned once per run.
+
+    Built by _scan_source and consumed by every planning function, so the
+    source tree is walked and the skills denylist parsed once per invocation
+    instead of once per agent. ``names`` holds every non-hidden child name
+    per sync dir (symlinks included -- they are valid items for deletion,
+    orphan and import decisions); ``items`` holds the syncable items
+    (symlinks skipped, skills gate applied). ``root_names`` holds the target
+    relative path of every ROOT_AGENTS_* entry, even when ``root_items`` is
+    limited to an incremental run's items. ``trees`` / ``files`` keep the
+    scanned stat data that ``digest`` turns into content digests.
+    """
+
+    dotfiles_dir: Path
+    skills_exclude: frozenset[str]
+    root_items: tuple[_SyncItem, ...]
+    root_names: frozenset[str]
+    names: dict[str, frozenset[str]]
+    items: dict[str, tuple[_SyncItem, ...]]
+    trees: dict[str, tuple[_TreeEntry, ...]]
+    files: dict[str, _TreeEntry]
+    index: _DigestIndex = field(compare=False, repr=False)
+    _digests: dict[str, str] = field(default_factory=dict, compare=False, repr=False)
+    _templates: dict[str, _Template] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    _rendered: dict[tuple[str, str], tuple[bytes, str]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def digest(self, item: _SyncItem) -> str:
+        """Content digest of a source item (tree digest for directories).
+
+        Items the scan did not stat (additive skills, or items built outside
+        this snapshot) fall back to a direct walk.
+        """
+        cached = self._digests.get(item.relative_path)
+        if cached is not None:
+            return cached
+        tree = self.trees.get(item.relative_path)
+        entry = self.files.get(item.relative_path)
+        if item.is_directory:
+            cached = (
+                _entries_digest(item.source, tree, self.index)
+                if tree is not None
+                else _tree_digest(item.source, self.index)
+            )
+        elif entry is not None:
+            cached = _cached_digest(
+                item.source, self.index, entry.size, entry.mtime_ns, entry.ino
+            )
+        else:
+            cached = _file_digest(item.source, self.index)
+        self._digests[item.relative_path] = cached
+        return cached
+
+    def rendered(self, source: Path, agent: AgentTarget) -> tuple[bytes, str]:
+        """Bytes a rendered source (base/overlay/spoke) is written as, + digest.
+
+        Each source content is compiled into a _Template once per run and its
+        rendering cached per (source digest, agent home), so planning and
+        applying all agents read and render every source once.
+        """
+        digest = _file_digest(source, self.index)
+        key = (digest, os.fspath(agent.directory))
+        cached = self._rendered.get(key)
+        if cached is None:
+            template = self._templates.get(digest)
+            if template is None:
+                template = _Template.compile(_FS.read_text(source, encoding="utf-8"))
+                self._templates[digest] = template
+            data = _encode_rendered(template.render(agent))
+            cached = self._rendered[key] = (data, hashlib.sha256(data).hexdigest())
+        return cached
+
+
+def _scan_source(
+    dotfiles_dir: Path,
+    index: _DigestIndex | None = None,
+    only: frozenset[str] | None = None,
+) -> _SourceSnapshot:
+    """Scan ROOT_AGENTS_* entries and the SYNC_DIRECTORIES trees in one pass.
+
+    One os.scandir walk captures names, types and (for items whose content is
+    ever compared) sizes, mtimes and inodes; the skills gate is evaluated from
+    the same walk. Additive skills are only compared by existence, so their
+    trees are walked for the SKILL.md gate without stat calls. With ``only``
+    (item relative paths, see --incremental) just those items are scanned;
+    ``names`` still lists every sync dir in full.
+    """
+    if index is None:
+        index = _DigestIndex(root=dotfiles_dir)
+    skills_exclude = _load_skills_sync_exclude(dotfiles_dir)
+    trees: dict[str, tuple[_TreeEntry, ...]] = {}
+    files: dict[str, _TreeEntry] = {}
+
+    def _item(entry: os.DirEntry, rel: str) -> _SyncItem:
+        is_directory = entry.is_dir()
+        if is_directory:
+            trees[rel] = _scan_tree(
+                Path(entry.path), with_stat=not _is_additive_item(rel)
+            )
+        else:
+            st = entry.stat()
+            _count(stat=1)
+            files[rel] = _TreeEntry(rel, "f", st.st_size, st.st_mtime_ns, st.st_ino)
+        return _SyncItem(
+            source=Path(entry.path), relative_path=rel, is_directory=is_directory
+        )
+
+    root_entries = [
+        e for e in _FS.scandir(dotfiles_dir) if e.name.startswith("ROOT_AGENTS_")
+    ]
+    root_names = frozenset(_convert_path(e.name) for e in root_entries)
+    root_items = tuple(
+        _item(e, _convert_path(e.name))
+        for e in root_entries
+        if only is None or _convert_path(e.name) in only
+    )
+
+    names: dict[str, frozenset[str]] = {}
+    items: dict[str, tuple[_SyncItem, ...]] = {}
+    for dir_name in SYNC_DIRECTORIES:
+        dir_path = dotfiles_dir / dir_name
+        if not _FS.is_dir(dir_path):
+            continue
+        children = [e for e in _FS.scandir(dir_path) if not e.name.startswith(".")]
+        names[dir_name] = frozenset(e.name for e in children)
+        dir_items: list[_SyncItem] = []
+        for entry in children:
+            rel = f"{dir_name}/{entry.name}"
+            if entry.is_symlink() or (only is not None and rel not in only):
+                continue
+            if dir_name == "skills":
+                # Skills gate (see _is_syncable_skill): denylisted names and
+                # children without any SKILL.md are not skills.
+                if entry.name in skills_exclude or not entry.is_dir():
+                    continue
+                item = _item(entry, rel)
+                if not any(e.rel.rsplit("/", 1)[-1] == "SKILL.md" for e in trees[rel]):
+                    del trees[rel]
+                    continue
+            else:
+                item = _item(entry, rel)
+            dir_items.append(item)
+        items[dir_name] = tuple(dir_items)
+
+    return _SourceSnapshot(
+        dotfiles_dir=dotfiles_dir,
+        skills_exclude=skills_exclude,
+        root_items=root_items,
+        root_names=root_names,
+        names=names,
+        items=items,
+        trees=trees,
+        files=files,
+        index=index,
+    )
+
+
 def _get_directory_items(
-    dotfiles_dir: Path, directories: list[str] | None = None
+    dotfiles_dir: Path,
+    directories: list[str] | None = None,
+    snapshot: _SourceSnapshot | None = None,
 ) -> list[_SyncItem]:
     """Get individual items within sync directories as sync items.
 
@@ -454,108 +1344,289 @@ def _get_directory_items(
     child item (e.g. skills/tdd-workflow, skills/brand-legal-review)
     individually. This preserves unmanaged items in the target.
     """
-    sources: list[_SyncItem] = []
-    skills_exclude = _load_skills_sync_exclude(dotfiles_dir)
-    for dir_name in directories or SYNC_DIRECTORIES:
-        dir_path = dotfiles_dir / dir_name
-        if not dir_path.is_dir():
-            continue
-        for child in dir_path.iterdir():
-            if child.name.startswith("."):
-                continue
-            if child.is_symlink():
-                continue
-            if dir_name == "skills" and not _is_syncable_skill(
-                child, child.name, skills_exclude
-            ):
-                continue
-            rel_path = f"{dir_name}/{child.name}"
-            sources.append(
-                _SyncItem(
-                    source=child,
-                    relative_path=rel_path,
-                    is_directory=child.is_dir(),
-                )
-            )
-    return sources
+    if snapshot is None:
+        snapshot = _scan_source(dotfiles_dir)
+    return [
+        item
+        for dir_name in directories or SYNC_DIRECTORIES
+        for item in snapshot.items.get(dir_name, ())
+    ]
 
 
 def _get_additional_sources(
-    dotfiles_dir: Path, directories: list[str] | None = None
+    dotfiles_dir: Path,
+    directories: list[str] | None = None,
+    snapshot: _SourceSnapshot | None = None,
 ) -> list[_SyncItem]:
     """Get all ROOT_AGENTS_* files/directories and sync directory contents."""
+    if snapshot is None:
+        snapshot = _scan_source(dotfiles_dir)
     target_dirs = directories or SYNC_DIRECTORIES
     sources: list[_SyncItem] = []
 
     # Legacy: ROOT_AGENTS_* files and directories
     if directories is None:
         # Only include ROOT_AGENTS_* when using default directories
-        for item in dotfiles_dir.iterdir():
-            if item.name.startswith("ROOT_AGENTS_"):
-                rel_path = _convert_path(item.name)
-                sources.append(
-                    _SyncItem(
-                        source=item,
-                        relative_path=rel_path,
-                        is_directory=item.is_dir(),
-                    )
-                )
+        sources.extend(snapshot.root_items)
 
     # Direct directory structure (commands/, skills/, agents/)
-    sources.extend(_get_directory_items(dotfiles_dir, target_dirs))
+    sources.extend(_get_directory_items(dotfiles_dir, target_dirs, snapshot))
 
     return sorted(sources, key=lambda x: x.relative_path)
 
 
-def _compare_files(source: Path, target: Path) -> bool:
-    """Compare two files. Returns True if identical."""
-    if not target.exists():
-        return False
-    return filecmp.cmp(source, target, shallow=False)
-
+def _stat_signature(
+    path: Path, fs: "_DiskFS | None" = None
+) -> tuple[int, int, int, int] | None:
+    """(mode, size, mtime_ns, inode) of path itself (not followed), or None."""
+    _count(stat=1)
+    try:
+        st = (fs or _FS).lstat(path)
+    except OSError:
+        return None
+    return (st.st_mode, st.st_size, st.st_mtime_ns, st.st_ino)
 
-def _compare_directories(source: Path, target: Path) -> bool:
-    """Compare two directories recursively. Returns True if identical.
 
-    Excluded items (e.g. workspace dirs in learned/) are ignored in comparison.
+def _sync_fingerprint(
+    dotfiles_dir: Path,
+    snapshot: _SourceSnapshot,
+    manifest: _SyncManifest,
+    agents: list[AgentTarget],
+    exclude_dirs: frozenset[str] = frozenset(),
+    link_mode: str = "copy",
+    system: str | None = None,
+) -> str:
+    """One digest over everything a sync run's outcome depends on.
+
+    Covers the run's options, this script, the manifest items, the source
+    snapshot (names and scanned stat data), the base/overlay files, the raw
+    bytes of every settings fragment layer, and for each agent the stat
+    state of what sync manages there (_target_state_digest, plus any root
+    item landing elsewhere). Stat data only -- nothing is hashed beyond the
+    small fragment files -- so an unchanged world is recognized without any
+    per-item comparison.
     """
-    if not target.exists():
-        return False
+    digest = hashlib.sha256()
+
+    def _feed(*parts: object) -> None:
+        digest.update(repr(parts).encode())
+        digest.update(b"\0")
+
+    _feed(
+        MANIFEST_VERSION,
+        link_mode,
+        sorted(exclude_dirs),
+        system or platform.system(),
+        _stat_signature(Path(__file__), _DISK_FS),
+    )
+    _feed(sorted((k, sorted(v)) for k, v in manifest.items.items()))
+    _feed(sorted(snapshot.skills_exclude))
+    _feed(sorted((k, sorted(v)) for k, v in snapshot.names.items()))
+    for name in (BASE_FILE, OVERLAY_FILE):
+        _feed(name, _stat_signature(dotfiles_dir / name))
+    for dir_items in (snapshot.root_items, *snapshot.items.values()):
+        for item in dir_items:
+            rel = item.relative_path
+            _feed(rel, snapshot.trees.get(rel), snapshot.files.get(rel))
+    layers = [
+        c.path
+        for directory, pattern in (
+            (".claude", "settings*.json"),
+            (PROFILE_SETTINGS_DIR, "*.json"),
+        )
+        for c in _list_dir(dotfiles_dir / directory) or ()
+        if fnmatch.fnmatchcase(c.name, pattern)
+    ]
+    for layer in sorted(layers):
+        _feed(layer.relative_to(dotfiles_dir).as_posix(), _FS.read_bytes(layer))
 
-    dcmp = filecmp.dircmp(source, target)
+    for agent in agents:
+        _feed(agent, _target_state_digest(agent))
+        for item in snapshot.root_items:
+            if not item.relative_path.startswith(_TARGET_STATE_PREFIXES):
+                target = agent.directory / item.relative_path
+                _feed(item.relative_path, _stat_signature(target))
+    return digest.hexdigest()
 
-    dir_name = source.name
-    left_only = [f for f in dcmp.left_only if not _is_excluded_child(dir_name, f)]
-    right_only = [f for f in dcmp.right_only if not _is_excluded_child(dir_name, f)]
 
-    if left_only or right_only or dcmp.diff_files:
-        return False
+# Agent-home trees whose stat state _target_state_digest records: the sync dirs
+# plus where ROOT_AGENTS_* items land (hooks/, docs/agents/ spokes).
+_TARGET_STATE_DIRS = (*SYNC_DIRECTORIES, "hooks", "docs/agents")
+_TARGET_STATE_PREFIXES = tuple(f"{d}/" for d in _TARGET_STATE_DIRS)
 
-    for subdir in dcmp.common_dirs:
-        if _is_excluded_child(dir_name, subdir):
-            continue
-        if not _compare_directories(source / subdir, target / subdir):
-            return False
 
-    return True
+def _target_state_digest(agent: AgentTarget) -> str:
+    """Stat-only digest of everything sync manages in one agent home.
 
+    Main files, settings files and every _TARGET_STATE_DIRS tree; a home
+    edited, added to or pruned by anything else since it was recorded
+    digests differently.
+    """
+    home = agent.directory
+    digest = hashlib.sha256()
+    for name in (agent.main_file, agent.base_secondary):
+        if name is not None:
+            digest.update(repr((name, _stat_signature(home / name))).encode())
+    for dir_name in _TARGET_STATE_DIRS:
+        tree = home / dir_name
+        state = _scan_tree(tree) if _FS.is_dir(tree) else None
+        digest.update(repr((dir_name, state)).encode())
+    for name in ("settings.json", MACHINE_LOCAL_SETTINGS):
+        digest.update(repr((name, _stat_signature(home / name))).encode())
+    return digest.hexdigest()
+
+
+def _git(dotfiles_dir: Path, *args: str) -> str | None:
+    """Run git in dotfiles_dir; stdout, or None if git or the repo is unavailable."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(dotfiles_dir), *args],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    return result.stdout if result.returncode == 0 else None
 
-def _get_newest_mtime(path: Path) -> float:
-    """Get the newest modification time of any file in a path (recursively)."""
-    if path.is_file():
-        return path.stat().st_mtime
-    newest = 0.0
-    for child in path.rglob("*"):
-        if child.is_file():
-            mtime = child.stat().st_mtime
-            newest = max(newest, mtime)
-    return newest
 
+def _git_changed_paths(dotfiles_dir: Path, base: str) -> frozenset[str] | None:
+    """Paths (relative to dotfiles_dir) differing from commit ``base``.
 
-def _build_deletion_plan(
-    dotfiles_dir: Path, agent: AgentTarget, manifest: _SyncManifest
-) -> list[_DeleteAction]:
-    """Detect items in manifest but not in dotfiles: should be deleted from targets."""
+    Working tree vs base (staged and unstaged, renames split into delete +
+    add) plus untracked, non-ignored files. None when git cannot answer
+    (no repo, unknown commit after a rewrite, ...).
+    """
+    diff = _git(
+        dotfiles_dir, "diff", "--name-only", "-z", "--no-renames", "--relative", base
+    )
+    untracked = _git(dotfiles_dir, "ls-files", "--others", "--exclude-standard", "-z")
+    if diff is None or untracked is None:
+        return None
+    return frozenset(p for p in f"{diff}\0{untracked}".split("\0") if p)
+
+
+def _git_state(dotfiles_dir: Path) -> tuple[str, frozenset[str]] | None:
+    """(HEAD commit, uncommitted paths) of the dotfiles checkout, or None."""
+    head = _git(dotfiles_dir, "rev-parse", "HEAD")
+    if head is None:
+        return None
+    dirty = _git_changed_paths(dotfiles_dir, "HEAD")
+    if dirty is None:
+        return None
+    return head.strip(), dirty
+
+
+def _changed_items(paths: frozenset[str]) -> frozenset[str] | None:
+    """Map changed dotfiles paths to the sync items they belong to.
+
+    ROOT_AGENTS_* paths go through _convert_path; paths under a sync dir
+    select its top-level child. None means "cannot tell, scan everything":
+    a change to a sync dir entry itself (the skills submodule gitlink) or to
+    the skills denylist. Everything else (base/overlay, always planned;
+    settings fragments, merged on every run; unrelated repo files) selects
+    nothing.
+    """
+    items: set[str] = set()
+    for path in paths:
+        head, _, rest = path.partition("/")
+        if head.startswith("ROOT_AGENTS_"):
+            items.add(_convert_path(head))
+        elif head in SYNC_DIRECTORIES:
+            if not rest:
+                return None
+            items.add(f"{head}/{rest.split('/')[0]}")
+        elif path == SKILLS_SYNC_EXCLUDE_FILE:
+            return None
+    return frozenset(items)
+
+
+def _incremental_items(
+    dotfiles_dir: Path, manifest: _SyncManifest, agents: list[AgentTarget]
+) -> tuple[frozenset[str] | None, str]:
+    """Items to plan for --incremental, or (None, reason) for a full scan.
+
+    Every selected agent must have been completely synced from the same
+    commit + dirty set, and its home must be untouched since
+    (_target_state_digest): then only git's changed paths can differ.
+    """
+    states = [manifest.synced.get(agent.key) for agent in agents]
+    bases = {(st.commit, st.dirty) for st in states if st is not None}
+    if not agents or None in states or len(bases) != 1:
+        return None, "no common previous sync for the selected targets"
+    for agent, state in zip(agents, states):
+        if state is not None and _target_state_digest(agent) != state.target:
+            return None, f"{agent.name} was modified since the last sync"
+    ((commit, dirty),) = bases
+    changed = _git_changed_paths(dotfiles_dir, commit)
+    if changed is None:
+        return None, f"git cannot diff against {commit[:12]}"
+    items = _changed_items(changed | frozenset(dirty))
+    if items is None:
+        return None, "a sync dir or the skills denylist changed"
+    return items, ""
+
+
+def _compare_files(source: Path, target: Path) -> bool:
+    """Compare two files. Returns True if identical."""
+    if not _FS.exists(target):
+        return False
+    return _same_content(source, target)
+
+
+def _trees_equal(
+    source: Path,
+    source_entries: tuple[_TreeEntry, ...],
+    target: Path,
+    target_entries: tuple[_TreeEntry, ...],
+) -> bool:
+    """Compare two _scan_tree snapshots like dircmp, without walking again.
+
+    Same relative paths and kinds, and per file the dircmp shallow rule: equal
+    size and mtime means equal; equal size otherwise falls back to a content
+    comparison (_same_content).
+    """
+    if len(source_entries) != len(target_entries):
+        return False
+    for left, right in zip(source_entries, target_entries):
+        if left.rel != right.rel or left.kind != right.kind:
+            return False
+        if left.kind != "f" or (left.size, left.mtime_ns) == (
+            right.size,
+            right.mtime_ns,
+        ):
+            continue
+        if left.size != right.size or not _same_content(
+            source / left.rel, target / right.rel
+        ):
+            return False
+    return True
+
+
+def _newest_mtime_ns(entries: tuple[_TreeEntry, ...]) -> int:
+    """Newest file mtime in a _scan_tree snapshot (0 for a tree without files)."""
+    return max((e.mtime_ns for e in entries if e.kind == "f"), default=0)
+
+
+def _compare_directories(source: Path, target: Path) -> bool:
+    """Compare two directories recursively. Returns True if identical.
+
+    Excluded items (e.g. workspace dirs in learned/) are ignored in comparison.
+    """
+    if not _FS.exists(target):
+        return False
+    return _trees_equal(source, _scan_tree(source), target, _scan_tree(target))
+
+
+def _build_deletion_plan(
+    dotfiles_dir: Path,
+    agent: AgentTarget,
+    manifest: _SyncManifest,
+    snapshot: _SourceSnapshot | None = None,
+) -> list[_DeleteAction]:
+    """Detect items in manifest but not in dotfiles: should be deleted from targets."""
+    if snapshot is None:
+        snapshot = _scan_source(dotfiles_dir)
     deletions: list[_DeleteAction] = []
 
     for dir_name in agent.get_sync_directories():
@@ -563,25 +1634,22 @@ def _build_deletion_plan(
         if dir_name in ADDITIVE_DIRECTORIES:
             continue
         manifest_items = set(manifest.items.get(dir_name, []))
-        dotfiles_dir_path = dotfiles_dir / dir_name
-        dotfiles_items: set[str] = set()
-        if dotfiles_dir_path.is_dir():
-            dotfiles_items = {
-                c.name
-                for c in dotfiles_dir_path.iterdir()
-                if not c.name.startswith(".")
-            }
+        dotfiles_items = snapshot.names.get(dir_name, frozenset())
 
         deleted_items = manifest_items - dotfiles_items
+        if not deleted_items:
+            continue
 
+        # One listing of the target dir instead of stat calls per item.
+        children = {c.name: c for c in _list_dir(agent.directory / dir_name) or ()}
         for item_name in sorted(deleted_items):
-            target_path = agent.directory / dir_name / item_name
-            if target_path.exists() or target_path.is_symlink():
+            child = children.get(item_name)
+            if child is not None:
                 deletions.append(
                     _DeleteAction(
-                        target=target_path,
+                        target=child.path,
                         relative_path=f"{dir_name}/{item_name}",
-                        is_directory=target_path.is_dir(),
+                        is_directory=child.is_dir,
                     )
                 )
 
@@ -589,7 +1657,10 @@ def _build_deletion_plan(
 
 
 def _detect_target_only_items(
-    dotfiles_dir: Path, agent: AgentTarget, manifest: _SyncManifest
+    dotfiles_dir: Path,
+    agent: AgentTarget,
+    manifest: _SyncManifest,
+    snapshot: _SourceSnapshot | None = None,
 ) -> list[_DeleteAction]:
     """Detect items in target directories that exist only in the target.
 
@@ -600,6 +1671,8 @@ def _detect_target_only_items(
     Internal symlinks (e.g., learned skill links created by _link_learned_skills)
     are excluded since they are auto-managed.
     """
+    if snapshot is None:
+        snapshot = _scan_source(dotfiles_dir)
     orphans: list[_DeleteAction] = []
 
     for dir_name in agent.get_sync_directories():
@@ -608,36 +1681,31 @@ def _detect_target_only_items(
         if dir_name in ADDITIVE_DIRECTORIES:
             continue
         target_dir = agent.directory / dir_name
-        source_dir = dotfiles_dir / dir_name
-
-        if not target_dir.is_dir():
+        children = _list_dir(target_dir)
+        if children is None:
             continue
 
         # All source names (including symlinks — they represent valid items)
-        source_names: set[str] = set()
-        if source_dir.is_dir():
-            for child in source_dir.iterdir():
-                if not child.name.startswith("."):
-                    source_names.add(child.name)
+        source_names = snapshot.names.get(dir_name, frozenset())
 
         # Manifest-tracked items (handled by _build_deletion_plan)
         manifest_items = set(manifest.items.get(dir_name, []))
 
-        for child in sorted(target_dir.iterdir(), key=lambda p: p.name):
+        for child in children:
             if child.name.startswith("."):
                 continue
-            # Skip internal symlinks (managed by _link_learned_skills)
-            if child.is_symlink() and _is_internal_symlink(child, target_dir):
-                continue
             # Skip items that exist in source or are manifest-tracked
             if child.name in source_names or child.name in manifest_items:
                 continue
+            # Skip internal symlinks (managed by _link_learned_skills)
+            if child.is_symlink and _is_internal_symlink(child.path, target_dir):
+                continue
 
             orphans.append(
                 _DeleteAction(
-                    target=child,
+                    target=child.path,
                     relative_path=f"{dir_name}/{child.name}",
-                    is_directory=child.is_dir() and not child.is_symlink(),
+                    is_directory=child.is_dir and not child.is_symlink,
                     reason="orphan",
                 )
             )
@@ -646,7 +1714,9 @@ def _detect_target_only_items(
 
 
 def _detect_managed_dir_orphans(
-    agent: AgentTarget, additional_sources: list[_SyncItem]
+    agent: AgentTarget,
+    additional_sources: list[_SyncItem],
+    snapshot: _SourceSnapshot | None = None,
 ) -> list[_DeleteAction]:
     """Detect distributed spoke/hook files no longer backed by a source.
 
@@ -654,7 +1724,15 @@ def _detect_managed_dir_orphans(
     are fully sync-owned: a file there whose ROOT_AGENTS_* source was renamed or
     removed is an orphan to delete, so stale spokes/hooks do not linger. These
     dirs are NOT manifest-tracked; the current source set is the source of truth.
+    With ``snapshot``, that set is its full ``root_names``: an incremental
+    snapshot's ``root_items`` (hence ``additional_sources``) omit unchanged
+    sources, which are not orphans.
     """
+    source_paths = (
+        snapshot.root_names
+        if snapshot is not None
+        else {item.relative_path for item in additional_sources}
+    )
     managed_dirs = ["docs/agents"]
     if agent.receives_hooks:
         managed_dirs.append("hooks")
@@ -663,91 +1741,904 @@ def _detect_managed_dir_orphans(
     for mdir in managed_dirs:
         prefix = f"{mdir}/"
         expected = {
-            item.relative_path[len(prefix) :]
-            for item in additional_sources
-            if item.relative_path.startswith(prefix)
+            path[len(prefix) :] for path in source_paths if path.startswith(prefix)
         }
-        target_dir = agent.directory / mdir
-        if not target_dir.is_dir():
-            continue
-        for child in sorted(target_dir.iterdir(), key=lambda p: p.name):
+        for child in _list_dir(agent.directory / mdir) or ():
             if child.name.startswith(".") or child.name in expected:
                 continue
             orphans.append(
                 _DeleteAction(
-                    target=child,
+                    target=child.path,
                     relative_path=f"{mdir}/{child.name}",
-                    is_directory=child.is_dir() and not child.is_symlink(),
+                    is_directory=child.is_dir and not child.is_symlink,
                     reason="orphan",
                 )
             )
     return orphans
 
 
-def _sync_file(source: Path, target: Path) -> None:
-    """Sync a single file."""
-    target.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(source, target)
+# How non-rendered files reach their destination. "copy" is a plain copy2;
+# "reflink" clones extents (FICLONE, then copy_file_range) so homes on btrfs/xfs
+# share blocks until written; "hardlink" shares the inode itself. Both fall
+# back to copy2 when the filesystem refuses. "store" hardlinks every home to
+# one immutable object per unique content in OBJECT_STORE_DIR (see below).
+# Rendered items (base/overlay/spokes) are per-agent content and are always
+# written out.
+LinkMode = Literal["copy", "reflink", "hardlink", "store"]
+LINK_MODES: tuple[LinkMode, ...] = ("copy", "reflink", "hardlink", "store")
+_FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+# Content-addressed object store for link_mode="store", git-style fan-out:
+# <store>/<sha256[:2]>/<sha256>[.x]. ".x" marks executable content (hardlinks
+# share their mode, so the same bytes with and without +x are two objects).
+# Objects are written once and made read-only (every home shares the inode,
+# so an in-place edit in one home would silently change the object for all);
+# an object no home links to any more (st_nlink == 1) is garbage-collected by
+# orphans_mode. On Windows the read-only attribute would also block unlinking
+# each link, so objects stay writable there.
+OBJECT_STORE_DIR = Path.home() / ".agents" / ".objects"
+
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2  # linux/fs.h: renameat2() flag, atomically swap two paths
+
+
+@functools.cache
+def _load_libc() -> ctypes.CDLL | None:
+    """The C library, for Linux syscalls os does not wrap; None elsewhere.
+
+    Callers check for the symbol they need (inotify_init1, renameat2,
+    syncfs): older or non-glibc libcs may lack some of them.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+
+
+def _reflink_file(source: Path, target: Path) -> bool:
+    """Clone source into target without copying through userspace.
+
+    Tries the FICLONE ioctl (shared extents), then os.copy_file_range (which
+    the kernel may also turn into a clone or a server-side copy). Returns
+    False when neither is available so the caller can fall back to copy2.
+    """
+    if fcntl is None:
+        return False
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return True
+            except OSError:
+                pass
+            copy_file_range = getattr(os, "copy_file_range", None)
+            if copy_file_range is None:
+                return False
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    return False
+                remaining -= copied
+            return True
+    except OSError:
+        return False
+
+
+def _seal_object(path: Path, st: os.stat_result) -> None:
+    """Drop every write bit of a store object (POSIX only, see above)."""
+    if sys.platform != "win32" and st.st_mode & 0o222:
+        os.chmod(path, stat.S_IMODE(st.st_mode) & ~0o222)
+
+
+def _unseal_copy(path: Path) -> None:
+    """Give the owner write access to a file or tree copied out of a home.
+
+    Copies keep the source's mode, so a file cloned from a sealed object
+    would land in dotfiles read-only.
+    """
+    for item in [path, *path.rglob("*")] if path.is_dir() else [path]:
+        st = item.lstat()
+        if stat.S_ISREG(st.st_mode) and not st.st_mode & stat.S_IWUSR:
+            os.chmod(item, stat.S_IMODE(st.st_mode) | stat.S_IWUSR)
+
 
+def _store_object(source: Path, store: Path, index: _DigestIndex | None = None) -> Path:
+    """Return the store object holding source's content, ingesting it if new.
 
-def _sync_directory(source: Path, target: Path) -> None:
-    """Sync a directory (copy with overwrite).
+    source's digest comes from ``index`` (the dotfiles digest cache the plan
+    filled) when given, so linking already-stored content reads no bytes. A
+    new object is cloned into a temp file, hashed from that copy (so its
+    name always matches what was stored, even if source changes meanwhile),
+    made read-only and renamed into place; concurrent ingests of the same
+    content race harmlessly on the final os.replace.
+    """
+    st = source.stat()
+    suffix = ".x" if st.st_mode & 0o111 else ""
+    if index is not None:
+        digest = _file_digest(source, index, st)
+    else:
+        digest = _hash_file(source)
+    obj = store / digest[:2] / f"{digest}{suffix}"
+    try:
+        _seal_object(obj, obj.stat())  # objects stored before sealing existed
+        return obj
+    except FileNotFoundError:
+        pass
+    store.mkdir(parents=True, exist_ok=True)
+    tmp = store / f".ingest-{os.getpid()}-{threading.get_ident()}.tmp"
+    _copy_file(source, tmp, "reflink")
+    digest = _hash_file(tmp)
+    obj = store / digest[:2] / f"{digest}{suffix}"
+    obj.parent.mkdir(exist_ok=True)
+    _seal_object(tmp, tmp.stat())
+    os.replace(tmp, obj)
+    return obj
+
+
+def _gc_object_store(store: Path) -> tuple[int, int]:
+    """Remove objects no agent home links to any more (st_nlink == 1).
+
+    Returns (objects removed, bytes freed). In-flight ingest temp files
+    (dot-prefixed) are left alone.
+    """
+    removed = freed = 0
+    if not store.is_dir():
+        return removed, freed
+    for fanout in sorted(store.iterdir()):
+        if not fanout.is_dir() or fanout.name.startswith("."):
+            continue
+        for obj in sorted(fanout.iterdir()):
+            st = obj.lstat()
+            if st.st_nlink == 1:
+                obj.unlink()
+                removed += 1
+                freed += st.st_size
+        if not any(fanout.iterdir()):
+            fanout.rmdir()
+    return removed, freed
+
+
+def _copy_file(
+    source: Path,
+    target: Path,
+    link_mode: LinkMode = "copy",
+    index: _DigestIndex | None = None,
+) -> None:
+    """Put source's content at target using the requested link mode.
 
-    Preserves excluded items (e.g. workspace dirs) in the target.
+    An existing target is unlinked first when linking/cloning, or when it
+    shares its inode with other paths, so a write never lands in a file that
+    another agent home (or dotfiles itself) also points at. ``index`` is the
+    source digest cache, which names store objects without re-hashing.
     """
-    if target.is_symlink():
-        target.unlink()
-        shutil.copytree(source, target, ignore=_make_copytree_ignore())
+    try:
+        if link_mode != "copy" or target.lstat().st_nlink > 1:
+            target.unlink()
+    except FileNotFoundError:
+        pass
+    if link_mode in ("hardlink", "store"):
+        try:
+            linked = (
+                source
+                if link_mode == "hardlink"
+                else _store_object(source, OBJECT_STORE_DIR, index)
+            )
+            os.link(linked, target)
+            return
+        except OSError:
+            pass  # cross-device, unsupported or link-count limit: copy instead
+    elif link_mode == "reflink" and _reflink_file(source, target):
+        shutil.copystat(source, target)
         return
+    shutil.copy2(source, target)
+    if _TIMINGS is not None:
+        _count(written=target.stat().st_size)
 
-    if target.exists():
-        # Preserve excluded items in a temp directory before replacing
-        preserved: list[tuple[str, Path]] = []
-        tmp_dir: Path | None = None
-
-        for child in target.iterdir():
-            if _is_excluded_child(target.name, child.name):
-                if tmp_dir is None:
-                    tmp_dir = Path(tempfile.mkdtemp(prefix="sync-preserve-"))
-                tmp_path = tmp_dir / child.name
-                shutil.move(str(child), str(tmp_path))
-                preserved.append((child.name, tmp_path))
-
-        shutil.rmtree(target)
-        shutil.copytree(source, target, ignore=_make_copytree_ignore())
-
-        # Restore preserved items
-        for name, tmp_path in preserved:
-            dest = target / name
-            if not dest.exists():
-                shutil.move(str(tmp_path), str(dest))
-            else:
-                shutil.rmtree(tmp_path) if tmp_path.is_dir() else tmp_path.unlink()
 
-        # Clean up temp dir
-        if tmp_dir is not None and tmp_dir.exists():
-            shutil.rmtree(tmp_dir)
+def _copytree(source: Path, target: Path, link_mode: LinkMode = "copy") -> None:
+    """copytree a directory item (excluded children skipped) in link_mode."""
+    shutil.copytree(
+        source,
+        target,
+        ignore=_make_copytree_ignore(),
+        copy_function=lambda s, d: _copy_file(Path(s), Path(d), link_mode),
+    )
+
+
+def _stage_path(target: Path) -> Path:
+    """Sibling temp path for building target's replacement.
+
+    Same directory, so the final rename never crosses filesystems; dot-prefixed
+    so a leftover from a crash is skipped by every scan and orphan check.
+    """
+    return target.with_name(
+        f".{target.name}.sync-{os.getpid()}-{threading.get_ident()}.tmp"
+    )
+
+
+def _replace_path(target: Path, write: Callable[[Path], None]) -> None:
+    """Write a file item at a staged path, then rename it over target."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _stage_path(target)
+    try:
+        write(tmp)
+        if target.is_dir() and not target.is_symlink():
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _sync_file(
+    source: Path,
+    target: Path,
+    link_mode: LinkMode = "copy",
+    written: list[Path] | None = None,
+    source_index: _DigestIndex | None = None,
+) -> None:
+    """Sync a single file (staged, then renamed into place)."""
+    _replace_path(target, lambda tmp: _copy_file(source, tmp, link_mode, source_index))
+    if written is not None:
+        written.append(target)
+
+
+def _remove_path(path: Path) -> None:
+    """Remove a file, symlink or directory tree."""
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
     else:
-        shutil.copytree(source, target, ignore=_make_copytree_ignore())
+        path.unlink()
+
+
+def _stage_tree(
+    source: Path,
+    live: Path | None,
+    stage: Path,
+    final: Path,
+    link_mode: LinkMode,
+    written: list[Path],
+    keep: list[tuple[Path, Path]],
+    source_index: _DigestIndex | None = None,
+    target_index: _DigestIndex | None = None,
+) -> None:
+    """Build the new content of the directory ``final`` at ``stage``.
+
+    Files whose content digest equals the ``live`` tree's (see _same_content)
+    are hardlinked from it (no data is copied); changed and new files are
+    copied in link_mode and recorded in ``written`` under their final path.
+    Excluded live children are collected in ``keep`` as (live, staged) paths
+    to move over.
+    """
+    stage.mkdir()
+    live_children = {c.name: c for c in _list_dir(live) or ()} if live else {}
+    with os.scandir(source) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if _is_excluded_child(final.name, entry.name):
+            continue
+        dest = stage / entry.name
+        old = live_children.get(entry.name)
+        if entry.is_dir():
+            old_dir = old.path if old and old.is_dir and not old.is_symlink else None
+            _stage_tree(
+                Path(entry.path),
+                old_dir,
+                dest,
+                final / entry.name,
+                link_mode,
+                written,
+                keep,
+                source_index,
+                target_index,
+            )
+            continue
+        if (
+            old is not None
+            and old.exists
+            and not (old.is_symlink or old.is_dir)
+            and _same_content(Path(entry.path), old.path, source_index, target_index)
+        ):
+            try:
+                os.link(old.path, dest)
+                continue
+            except OSError:
+                pass  # no hardlinks here: copy like a changed file
+        _copy_file(Path(entry.path), dest, link_mode, source_index)
+        written.append(final / entry.name)
+    keep.extend(
+        (child.path, stage / name)
+        for name, child in live_children.items()
+        if _is_excluded_child(final.name, name)
+    )
+
+
+def _rename_exchange(a: Path, b: Path) -> bool:
+    """Atomically swap two paths (renameat2 RENAME_EXCHANGE); False if unsupported."""
+    libc = _load_libc()
+    if libc is None or not hasattr(libc, "renameat2"):
+        return False
+    return (
+        libc.renameat2(
+            _AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE
+        )
+        == 0
+    )
+
+
+def _sync_directory(
+    source: Path,
+    target: Path,
+    link_mode: LinkMode = "copy",
+    written: list[Path] | None = None,
+    source_index: _DigestIndex | None = None,
+    target_index: _DigestIndex | None = None,
+) -> None:
+    """Sync a directory item by staging its new tree and swapping it in.
+
+    The new tree is built next to the target (see _stage_tree): unchanged
+    files are hardlinked from the live tree, so only what differs is
+    written, and files or directories missing from the source are simply
+    not staged. Excluded items (e.g. workspace dirs) are never copied; the
+    live ones are moved into the new tree just before the swap (and back if
+    it fails). The swap is one renameat2 RENAME_EXCHANGE where available
+    (rename aside + rename in otherwise), which also replaces a file or
+    symlink target, so agents see the old or the new item, never a
+    half-written or missing one, and a crash mid-copy leaves the live item
+    intact. Unchanged means equal content digests, served from the plan's
+    ``source_index`` / ``target_index`` when given.
+    """
+    if written is None:
+        written = []
+    live = target if target.is_dir() and not target.is_symlink() else None
+    stage = _stage_path(target)
+    keep: list[tuple[Path, Path]] = []
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        _stage_tree(
+            source,
+            live,
+            stage,
+            target,
+            link_mode,
+            written,
+            keep,
+            source_index,
+            target_index,
+        )
+    except BaseException:
+        shutil.rmtree(stage, ignore_errors=True)
+        raise
+
+    moved: list[tuple[Path, Path]] = []
+    try:
+        for kept, staged in keep:
+            os.rename(kept, staged)
+            moved.append((kept, staged))
+        old = _swap_in(stage, target)
+    except BaseException:
+        for kept, staged in reversed(moved):
+            os.rename(staged, kept)
+        shutil.rmtree(stage, ignore_errors=True)
+        raise
+    written.append(target)
+    if old is not None:
+        _remove_path(old)
+
+
+def _swap_in(stage: Path, target: Path) -> Path | None:
+    """Put ``stage`` at ``target``; return where the old item now is, if any.
+
+    On failure the old item is back at ``target`` and ``stage`` is unmoved.
+    """
+    if not os.path.lexists(target):
+        os.rename(stage, target)
+        return None
+    if _rename_exchange(stage, target):
+        return stage
+    aside = stage.with_name(f"{stage.name}.old")
+    os.rename(target, aside)
+    try:
+        os.rename(stage, target)
+    except BaseException:
+        os.rename(aside, target)
+        raise
+    return aside
+
+
+def _flush_writes(paths: list[Path]) -> None:
+    """Make an agent's applied writes durable with as few blocking calls as possible.
+
+    One syncfs per filesystem where available (Linux); otherwise fsync each
+    written file, then each distinct parent directory (renames live there).
+    Platforms that cannot fsync a path opened read-only are skipped.
+    """
+    if not paths:
+        return
+    libc = _load_libc()
+    if libc is not None and hasattr(libc, "syncfs"):
+        roots: dict[int, Path] = {}
+        for path in paths:
+            with contextlib.suppress(OSError):
+                roots.setdefault(os.stat(path.parent).st_dev, path.parent)
+        for root in roots.values():
+            fd = os.open(root, os.O_RDONLY)
+            try:
+                libc.syncfs(fd)
+            finally:
+                os.close(fd)
+        return
+    for path in [*paths, *sorted({p.parent for p in paths})]:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue  # removed since, or a directory on Windows
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+# --- Filesystem backends (disk / in memory) ---
+
+
+class _DiskFS:
+    """Filesystem backend for the real disk (the default).
+
+    Planning reads (directory listings, stats, file contents) and every
+    mutation the apply makes go through one of these methods -- via the
+    active backend _FS, or the ``fs`` argument of the apply functions -- so
+    an in-memory backend (_MemoryFS) can stand in for the disk.
+    """
+
+    simulated = False
+
+    def scandir(self, path: Path | str) -> list[os.DirEntry]:
+        """A directory's children sorted by name (raises like os.scandir)."""
+        with os.scandir(path) as it:
+            return sorted(it, key=lambda e: e.name)
+
+    def stat(self, path: Path) -> os.stat_result:
+        return path.stat()
+
+    def lstat(self, path: Path) -> os.stat_result:
+        return path.lstat()
+
+    def exists(self, path: Path) -> bool:
+        return path.exists()
+
+    def is_dir(self, path: Path) -> bool:
+        return path.is_dir()
+
+    def is_file(self, path: Path) -> bool:
+        return path.is_file()
+
+    def is_symlink(self, path: Path) -> bool:
+        return path.is_symlink()
+
+    def resolve(self, path: Path) -> Path:
+        return path.resolve()
+
+    def open(self, path: Path) -> BinaryIO:
+        return path.open("rb")
+
+    def read_bytes(self, path: Path) -> bytes:
+        return path.read_bytes()
+
+    def read_text(self, path: Path, encoding: str = "utf-8") -> str:
+        return path.read_text(encoding=encoding)
+
+    def mkdir(self, path: Path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+
+    def write_bytes(
+        self, target: Path, data: bytes, written: list[Path] | None = None
+    ) -> None:
+        _replace_path(target, lambda tmp: tmp.write_bytes(data))
+        _count(written=len(data))
+        if written is not None:
+            written.append(target)
+
+    def sync_file(
+        self,
+        source: Path,
+        target: Path,
+        link_mode: LinkMode = "copy",
+        written: list[Path] | None = None,
+        source_index: _DigestIndex | None = None,
+    ) -> None:
+        _sync_file(source, target, link_mode, written, source_index)
+
+    def sync_directory(
+        self,
+        source: Path,
+        target: Path,
+        link_mode: LinkMode = "copy",
+        written: list[Path] | None = None,
+        source_index: _DigestIndex | None = None,
+        target_index: _DigestIndex | None = None,
+    ) -> None:
+        _sync_directory(source, target, link_mode, written, source_index, target_index)
+
+    def import_item(
+        self, source: Path, target: Path, is_directory: bool, link_mode: LinkMode
+    ) -> None:
+        """Copy an agent-home item into dotfiles, replacing what is there."""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if is_directory:
+            if target.exists():
+                shutil.rmtree(target)
+            _copytree(source, target, link_mode)
+        else:
+            _copy_file(source, target, link_mode)
+        _unseal_copy(target)
+
+    def symlink(self, path: Path, target: Path) -> None:
+        path.symlink_to(target)
+
+    def write_settings(self, target: Path, data: dict) -> None:
+        _write_settings(target, data)
+
+    def remove(self, path: Path) -> None:
+        _remove_path(path)
+
+    def flush(self, paths: list[Path]) -> None:
+        _flush_writes(paths)
+
+
+@dataclass(frozen=True)
+class _Projected:
+    """One file-level outcome recorded by _MemoryFS (internal use)."""
+
+    path: Path
+    change: Literal["create", "update", "delete"]
+    size: int = 0
+
+
+class _MemStat(NamedTuple):
+    """The os.stat_result fields sync reads, for a _MemoryFS node."""
+
+    st_mode: int
+    st_ino: int
+    st_size: int
+    st_mtime_ns: int
+    st_nlink: int = 1
+
+    @property
+    def st_mtime(self) -> float:
+        return self.st_mtime_ns / 1e9
+
+
+@dataclass(frozen=True)
+class _MemEntry:
+    """os.DirEntry stand-in for a child listed by _MemoryFS.scandir."""
+
+    name: str
+    path: str
+    fs: "_MemoryFS"
+
+    def is_dir(self) -> bool:
+        return self.fs.is_dir(Path(self.path))
+
+    def is_file(self) -> bool:
+        return self.fs.is_file(Path(self.path))
+
+    def is_symlink(self) -> bool:
+        return False
+
+    def stat(self) -> _MemStat:
+        return self.fs.stat(Path(self.path))
+
+
+class _MemoryFS(_DiskFS):
+    """Filesystem backend held in memory (unit tests, --simulate).
+
+    Files live in ``data`` (path -> bytes), directories in ``dirs``. With a
+    ``base`` backend the memory layer overlays it: paths it never wrote read
+    through, and a removed path hides the base one, so --simulate (layered
+    over the disk) applies against the planned world and leaves the disk
+    untouched. Without a base the tree is purely in RAM, seeded with
+    write_bytes / mkdir. Every write and removal is also recorded per file
+    in ``changes`` (last outcome per path wins). Symlinks are not modelled.
+    """
+
+    simulated = True
+
+    def __init__(self, base: _DiskFS | None = None) -> None:
+        self.base = base
+        self.changes: dict[Path, _Projected] = {}
+        self.data: dict[Path, bytes] = {}
+        self.dirs: set[Path] = set()
+        self._stats: dict[Path, _MemStat] = {}
+        self._children: dict[Path, set[str]] = {}
+        self._hidden: set[Path] = set()  # removed here: the base path is gone
+        self._inodes = itertools.count(1)
+
+    # Reads: the memory layer first, then the base unless hidden.
+
+    def _in_base(self, path: Path) -> bool:
+        if self.base is None:
+            return False
+        return not self._hidden or not any(
+            p in self._hidden for p in (path, *path.parents)
+        )
+
+    def _missing(self, path: Path) -> FileNotFoundError:
+        return FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), str(path))
+
+    def scandir(self, path: Path | str) -> list[os.DirEntry]:
+        path = Path(path)
+        if path in self.data:
+            raise NotADirectoryError(
+                errno.ENOTDIR, os.strerror(errno.ENOTDIR), str(path)
+            )
+        found = path in self.dirs
+        entries: dict[str, object] = {}
+        if self._in_base(path):
+            try:
+                for entry in self.base.scandir(path):
+                    if path / entry.name not in self._hidden:
+                        entries[entry.name] = entry
+                found = True
+            except (FileNotFoundError, NotADirectoryError):
+                if not found:
+                    raise
+        if not found:
+            raise self._missing(path)
+        for name in self._children.get(path, ()):
+            entries[name] = _MemEntry(name, os.fspath(path / name), self)
+        return [entries[name] for name in sorted(entries)]
+
+    def stat(self, path: Path) -> os.stat_result:
+        st = self._stats.get(path)
+        if st is not None:
+            return st
+        if path in self.dirs:
+            return _MemStat(stat.S_IFDIR | 0o755, 0, 0, 0)
+        if self._in_base(path):
+            return self.base.stat(path)
+        raise self._missing(path)
+
+    lstat = stat
+
+    def exists(self, path: Path) -> bool:
+        try:
+            self.stat(path)
+        except OSError:
+            return False
+        return True
+
+    def is_dir(self, path: Path) -> bool:
+        try:
+            return stat.S_ISDIR(self.stat(path).st_mode)
+        except OSError:
+            return False
+
+    def is_file(self, path: Path) -> bool:
+        try:
+            return stat.S_ISREG(self.stat(path).st_mode)
+        except OSError:
+            return False
+
+    def is_symlink(self, path: Path) -> bool:
+        if path in self.data or path in self.dirs or not self._in_base(path):
+            return False
+        return self.base.is_symlink(path)
+
+    def resolve(self, path: Path) -> Path:
+        if path in self.data or path in self.dirs or not self._in_base(path):
+            return path
+        return self.base.resolve(path)
+
+    def open(self, path: Path) -> BinaryIO:
+        data = self.data.get(path)
+        if data is not None:
+            return io.BytesIO(data)
+        if path in self.dirs:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), str(path))
+        if self._in_base(path):
+            return self.base.open(path)
+        raise self._missing(path)
+
+    def read_bytes(self, path: Path) -> bytes:
+        with self.open(path) as f:
+            return f.read()
+
+    def read_text(self, path: Path, encoding: str = "utf-8") -> str:
+        with io.TextIOWrapper(self.open(path), encoding=encoding) as f:
+            return f.read()
+
+    # Writes: applied to the memory layer and recorded in ``changes``.
+
+    def _add(self, path: Path) -> None:
+        if path.parent != path:
+            self.mkdir(path.parent)
+            self._children.setdefault(path.parent, set()).add(path.name)
+
+    def _put(self, path: Path, data: bytes, mode: int = 0o644) -> None:
+        prior = self.changes.get(path)
+        if prior is not None:
+            created = prior.change != "update"
+        else:
+            created = not (self.exists(path) or self.is_symlink(path))
+        change = "create" if created else "update"
+        self.changes[path] = _Projected(path, change, len(data))
+        if path in self.dirs:
+            self._unlink(path)
+        self._add(path)
+        self.data[path] = data
+        mode = stat.S_IFREG | stat.S_IMODE(mode)
+        ino = next(self._inodes)
+        self._stats[path] = _MemStat(mode, ino, len(data), time.time_ns())
+
+    def _unlink(self, path: Path) -> None:
+        """Take path (and everything under it) out of the tree, unrecorded."""
+        for paths in (self.data, self._stats, self._children):
+            for p in [p for p in paths if p == path or path in p.parents]:
+                del paths[p]
+        self.dirs = {p for p in self.dirs if p != path and path not in p.parents}
+        self._children.get(path.parent, set()).discard(path.name)
+        if self.base is not None:
+            self._hidden.add(path)
+
+    def _drop(self, path: Path) -> None:
+        if self.is_dir(path) and not self.is_symlink(path):
+            for entry in _scan_tree(path, fs=self):
+                if entry.kind != "d":
+                    self._drop(path / entry.rel)
+        elif self.exists(path) or self.is_symlink(path):
+            size = self.stat(path).st_size if self.is_file(path) else 0
+            self.changes[path] = _Projected(path, "delete", size)
+        self._unlink(path)
+
+    def mkdir(self, path: Path) -> None:
+        if path in self.dirs:
+            return
+        self.dirs.add(path)
+        self._add(path)
+
+    def write_bytes(
+        self, target: Path, data: bytes, written: list[Path] | None = None
+    ) -> None:
+        self._put(target, data)
+
+    def sync_file(
+        self,
+        source: Path,
+        target: Path,
+        link_mode: LinkMode = "copy",
+        written: list[Path] | None = None,
+        source_index: _DigestIndex | None = None,
+    ) -> None:
+        if self.is_dir(target) and not self.is_symlink(target):
+            self._drop(target)
+        self._put(target, self.read_bytes(source), self.stat(source).st_mode)
+
+    def sync_directory(
+        self,
+        source: Path,
+        target: Path,
+        link_mode: LinkMode = "copy",
+        written: list[Path] | None = None,
+        source_index: _DigestIndex | None = None,
+        target_index: _DigestIndex | None = None,
+    ) -> None:
+        """_sync_directory in memory: only files that differ from the live tree."""
+        live: dict[str, _TreeEntry] = {}
+        if self.is_symlink(target) or self.is_file(target):
+            self._drop(target)
+        elif self.is_dir(target):
+            live = {e.rel: e for e in _scan_tree(target, fs=self)}
+        entries = _scan_tree(source, fs=self)
+        wanted = {e.rel: e.kind for e in entries}
+        # Deepest first, so a type change frees its path before the copy.
+        for rel in sorted(live, reverse=True):
+            if wanted.get(rel) != live[rel].kind:
+                self._drop(target / rel)
+        self.mkdir(target)
+        for entry in entries:
+            dest = target / entry.rel
+            if entry.kind == "d":
+                self.mkdir(dest)
+                continue
+            if entry.kind != "f":
+                continue
+            old = live.get(entry.rel)
+            if (
+                old is not None
+                and old.kind == "f"
+                and _same_content(
+                    source / entry.rel, dest, source_index, target_index, self
+                )
+            ):
+                continue
+            src = source / entry.rel
+            self._put(dest, self.read_bytes(src), self.stat(src).st_mode)
+
+    def import_item(
+        self, source: Path, target: Path, is_directory: bool, link_mode: LinkMode
+    ) -> None:
+        if self.exists(target) or self.is_symlink(target):
+            self._drop(target)
+        if not is_directory:
+            self._put(target, self.read_bytes(source), self.stat(source).st_mode)
+            return
+        self.mkdir(target)
+        for entry in _scan_tree(source, fs=self):
+            if entry.kind == "d":
+                self.mkdir(target / entry.rel)
+            elif entry.kind == "f":
+                src = source / entry.rel
+                self._put(
+                    target / entry.rel, self.read_bytes(src), self.stat(src).st_mode
+                )
+
+    def symlink(self, path: Path, target: Path) -> None:
+        pass  # not modelled (see above)
+
+    def write_settings(self, target: Path, data: dict) -> None:
+        if self.is_symlink(target):
+            target = self.resolve(target)
+        text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+        self.write_bytes(target, text.encode())
 
+    def remove(self, path: Path) -> None:
+        self._drop(path)
 
-def _apply_sync_action(action: _SyncAction, agent: AgentTarget) -> None:
+    def flush(self, paths: list[Path]) -> None:
+        pass
+
+
+_DISK_FS = _DiskFS()
+# The active backend: planning reads, digest caches, the manifest, settings
+# merges and imports go through it, as does the apply when given no ``fs``.
+# Unit tests swap in a _MemoryFS to run without touching the disk.
+_FS: _DiskFS = _DISK_FS
+
+
+def _apply_sync_action(
+    action: _SyncAction,
+    agent: AgentTarget,
+    link_mode: LinkMode = "copy",
+    written: list[Path] | None = None,
+    fs: _DiskFS | None = None,
+    source_index: _DigestIndex | None = None,
+    target_index: _DigestIndex | None = None,
+) -> None:
     """Execute one sync action.
 
     Rendered actions (base/overlay/spokes) are written as text with
     docs/agents/ references rewritten to the agent's absolute path; everything
-    else is a byte-for-byte file or directory copy.
+    else is a byte-for-byte file or directory copy (or link, see LinkMode).
+    Every item is staged beside its target and renamed into place; paths
+    whose data must be flushed are appended to ``written`` (see _flush_writes).
+    ``fs`` is the apply backend (None = the active one, _FS); ``source_index``
+    / ``target_index`` are the plan's digest caches (see _same_content).
     """
+    if fs is None:
+        fs = _FS
     if action.render:
-        action.target.parent.mkdir(parents=True, exist_ok=True)
-        action.target.write_text(
-            _render_for_agent(action.source.read_text(encoding="utf-8"), agent),
-            encoding="utf-8",
-        )
+        data = action.rendered
+        if data is None:  # not planned in this run (e.g. --apply-plan)
+            text = fs.read_text(action.source, encoding="utf-8")
+            data = _encode_rendered(_render_for_agent(text, agent))
+        fs.write_bytes(action.target, data, written)
     elif action.is_directory:
-        _sync_directory(action.source, action.target)
+        fs.sync_directory(
+            action.source,
+            action.target,
+            link_mode,
+            written,
+            source_index,
+            target_index,
+        )
     else:
-        _sync_file(action.source, action.target)
+        fs.sync_file(action.source, action.target, link_mode, written, source_index)
 
 
 def _link_learned_skills(skills_dir: Path) -> None:
@@ -761,46 +2652,28 @@ def _link_learned_skills(skills_dir: Path) -> None:
     - Directories without SKILL.md
     - When a non-symlink already exists at skills/<name>
     """
-    learned_dir = skills_dir / "learned"
-    if not learned_dir.is_dir():
+    learned = _list_dir(skills_dir / "learned")
+    if learned is None:
         return
+    # Existing skills/<name> entries: already linked, or a real directory
+    # from dotfiles (even a dangling link counts as taken).
+    taken = {c.name for c in _list_dir(skills_dir) or ()}
 
-    for skill_dir in learned_dir.iterdir():
-        if not skill_dir.is_dir():
+    for skill_dir in learned:
+        if not skill_dir.is_dir:
             continue
         skill_name = skill_dir.name
 
-        # Skip workspace directories
-        if skill_name.endswith("-workspace"):
+        # Skip workspace directories and names already present
+        if skill_name.endswith("-workspace") or skill_name in taken:
             continue
 
         # Skip directories without SKILL.md
-        if not (skill_dir / "SKILL.md").exists():
-            continue
-
-        link_path = skills_dir / skill_name
-
-        if link_path.is_symlink():
-            # Already linked, skip
-            continue
-
-        if link_path.exists():
-            # Non-symlink exists (real directory from dotfiles), skip
+        if not _FS.exists(skill_dir.path / "SKILL.md"):
             continue
 
         # Create relative symlink: skills/<name> -> learned/<name>
-        link_path.symlink_to(Path("learned") / skill_name)
-
-
-def _render_for_agent(text: str, agent: AgentTarget) -> str:
-    """Rewrite on-demand spoke references to the agent's absolute location.
-
-    The base/overlay/spoke prose references playbooks as `docs/agents/X.md`
-    (relative). When distributed globally, a relative path would resolve against
-    the working project, not the agent's home, so it is rewritten to an absolute
-    `<agent_home>/docs/agents/X.md`. Deterministic -> idempotent.
-    """
-    return text.replace("docs/agents/", f"{agent.directory}/docs/agents/")
+        _FS.symlink(skills_dir / skill_name, Path("learned") / skill_name)
 
 
 def _is_spoke(relative_path: str) -> bool:
@@ -840,35 +2713,62 @@ def _is_managed_hook_block(block: dict, agent: AgentTarget) -> bool:
     )
 
 
-def _merge_hook_settings(
-    dotfiles_dir: Path,
-    agent: AgentTarget,
-    dry_run: bool = False,
-    system: str | None = None,
-) -> bool:
-    """Merge the hook fragment into the agent's settings.json, update-in-place.
+@dataclass(frozen=True)
+class _SettingsSources:
+    """Dotfiles-side settings inputs, parsed once per run (internal use).
 
-    NOT manifest-tracked: settings.json is a user-owned shared file, so the
-    item-granular manifest (whole-file add/delete) would clobber user hooks on an
-    orphan sweep. Instead, sync OWNS exactly the hook blocks whose commands all
-    point at ``<agent>/hooks/`` (see _is_managed_hook_block): on each run those
-    managed blocks are replaced by the current fragment (so a changed/removed
-    hook command does not leave a stale duplicate), while user-authored blocks
-    and other settings keys are preserved untouched. Re-running with an unchanged
-    fragment is a no-op. With dry_run=True nothing is written. Returns True if the
-    file would change.
+    hook_fragment: the parsed HOOK_SETTINGS_FRAGMENT (None when absent).
+    shared_layers: the parsed shared + running-OS fragment layers, in order.
+    Per-agent layers (profile, machine-local) are read by the merge itself.
     """
+
+    hook_fragment: dict | None
+    shared_layers: tuple[dict, ...]
+
+
+def _load_settings_sources(
+    dotfiles_dir: Path, system: str | None = None
+) -> _SettingsSources:
+    """Parse the hook fragment and the shared/OS settings layers once."""
     fragment_path = dotfiles_dir / HOOK_SETTINGS_FRAGMENT
-    if not fragment_path.exists():
-        return False
-    fragment = json.loads(fragment_path.read_text(encoding="utf-8"))
-    target_path = agent.directory / "settings.json"
-    target = (
-        json.loads(target_path.read_text(encoding="utf-8"))
-        if target_path.exists()
-        else {}
+    os_name = OS_SETTINGS_OVERLAYS.get(system or platform.system())
+    layer_paths = [
+        dotfiles_dir / SHARED_SETTINGS_FRAGMENT,
+        (dotfiles_dir / f".claude/settings.shared.{os_name}.json") if os_name else None,
+    ]
+    return _SettingsSources(
+        hook_fragment=(
+            json.loads(_FS.read_text(fragment_path, encoding="utf-8"))
+            if _FS.exists(fragment_path)
+            else None
+        ),
+        shared_layers=tuple(
+            json.loads(_FS.read_text(path, encoding="utf-8"))
+            for path in layer_paths
+            if path is not None and _FS.exists(path)
+        ),
     )
 
+
+def _json_equal(a: object, b: object) -> bool:
+    """Deep equality with JSON value semantics (true != 1, 1 != 1.0)."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(map(_json_equal, a, b))
+    return a == b
+
+
+def _apply_hook_fragment(
+    target: dict, fragment: dict, agent: AgentTarget, system: str | None = None
+) -> bool:
+    """Replace the managed hook blocks of a parsed settings.json in memory.
+
+    See _merge_hook_settings for the ownership model. Returns True if target
+    changed.
+    """
     # Desired managed blocks per event, rendered to the agent's absolute hooks path.
     desired: dict[str, list[dict]] = {
         event: [
@@ -907,18 +2807,127 @@ def _merge_hook_settings(
         target["hooks"] = hooks
     else:
         target.pop("hooks", None)
-
-    if changed and not dry_run:
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        target_path.write_text(
-            json.dumps(target, indent=2, ensure_ascii=False) + "\n",
-            encoding="utf-8",
-        )
     return changed
 
 
-def _compose_settings_fragments(
-    dotfiles_dir: Path, agent: AgentTarget, system: str | None = None
+def _apply_settings_fragment(target: dict, fragment: dict) -> bool:
+    """Upsert a composed settings fragment into a parsed settings.json in memory.
+
+    See _merge_settings_fragment for the ownership model. Returns True if
+    target changed.
+    """
+    changed = False
+    updates = fragment.get("settings", {})
+    if "env" in fragment:
+        updates = {"env": fragment["env"], **updates}
+    for key, value in updates.items():
+        if key not in target or not _json_equal(target[key], value):
+            changed = True
+        target[key] = value
+    return changed
+
+
+def _write_settings(target_path: Path, target: dict) -> None:
+    """Write settings.json atomically (temp file + os.replace).
+
+    A symlinked settings.json is written through to its destination; the
+    existing file mode is kept.
+    """
+    if target_path.is_symlink():
+        target_path = target_path.resolve()
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target_path.with_name(f".{target_path.name}.{os.getpid()}.tmp")
+    try:
+        written = tmp.write_text(
+            json.dumps(target, indent=2, ensure_ascii=False) + "\n",
+            encoding="utf-8",
+        )
+        with contextlib.suppress(FileNotFoundError):
+            shutil.copymode(target_path, tmp)
+        os.replace(tmp, target_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _count(written=written)
+
+
+def _merge_agent_settings(
+    dotfiles_dir: Path,
+    agent: AgentTarget,
+    dry_run: bool = False,
+    system: str | None = None,
+    sources: _SettingsSources | None = None,
+    hooks: bool = True,
+    settings: bool = True,
+    fs: _DiskFS | None = None,
+) -> tuple[bool, bool]:
+    """Merge the hook fragment and the settings fragments in one transaction.
+
+    settings.json is parsed once, the hook blocks (_merge_hook_settings) and
+    then the composed settings (_merge_settings_fragment) are applied in
+    memory, and the file is written at most once, atomically. ``sources``
+    carries the per-run parsed dotfiles inputs (loaded when None); ``hooks`` /
+    ``settings`` select the parts to merge; ``fs`` is the apply backend
+    (None = the active one, _FS). Returns (hooks_changed, settings_changed); with
+    dry_run=True nothing is written.
+    """
+    if sources is None:
+        sources = _load_settings_sources(dotfiles_dir, system=system)
+    hook_fragment = sources.hook_fragment if hooks else None
+    composed = (
+        _compose_settings_fragments(
+            dotfiles_dir, agent, system=system, shared_layers=sources.shared_layers
+        )
+        if settings
+        else None
+    )
+    if hook_fragment is None and composed is None:
+        return False, False
+
+    target_path = agent.directory / "settings.json"
+    target = {}
+    if _FS.exists(target_path):
+        target = json.loads(_FS.read_text(target_path, encoding="utf-8"))
+    hooks_changed = hook_fragment is not None and _apply_hook_fragment(
+        target, hook_fragment, agent, system=system
+    )
+    settings_changed = composed is not None and _apply_settings_fragment(
+        target, composed
+    )
+    if (hooks_changed or settings_changed) and not dry_run:
+        (fs or _FS).write_settings(target_path, target)
+    return hooks_changed, settings_changed
+
+
+def _merge_hook_settings(
+    dotfiles_dir: Path,
+    agent: AgentTarget,
+    dry_run: bool = False,
+    system: str | None = None,
+) -> bool:
+    """Merge the hook fragment into the agent's settings.json, update-in-place.
+
+    NOT manifest-tracked: settings.json is a user-owned shared file, so the
+    item-granular manifest (whole-file add/delete) would clobber user hooks on an
+    orphan sweep. Instead, sync OWNS exactly the hook blocks whose commands all
+    point at ``<agent>/hooks/`` (see _is_managed_hook_block): on each run those
+    managed blocks are replaced by the current fragment (so a changed/removed
+    hook command does not leave a stale duplicate), while user-authored blocks
+    and other settings keys are preserved untouched. Re-running with an unchanged
+    fragment is a no-op. With dry_run=True nothing is written. Returns True if the
+    file would change.
+    """
+    changed, _ = _merge_agent_settings(
+        dotfiles_dir, agent, dry_run=dry_run, system=system, settings=False
+    )
+    return changed
+
+
+def _compose_settings_fragments(
+    dotfiles_dir: Path,
+    agent: AgentTarget,
+    system: str | None = None,
+    shared_layers: tuple[dict, ...] | None = None,
 ) -> dict | None:
     """Compose the settings fragment layers into one effective desired state.
 
@@ -932,22 +2941,25 @@ def _compose_settings_fragments(
     deep-merge when both sides are dicts (so shared can own ``permissions.deny``
     while a profile owns ``permissions.defaultMode``). Missing layer files are
     empty layers. ``system`` (a ``platform.system()`` value) is injectable for
-    tests. Returns the composed ``{"env": ..., "settings": ...}`` dict, or None
-    when no fragment layer exists (merge is then a no-op).
+    tests; ``shared_layers`` passes layers 1-2 already parsed (see
+    _load_settings_sources). Returns the composed ``{"env": ..., "settings":
+    ...}`` dict, or None when no fragment layer exists (merge is then a no-op).
     """
-    os_name = OS_SETTINGS_OVERLAYS.get(system or platform.system())
+    if shared_layers is None:
+        shared_layers = _load_settings_sources(dotfiles_dir, system).shared_layers
     layer_paths = [
-        dotfiles_dir / SHARED_SETTINGS_FRAGMENT,
-        (dotfiles_dir / f".claude/settings.shared.{os_name}.json") if os_name else None,
         (dotfiles_dir / PROFILE_SETTINGS_DIR / f"{agent.key}.json")
         if agent.key
         else None,
         agent.directory / MACHINE_LOCAL_SETTINGS,
     ]
     layers = [
-        json.loads(path.read_text(encoding="utf-8"))
-        for path in layer_paths
-        if path is not None and path.exists()
+        *shared_layers,
+        *(
+            json.loads(_FS.read_text(path, encoding="utf-8"))
+            for path in layer_paths
+            if path is not None and _FS.exists(path)
+        ),
     ]
     if not layers:
         return None
@@ -984,45 +2996,38 @@ def _merge_settings_fragment(
     auto-propagated. Idempotent; dry_run=True writes nothing. Returns True if
     the file would change.
     """
-    fragment = _compose_settings_fragments(dotfiles_dir, agent, system=system)
-    if fragment is None:
-        return False
-    target_path = agent.directory / "settings.json"
-    target = (
-        json.loads(target_path.read_text(encoding="utf-8"))
-        if target_path.exists()
-        else {}
+    _, changed = _merge_agent_settings(
+        dotfiles_dir, agent, dry_run=dry_run, system=system, hooks=False
     )
-
-    before = json.dumps(target, sort_keys=True, ensure_ascii=False)
-
-    if "env" in fragment:
-        target["env"] = fragment["env"]
-    for key, value in fragment.get("settings", {}).items():
-        target[key] = value
-
-    changed = json.dumps(target, sort_keys=True, ensure_ascii=False) != before
-
-    if changed and not dry_run:
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        target_path.write_text(
-            json.dumps(target, indent=2, ensure_ascii=False) + "\n",
-            encoding="utf-8",
-        )
     return changed
 
 
 def _plan_text_file(
-    source: Path, target: Path, relative_path: str, agent: AgentTarget
+    source: Path,
+    target: Path,
+    relative_path: str,
+    agent: AgentTarget,
+    snapshot: _SourceSnapshot,
+    target_index: _DigestIndex,
 ) -> _SyncAction:
-    """Plan a rendered text file: status uses the rendered expected content."""
-    rendered = _render_for_agent(source.read_text(encoding="utf-8"), agent)
-    if not target.exists():
-        status: Literal["new", "changed", "synced"] = "new"
-    elif target.read_text(encoding="utf-8") == rendered:
-        status = "synced"
+    """Plan a rendered text file: status uses the rendered expected content.
+
+    The target is compared by size, then by digest (served from the agent
+    home's ``target_index`` while its stat is unchanged) against the rendered
+    bytes, which the action carries on to the apply.
+    """
+    data, digest = snapshot.rendered(source, agent)
+    status: Literal["new", "changed", "synced"]
+    try:
+        st = _FS.stat(target)
+    except FileNotFoundError:
+        status = "new"
     else:
-        status = "changed"
+        _count(stat=1)
+        same = st.st_size == len(data) and (
+            _file_digest(target, target_index, st) == digest
+        )
+        status = "synced" if same else "changed"
     return _SyncAction(
         source=source,
         target=target,
@@ -1030,58 +3035,74 @@ def _plan_text_file(
         is_directory=False,
         status=status,
         render=True,
+        rendered=data,
     )
 
 
+def _main_file_sources(
+    dotfiles_dir: Path, agent: AgentTarget
+) -> list[tuple[Path, str]]:
+    """(rendered source, home-relative target) pairs for the agent's main files."""
+    if agent.main_file is None:
+        return []
+    base_src = dotfiles_dir / BASE_FILE
+    if not agent.overlay_main:
+        # codex/gemini: main_file <- base directly.
+        return [(base_src, agent.main_file)]
+    # claude-family: main_file <- overlay; base written alongside.
+    pairs = [(dotfiles_dir / OVERLAY_FILE, agent.main_file)]
+    if agent.base_secondary is not None:
+        pairs.append((base_src, agent.base_secondary))
+    return pairs
+
+
+def _agent_receives(agent: AgentTarget, item: _SyncItem) -> bool:
+    """Whether an additional source is synced to this agent at all."""
+    # Skip items outside this agent's custom sync directories
+    if agent.sync_directories is not None:
+        item_dir = item.relative_path.split("/")[0]
+        if item_dir not in agent.sync_directories:
+            return False
+    # Hooks are a Claude-only mechanism: skip for non-claude agents.
+    return not (item.relative_path.startswith("hooks/") and not agent.receives_hooks)
+
+
 def _build_sync_plan(
-    dotfiles_dir: Path, agent: AgentTarget, additional_sources: list[_SyncItem]
+    dotfiles_dir: Path,
+    agent: AgentTarget,
+    additional_sources: list[_SyncItem],
+    snapshot: _SourceSnapshot | None = None,
+    target_index: _DigestIndex | None = None,
 ) -> _SyncPlan:
-    """Build sync plan for an agent."""
+    """Build sync plan for an agent.
+
+    Non-rendered items are compared by content digest: source digests come
+    from the run's ``snapshot`` (its index is the dotfiles digest cache) and
+    target digests from ``target_index``, the agent home's digest cache. When
+    omitted, a fresh scan / throwaway per-call cache is used.
+    """
+    if snapshot is None:
+        snapshot = _scan_source(dotfiles_dir)
+    if target_index is None:
+        target_index = _DigestIndex(root=agent.directory)
     actions: list[_SyncAction] = []
 
     # Base + overlay (skip for agents without a main_file, e.g. .agents global).
-    if agent.main_file is not None:
-        base_src = dotfiles_dir / BASE_FILE
-        if agent.overlay_main:
-            # claude-family: main_file <- overlay; base written alongside.
-            overlay_src = dotfiles_dir / OVERLAY_FILE
-            actions.append(
-                _plan_text_file(
-                    overlay_src,
-                    agent.directory / agent.main_file,
-                    agent.main_file,
-                    agent,
-                )
-            )
-            if agent.base_secondary is not None:
-                actions.append(
-                    _plan_text_file(
-                        base_src,
-                        agent.directory / agent.base_secondary,
-                        agent.base_secondary,
-                        agent,
-                    )
-                )
-        else:
-            # codex/gemini: main_file <- base directly.
-            actions.append(
-                _plan_text_file(
-                    base_src,
-                    agent.directory / agent.main_file,
-                    agent.main_file,
-                    agent,
-                )
+    for source, relative_path in _main_file_sources(dotfiles_dir, agent):
+        actions.append(
+            _plan_text_file(
+                source,
+                agent.directory / relative_path,
+                relative_path,
+                agent,
+                snapshot,
+                target_index,
             )
+        )
 
     # Additional sources (filtered by agent's sync_directories if customized)
     for item in additional_sources:
-        # Skip items outside this agent's custom sync directories
-        if agent.sync_directories is not None:
-            item_dir = item.relative_path.split("/")[0]
-            if item_dir not in agent.sync_directories:
-                continue
-        # Hooks are a Claude-only mechanism: skip for non-claude agents.
-        if item.relative_path.startswith("hooks/") and not agent.receives_hooks:
+        if not _agent_receives(agent, item):
             continue
 
         # Spokes (docs/agents/*.md) are rendered like the base/overlay.
@@ -1092,6 +3113,8 @@ def _build_sync_plan(
                     agent.directory / item.relative_path,
                     item.relative_path,
                     agent,
+                    snapshot,
+                    target_index,
                 )
             )
             continue
@@ -1106,23 +3129,27 @@ def _build_sync_plan(
         if _is_additive_item(item.relative_path):
             status = (
                 "new"
-                if not (target_path.exists() or target_path.is_symlink())
+                if not (_FS.exists(target_path) or _FS.is_symlink(target_path))
                 else "synced"
             )
-        elif target_path.is_symlink():
+        elif _FS.is_symlink(target_path):
             # Symlinks in targets should always be replaced with real copies
             status = "changed"
         elif item.is_directory:
-            if not target_path.exists():
+            if not _FS.exists(target_path):
                 status = "new"
-            elif _compare_directories(item.source, target_path):
+            elif _FS.is_dir(target_path) and snapshot.digest(item) == _tree_digest(
+                target_path, target_index
+            ):
                 status = "synced"
             else:
                 status = "changed"
         else:
-            if not target_path.exists():
+            if not _FS.exists(target_path):
                 status = "new"
-            elif _compare_files(item.source, target_path):
+            elif _FS.is_file(target_path) and snapshot.digest(item) == _file_digest(
+                target_path, target_index
+            ):
                 status = "synced"
             else:
                 status = "changed"
@@ -1140,6 +3167,147 @@ def _build_sync_plan(
     return _SyncPlan(agent=agent, items=actions)
 
 
+_T = TypeVar("_T")
+
+
+def _map_agents(
+    fn: Callable[[AgentTarget], _T], agents: list[AgentTarget], jobs: int = 1
+) -> list[_T]:
+    """Run fn once per agent; on a thread pool when jobs > 1.
+
+    Agent homes are disjoint trees, so per-agent planning/applying is
+    independent. Results keep the order of ``agents`` regardless of completion
+    order, which keeps the printed plan deterministic.
+    """
+    if jobs <= 1 or len(agents) <= 1:
+        return [fn(agent) for agent in agents]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(agents))) as pool:
+        return list(pool.map(fn, agents))
+
+
+def _plan_agent(
+    dotfiles_dir: Path,
+    agent: AgentTarget,
+    additional: list[_SyncItem],
+    manifest: _SyncManifest,
+    snapshot: _SourceSnapshot,
+    save_index: bool = False,
+    prune_index: bool = False,
+) -> _SyncPlan:
+    """Forward sync + deletion + orphan plan for one agent (Phase 2)."""
+    target_index = _load_digest_index(agent.directory)
+    sync_plan = _build_sync_plan(
+        dotfiles_dir,
+        agent,
+        additional,
+        snapshot=snapshot,
+        target_index=target_index,
+    )
+    if save_index:
+        _save_digest_index(target_index, prune=prune_index)
+    sync_plan.target_index = target_index
+    sync_plan.source_index = snapshot.index
+    sync_plan.deletions = _build_deletion_plan(dotfiles_dir, agent, manifest, snapshot)
+    sync_plan.deletions.extend(
+        _detect_target_only_items(dotfiles_dir, agent, manifest, snapshot)
+    )
+    sync_plan.deletions.extend(_detect_managed_dir_orphans(agent, additional, snapshot))
+    return sync_plan
+
+
+def _overwrite_prompt(action: _SyncAction) -> str:
+    return f"  Overwrite {action.relative_path}?"
+
+
+def _delete_prompt(deletion: _DeleteAction) -> str:
+    if deletion.reason == "orphan":
+        return f"  Delete {deletion.relative_path} (target-only, not in dotfiles)?"
+    return f"  Delete {deletion.relative_path}?"
+
+
+def _plan_prompts(plan: _SyncPlan) -> list[str]:
+    """Every confirmation _apply_plan would ask for this plan, in order."""
+    prompts = [_overwrite_prompt(a) for a in plan.items if a.status == "changed"]
+    prompts.extend(_delete_prompt(d) for d in plan.deletions)
+    return prompts
+
+
+def _apply_plan(
+    plan: _SyncPlan,
+    dotfiles_dir: Path,
+    confirm: Callable[[str], bool],
+    out: TextIO | None = None,
+    link_mode: LinkMode = "copy",
+    settings: _SettingsSources | None = None,
+    fs: _DiskFS | None = None,
+) -> set[str]:
+    """Phase 3 for one agent: apply actions, settings merges and deletions.
+
+    ``confirm`` answers each overwrite/delete prompt; ``out`` receives the
+    progress lines (None = current stdout) so parallel applies can buffer;
+    ``link_mode`` selects how non-rendered files are materialized;
+    ``settings`` is the run's parsed settings inputs (loaded when None);
+    ``fs`` is the apply backend (None = the active one, _FS; a _MemoryFS
+    for --simulate). Returns the relative paths of plan items that now match
+    dotfiles.
+    """
+    if fs is None:
+        fs = _FS
+    print(f"\n📋 Processing {plan.agent.name}...", file=out)
+
+    fs.mkdir(plan.agent.directory)
+    written: list[Path] = []
+    indexes = (plan.source_index, plan.target_index)
+    in_sync: set[str] = set()
+
+    for action in plan.items:
+        if action.status == "synced":
+            in_sync.add(action.relative_path)
+            continue
+
+        icon = "📁" if action.is_directory else "📄"
+
+        if action.status == "new":
+            _apply_sync_action(action, plan.agent, link_mode, written, fs, *indexes)
+            in_sync.add(action.relative_path)
+            print(f"  ✅ {icon} {action.relative_path}: Created", file=out)
+
+        elif action.status == "changed":
+            if confirm(_overwrite_prompt(action)):
+                _apply_sync_action(action, plan.agent, link_mode, written, fs, *indexes)
+                in_sync.add(action.relative_path)
+                print(f"  ✅ {icon} {action.relative_path}: Updated", file=out)
+            else:
+                print(f"  ⏭️  {icon} {action.relative_path}: Skipped", file=out)
+
+    # Merge the Claude hook fragment and the shared settings fragment (env
+    # owned wholesale + curated top-level keys) into the agent's settings.json
+    # in one read-modify-write (claude-family only; idempotent,
+    # manifest-independent).
+    if plan.agent.receives_hooks:
+        with _phase("settings merge", agent=plan.agent.key):
+            hooks_merged, settings_merged = _merge_agent_settings(
+                dotfiles_dir, plan.agent, sources=settings, fs=fs
+            )
+        if hooks_merged:
+            print("  ✅ 📄 settings.json: hooks merged", file=out)
+        if settings_merged:
+            print("  ✅ 📄 settings.json: shared settings merged", file=out)
+
+    # Apply deletions
+    for deletion in plan.deletions:
+        icon = "📁" if deletion.is_directory else "📄"
+        if confirm(_delete_prompt(deletion)):
+            fs.remove(deletion.target)
+            print(f"  🗑️  {icon} {deletion.relative_path}: Deleted", file=out)
+        else:
+            print(f"  ⏭️  {icon} {deletion.relative_path}: Skipped", file=out)
+
+    # One batched flush per agent instead of an fsync per written file.
+    fs.flush(written)
+    return in_sync
+
+
 def _print_header(text: str) -> None:
     """Print a header."""
     print(f"\n{'=' * 60}")
@@ -1152,6 +3320,8 @@ def _print_plan(
     dotfiles_dir: Path,
     verbose: bool = False,
     exclude_dirs: frozenset[str] = frozenset(),
+    snapshot: _SourceSnapshot | None = None,
+    settings: _SettingsSources | None = None,
 ) -> bool:
     """Print sync plan. Returns True if there are changes to apply."""
     has_changes = False
@@ -1161,7 +3331,7 @@ def _print_plan(
 
     additional = [
         item
-        for item in _get_additional_sources(dotfiles_dir)
+        for item in _get_additional_sources(dotfiles_dir, snapshot=snapshot)
         if item.relative_path.split("/")[0] not in exclude_dirs
     ]
     if additional:
@@ -1187,17 +3357,17 @@ def _print_plan(
             elif verbose:
                 print(f"  ✅ {icon} {action.relative_path} [SYNCED]")
 
-        if plan.agent.receives_hooks and _merge_hook_settings(
-            dotfiles_dir, plan.agent, dry_run=True
-        ):
-            print("  📝 📄 settings.json [HOOKS MERGE]")
-            has_changes = True
-
-        if plan.agent.receives_hooks and _merge_settings_fragment(
-            dotfiles_dir, plan.agent, dry_run=True
-        ):
-            print("  📝 📄 settings.json [SHARED MERGE]")
-            has_changes = True
+        if plan.agent.receives_hooks:
+            if settings is None:
+                settings = _load_settings_sources(dotfiles_dir)
+            hooks_merge, shared_merge = _merge_agent_settings(
+                dotfiles_dir, plan.agent, dry_run=True, sources=settings
+            )
+            if hooks_merge:
+                print("  📝 📄 settings.json [HOOKS MERGE]")
+            if shared_merge:
+                print("  📝 📄 settings.json [SHARED MERGE]")
+            has_changes = has_changes or hooks_merge or shared_merge
 
         for deletion in plan.deletions:
             icon = "📁" if deletion.is_directory else "📄"
@@ -1252,6 +3422,7 @@ def _build_import_plan(
     agent: AgentTarget,
     manifest: _SyncManifest,
     exclude_dirs: frozenset[str] = frozenset(),
+    snapshot: _SourceSnapshot | None = None,
 ) -> _ImportPlan:
     """Build import plan: detect importable items in target's SYNC_DIRECTORIES.
 
@@ -1261,32 +3432,28 @@ def _build_import_plan(
     target's items are never pulled back into dotfiles. skills/ children must
     also pass _is_syncable_skill so junk left in a target never reimports.
     """
+    if snapshot is None:
+        snapshot = _scan_source(dotfiles_dir)
     actions: list[_ImportAction] = []
-    skills_exclude = _load_skills_sync_exclude(dotfiles_dir)
+    skills_exclude = snapshot.skills_exclude
 
     for dir_name in agent.get_sync_directories():
         if dir_name in exclude_dirs:
             continue
         target_dir = agent.directory / dir_name
-        if not target_dir.is_dir():
+        children = _list_dir(target_dir)
+        if children is None:
             continue
 
         manifest_items = set(manifest.items.get(dir_name, []))
-        dotfiles_dir_path = dotfiles_dir / dir_name
-        dotfiles_items: set[str] = set()
-        if dotfiles_dir_path.is_dir():
-            dotfiles_items = {
-                c.name
-                for c in dotfiles_dir_path.iterdir()
-                if not c.name.startswith(".")
-            }
+        dotfiles_items = snapshot.names.get(dir_name, frozenset())
 
-        for child in target_dir.iterdir():
+        for child in children:
             if child.name.startswith("."):
                 continue
             if _is_excluded_child(dir_name, child.name):
                 continue
-            if child.is_symlink() and _is_internal_symlink(child, target_dir):
+            if child.is_symlink and _is_internal_symlink(child.path, target_dir):
                 continue
             if dir_name == "skills" and child.name not in ADDITIVE_EXEMPT_SUBDIRS:
                 # Skills never import back from agent homes: third-party skills
@@ -1295,28 +3462,40 @@ def _build_import_plan(
                 # submodule directly. Only the exempt skill-creator workspace
                 # (skills/learned) keeps its round-trip.
                 continue
+            if not child.exists:
+                # Broken symlink, skip
+                continue
             if dir_name == "skills" and not _is_syncable_skill(
-                child, child.name, skills_exclude
+                child.path, child.name, skills_exclude
             ):
                 continue
 
             rel_path = f"{dir_name}/{child.name}"
             dotfiles_dest = dotfiles_dir / rel_path
-            is_symlink = child.is_symlink()
-            resolved = child.resolve() if is_symlink else child
-
-            if not resolved.exists():
-                # Broken symlink, skip
-                continue
+            is_symlink = child.is_symlink
+            resolved = _FS.resolve(child.path) if is_symlink else child.path
 
+            status: Literal["import", "conflict", "exists", "deleted"]
             if child.name in dotfiles_items:
-                # Already exists in dotfiles
-                if resolved.is_dir():
-                    if _compare_directories(dotfiles_dest, resolved):
-                        status: Literal["import", "conflict", "exists", "deleted"] = (
-                            "exists"
+                # Already exists in dotfiles. One stat snapshot per side gives
+                # both the equality check and the newest-mtime comparison.
+                if child.is_dir:
+                    source_tree = _scan_tree(resolved)
+                    dotfiles_tree = snapshot.trees.get(rel_path)
+                    if dotfiles_tree is None or _is_additive_item(rel_path):
+                        # not stat-scanned with the snapshot
+                        dotfiles_tree = (
+                            _scan_tree(dotfiles_dest)
+                            if _FS.is_dir(dotfiles_dest)
+                            else ()
                         )
-                    elif _get_newest_mtime(resolved) > _get_newest_mtime(dotfiles_dest):
+                    if _FS.is_dir(dotfiles_dest) and _trees_equal(
+                        dotfiles_dest, dotfiles_tree, resolved, source_tree
+                    ):
+                        status = "exists"
+                    elif _newest_mtime_ns(source_tree) > _newest_mtime_ns(
+                        dotfiles_tree
+                    ):
                         # Import source is newer: update dotfiles
                         status = "import"
                     else:
@@ -1324,7 +3503,7 @@ def _build_import_plan(
                         status = "conflict"
                 elif _compare_files(dotfiles_dest, resolved):
                     status = "exists"
-                elif resolved.stat().st_mtime > dotfiles_dest.stat().st_mtime:
+                elif _FS.stat(resolved).st_mtime > _FS.stat(dotfiles_dest).st_mtime:
                     # Import source file is newer: update dotfiles
                     status = "import"
                 else:
@@ -1339,11 +3518,11 @@ def _build_import_plan(
 
             actions.append(
                 _ImportAction(
-                    source_path=child,
+                    source_path=child.path,
                     resolved_path=resolved,
                     dotfiles_dest=dotfiles_dest,
                     relative_path=rel_path,
-                    is_directory=resolved.is_dir(),
+                    is_directory=child.is_dir,
                     is_symlink=is_symlink,
                     status=status,
                 )
@@ -1352,28 +3531,21 @@ def _build_import_plan(
     return _ImportPlan(agent=agent, items=actions)
 
 
-def _apply_import(plan: _ImportPlan) -> None:
-    """Apply import plan: copy items to dotfiles."""
+def _apply_import(plan: _ImportPlan, link_mode: LinkMode = "copy") -> None:
+    """Apply import plan: copy (or clone, see LinkMode) items to dotfiles."""
+    if link_mode in ("hardlink", "store"):
+        # dotfiles is edited in place: never let it share an inode with an
+        # agent home (an edit would land there too) or an immutable object.
+        link_mode = "reflink"
     for action in plan.items:
         if action.status != "import":
             continue
 
         icon = "📁" if action.is_directory else "📄"
-        is_update = action.dotfiles_dest.exists()
-
-        if action.is_directory:
-            action.dotfiles_dest.parent.mkdir(parents=True, exist_ok=True)
-            if action.dotfiles_dest.exists():
-                shutil.rmtree(action.dotfiles_dest)
-            shutil.copytree(
-                action.resolved_path,
-                action.dotfiles_dest,
-                symlinks=False,
-                ignore=_make_copytree_ignore(),
-            )
-        else:
-            action.dotfiles_dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(action.resolved_path, action.dotfiles_dest)
+        is_update = _FS.exists(action.dotfiles_dest)
+        _FS.import_item(
+            action.resolved_path, action.dotfiles_dest, action.is_directory, link_mode
+        )
 
         source_type = "symlink" if action.is_symlink else "directory"
         verb = "Updated (newer)" if is_update else "Imported"
@@ -1407,6 +3579,505 @@ def _print_import_plan(plan: _ImportPlan, verbose: bool = False) -> bool:
     return has_imports
 
 
+# --- Watch (--watch) ---
+
+# inotify(7) constants (linux/inotify.h).
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_IN_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+)
+_INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (+ name)
+
+# Dotfiles dirs whose direct children can be sync sources, besides the root
+# (ROOT_AGENTS*) and SYNC_DIRECTORIES (watched recursively).
+_WATCH_SETTINGS_DIRS = (".claude", PROFILE_SETTINGS_DIR)
+# Quiet period that closes a batch of edits (editor save = several events).
+WATCH_DEBOUNCE_S = 0.2
+
+
+def _is_watched_path(rel: str) -> bool:
+    """Whether a dotfiles-relative path can change what a sync writes."""
+    head, _, rest = rel.partition("/")
+    if head in SYNC_DIRECTORIES:
+        return not rest.split("/")[0].startswith(".")
+    if not rest:
+        return head.startswith("ROOT_AGENTS") or head == OVERLAY_FILE
+    return rel == SKILLS_SYNC_EXCLUDE_FILE or (
+        rel.startswith(".claude/settings.") and rel.endswith(".json")
+    )
+
+
+# (dotfiles-relative dir, recursive) pairs a watcher subscribes to.
+_WATCH_DIRS = {
+    "": False,
+    **dict.fromkeys(_WATCH_SETTINGS_DIRS, False),
+    SKILLS_SYNC_EXCLUDE_FILE.rsplit("/", 1)[0]: False,
+    **dict.fromkeys(SYNC_DIRECTORIES, True),
+}
+
+
+class _InotifyWatcher:
+    """Recursive inotify watch over the dotfiles sync sources (internal use).
+
+    ``read(timeout)`` returns the dotfiles-relative paths touched since the
+    last call (filtered by _is_watched_path), or None after a queue overflow
+    (events were lost: the caller must treat everything as changed).
+    Directories created under a recursive root are watched as they appear.
+    """
+
+    kind = "inotify"
+
+    def __init__(self, dotfiles_dir: Path, libc: ctypes.CDLL) -> None:
+        self.dotfiles_dir = dotfiles_dir
+        self._libc = libc
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs: dict[int, tuple[str, bool]] = {}
+        for rel, recursive in _WATCH_DIRS.items():
+            self._add(rel, recursive)
+
+    def _add(self, rel: str, recursive: bool) -> None:
+        path = self.dotfiles_dir / rel if rel else self.dotfiles_dir
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _IN_WATCH_MASK)
+        if wd < 0:
+            return  # missing (yet) or unreadable: nothing to watch
+        self._dirs[wd] = (rel, recursive)
+        if recursive:
+            for child in _list_dir(path) or ():
+                if child.is_dir and not child.name.startswith("."):
+                    self._add(f"{rel}/{child.name}", True)
+
+    def read(self, timeout: float | None) -> set[str] | None:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[str] = set()
+        overflow = False
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = _INOTIFY_EVENT.unpack_from(buf, offset)
+                start = offset + _INOTIFY_EVENT.size
+                name = os.fsdecode(buf[start : start + length].rstrip(b"\0"))
+                offset = start + length
+                if mask & _IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & _IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                parent, recursive = self._dirs.get(wd, (None, False))
+                if parent is None or not name:
+                    continue  # the watched dir itself; its parent reports it
+                rel = f"{parent}/{name}" if parent else name
+                if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    if recursive:
+                        self._add(rel, True)
+                    elif rel in _WATCH_DIRS:
+                        self._add(rel, _WATCH_DIRS[rel])
+                if _is_watched_path(rel):
+                    changed.add(rel)
+        return None if overflow else changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollWatcher:
+    """Stat-polling fallback with the same interface as _InotifyWatcher."""
+
+    kind = "polling"
+
+    def __init__(self, dotfiles_dir: Path, interval: float = 1.0) -> None:
+        self.dotfiles_dir = dotfiles_dir
+        self.interval = interval
+        self._state = self._scan()
+        self._next = time.monotonic() + interval
+
+    def _scan(self) -> dict[str, tuple[str, int, int]]:
+        state: dict[str, tuple[str, int, int]] = {}
+        for rel, recursive in _WATCH_DIRS.items():
+            path = self.dotfiles_dir / rel if rel else self.dotfiles_dir
+            if recursive:
+                if path.is_dir():
+                    for e in _scan_tree(path):
+                        state[f"{rel}/{e.rel}"] = (e.kind, e.size, e.mtime_ns)
+                continue
+            for child in _list_dir(path) or ():
+                child_rel = f"{rel}/{child.name}" if rel else child.name
+                if child.is_dir or not _is_watched_path(child_rel):
+                    continue
+                try:
+                    st = child.path.stat()
+                except OSError:
+                    continue
+                state[child_rel] = ("f", st.st_size, st.st_mtime_ns)
+        return state
+
+    def read(self, timeout: float | None) -> set[str] | None:
+        wait = self._next - time.monotonic()
+        if timeout is not None and wait > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, wait))
+        self._next = time.monotonic() + self.interval
+        old, self._state = self._state, self._scan()
+        return {
+            rel
+            for rel in old.keys() | self._state.keys()
+            if old.get(rel) != self._state.get(rel) and _is_watched_path(rel)
+        }
+
+    def close(self) -> None:
+        pass
+
+
+def _open_watcher(
+    dotfiles_dir: Path, poll_interval: float | None = None
+) -> "_InotifyWatcher | _PollWatcher":
+    """inotify when available, else polling (forced by ``poll_interval``)."""
+    libc = _load_libc() if poll_interval is None else None
+    if libc is not None and hasattr(libc, "inotify_init1"):
+        try:
+            return _InotifyWatcher(dotfiles_dir, libc)
+        except OSError as e:
+            print(f"⚠️  inotify unavailable ({e}); falling back to polling")
+    return _PollWatcher(dotfiles_dir, poll_interval or 1.0)
+
+
+def _collect_changes(
+    watcher: "_InotifyWatcher | _PollWatcher",
+    debounce: float,
+    stop: threading.Event,
+) -> set[str] | None:
+    """Block until something changes, then until ``debounce`` s of quiet.
+
+    Bursts (editor save = write + rename + chmod, `git checkout`) become one
+    batch. None means events were lost and everything must be replanned.
+    """
+    changed: set[str] | None = set()
+    while not changed and not stop.is_set():
+        changed = watcher.read(0.5)
+        if changed is None:
+            break
+    deadline = time.monotonic() + max(debounce * 10, 2.0)
+    while changed or changed is None:
+        more = watcher.read(debounce)
+        if more is None:
+            changed = None
+        elif not more:
+            break
+        elif changed is not None:
+            changed |= more
+        if time.monotonic() >= deadline:
+            break
+    return changed
+
+
+def _sync_changed_items(
+    dotfiles_dir: Path,
+    agents: list[AgentTarget],
+    paths: set[str] | None,
+    exclude_dirs: frozenset[str] = frozenset(),
+    link_mode: LinkMode = "copy",
+) -> int:
+    """Plan and apply only the items a watch batch touched; returns #applied.
+
+    ``paths`` are dotfiles-relative changed paths (None = replan everything).
+    Changes are confirmed implicitly (the edit in dotfiles is the intent), but
+    only manifest-tracked deletions and stale spokes/hooks among the touched
+    items are removed: target-only orphans are never deleted from --watch.
+    Import sources are not read: watch mode only pushes dotfiles -> targets.
+    """
+    only = None if paths is None else _changed_items(frozenset(paths))
+    if only is not None:
+        only = frozenset(i for i in only if i.split("/")[0] not in exclude_dirs)
+    settings_touched = paths is None or any(p.startswith(".claude/") for p in paths)
+
+    manifest = _load_manifest(dotfiles_dir)
+    source_index = _load_digest_index(dotfiles_dir)
+    with _phase("source scan"):
+        snapshot = _scan_source(dotfiles_dir, source_index, only)
+    additional = [
+        item
+        for item in _get_additional_sources(dotfiles_dir, snapshot=snapshot)
+        if item.relative_path.split("/")[0] not in exclude_dirs
+    ]
+    settings = _load_settings_sources(dotfiles_dir)
+
+    def _touched(relative_path: str) -> bool:
+        head = relative_path.split("/")[0]
+        return head not in exclude_dirs and (only is None or relative_path in only)
+
+    applied = 0
+    in_sync: dict[str, set[str]] = {}
+    for agent in agents:
+        with _phase("plan", agent=agent.key):
+            target_index = _load_digest_index(agent.directory)
+            plan = _build_sync_plan(
+                dotfiles_dir, agent, additional, snapshot, target_index
+            )
+            _save_digest_index(target_index, prune=paths is None)
+            plan.target_index = target_index
+            plan.source_index = snapshot.index
+            deletions = _build_deletion_plan(dotfiles_dir, agent, manifest, snapshot)
+            deletions.extend(_detect_managed_dir_orphans(agent, additional, snapshot))
+            plan.deletions = [d for d in deletions if _touched(d.relative_path)]
+        pending = [a for a in plan.items if a.status != "synced"]
+        if not pending and not plan.deletions:
+            in_sync[agent.key] = {a.relative_path for a in plan.items}
+            if not (settings_touched and agent.receives_hooks):
+                continue
+        with _phase("apply", agent=agent.key):
+            in_sync[agent.key] = _apply_plan(
+                plan, dotfiles_dir, lambda p: True, None, link_mode, settings
+            )
+        applied += len(pending) + len(plan.deletions)
+    _save_digest_index(source_index, prune=paths is None)
+
+    for dir_name in SYNC_DIRECTORIES:
+        current_items = set(manifest.items.get(dir_name, []))
+        current_items |= snapshot.names.get(dir_name, frozenset())
+        manifest.items[dir_name] = sorted(current_items)
+    _record_items(manifest, snapshot, in_sync)
+    # Targets changed outside a complete sync: the next run must replan.
+    manifest.fingerprint = ""
+    _save_manifest(dotfiles_dir, manifest)
+
+    if only is None or any(i.startswith("skills/learned") for i in only):
+        with _phase("learned links"):
+            _link_learned_skills(dotfiles_dir / "skills")
+            for agent in agents:
+                agent_skills_dir = agent.directory / "skills"
+                if _FS.is_dir(agent_skills_dir):
+                    _link_learned_skills(agent_skills_dir)
+    return applied
+
+
+# --- Verify (--verify) ---
+
+VERIFY_REPORT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class _VerifyCheck:
+    """One managed item of one agent home to verify (internal use).
+
+    ``render`` marks base/overlay/spokes, compared against their rendering
+    for the agent; additive items (skills) are only checked for existence,
+    since sync never overwrites them.
+    """
+
+    agent: AgentTarget
+    item: _SyncItem
+    render: bool = False
+
+
+def _verify_checks(
+    dotfiles_dir: Path, agent: AgentTarget, additional: list[_SyncItem]
+) -> list[_VerifyCheck]:
+    """Every item a sync would write to the agent home, as _build_sync_plan."""
+    checks = [
+        _VerifyCheck(agent, _SyncItem(source, relative_path, False), render=True)
+        for source, relative_path in _main_file_sources(dotfiles_dir, agent)
+    ]
+    checks.extend(
+        _VerifyCheck(
+            agent,
+            item,
+            render=not item.is_directory and _is_spoke(item.relative_path),
+        )
+        for item in additional
+        if _agent_receives(agent, item)
+    )
+    return checks
+
+
+def _verify_item(
+    check: _VerifyCheck, snapshot: _SourceSnapshot, index: _DigestIndex
+) -> Literal["ok", "modified", "missing"]:
+    """Compare one deployed item with its source (read-only; hashes on miss)."""
+    target = check.agent.directory / check.item.relative_path
+    try:
+        st = target.stat() if check.render else target.lstat()
+    except FileNotFoundError:
+        return "missing"
+    _count(stat=1)
+    if _is_additive_item(check.item.relative_path):
+        return "ok"
+    if stat.S_ISLNK(st.st_mode):
+        return "modified"  # sync replaces symlinked targets with real copies
+    if check.item.is_directory:
+        if not stat.S_ISDIR(st.st_mode):
+            return "modified"
+        same = _tree_digest(target, index) == snapshot.digest(check.item)
+    elif not stat.S_ISREG(st.st_mode):
+        return "modified"
+    elif check.render:
+        data, digest = snapshot.rendered(check.item.source, check.agent)
+        same = st.st_size == len(data) and _file_digest(target, index, st) == digest
+    else:
+        same = _file_digest(target, index, st) == snapshot.digest(check.item)
+    return "ok" if same else "modified"
+
+
+# --- Bundles (--bundle-out / --bundle-install) ---
+
+BUNDLE_VERSION = 1
+# First member of every bundle: {"version", "agent", "home", "files": {rel:
+# {"sha256", "size", "mode"}}}. Installs read it before any file.
+BUNDLE_INDEX_MEMBER = ".bundle.json"
+# zstd where tarfile has it (Python 3.14+), gzip otherwise.
+BUNDLE_COMPRESSION = "zst" if "zst" in tarfile.TarFile.OPEN_METH else "gz"
+
+
+@dataclass(frozen=True)
+class _BundleFile:
+    """One file of an agent-home bundle (internal use).
+
+    Exactly one of ``source`` (copied byte-for-byte) and ``data`` (rendered
+    bytes) is set; ``mtime_ns`` is the source's, so installed files keep it.
+    """
+
+    rel: str
+    sha256: str
+    size: int
+    mode: int
+    mtime_ns: int
+    source: Path | None = None
+    data: bytes | None = None
+
+
+class _HashingReader:
+    """File wrapper hashing what tarfile reads from it (internal use)."""
+
+    def __init__(self, f: io.BufferedReader) -> None:
+        self._f = f
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._f.read(size)
+        self.sha256.update(chunk)
+        return chunk
+
+
+def _bundle_files(
+    dotfiles_dir: Path,
+    agent: AgentTarget,
+    additional: list[_SyncItem],
+    snapshot: _SourceSnapshot,
+) -> list[_BundleFile]:
+    """Every file a first sync would write to the agent home, with digests.
+
+    Same item selection as _build_sync_plan; directory items are expanded as
+    _scan_tree sees them (excluded children and dangling symlinks skipped),
+    and digests come from the dotfiles digest index where it is warm.
+    """
+    files: list[_BundleFile] = []
+
+    def _add_rendered(source: Path, rel: str) -> None:
+        data, digest = snapshot.rendered(source, agent)
+        st = source.stat()
+        files.append(
+            _BundleFile(rel, digest, len(data), 0o644, st.st_mtime_ns, data=data)
+        )
+
+    def _add_file(source: Path, rel: str, st: os.stat_result) -> None:
+        digest = _cached_digest(
+            source, snapshot.index, st.st_size, st.st_mtime_ns, st.st_ino
+        )
+        mode = stat.S_IMODE(st.st_mode)
+        files.append(
+            _BundleFile(rel, digest, st.st_size, mode, st.st_mtime_ns, source=source)
+        )
+
+    for source, rel in _main_file_sources(dotfiles_dir, agent):
+        _add_rendered(source, rel)
+    for item in additional:
+        if not _agent_receives(agent, item):
+            continue
+        if not item.is_directory:
+            if _is_spoke(item.relative_path):
+                _add_rendered(item.source, item.relative_path)
+            else:
+                _add_file(item.source, item.relative_path, item.source.stat())
+            continue
+        for entry in _scan_tree(item.source):
+            if entry.kind == "f":
+                path = item.source / entry.rel
+                _add_file(path, f"{item.relative_path}/{entry.rel}", path.stat())
+    return files
+
+
+def _bundle_member_path(name: str) -> str | None:
+    """A member name safe to place under the home (relative, no ``..``)."""
+    parts = name.split("/")
+    if name.startswith("/") or any(p in ("", ".", "..") for p in parts):
+        return None
+    return name
+
+
+def _write_bundle(path: Path, agent: AgentTarget, files: list[_BundleFile]) -> None:
+    """Write the index member, then every file, into a staged archive."""
+    index = {
+        "version": BUNDLE_VERSION,
+        "agent": agent.key,
+        "home": str(agent.directory),
+        "files": {
+            f.rel: {"sha256": f.sha256, "size": f.size, "mode": f.mode} for f in files
+        },
+    }
+    tmp = _stage_path(path)
+    try:
+        with tarfile.open(tmp, f"w:{BUNDLE_COMPRESSION}") as tar:
+            data = json.dumps(index, separators=(",", ":")).encode()
+            info = tarfile.TarInfo(BUNDLE_INDEX_MEMBER)
+            info.size, info.mode, info.mtime = len(data), 0o644, time.time()
+            tar.addfile(info, io.BytesIO(data))
+            for f in files:
+                info = tarfile.TarInfo(f.rel)
+                info.size, info.mode = f.size, f.mode
+                info.mtime = f.mtime_ns / 1_000_000_000
+                if f.data is not None:
+                    tar.addfile(info, io.BytesIO(f.data))
+                    continue
+                with open(f.source, "rb") as src:
+                    reader = _HashingReader(src)
+                    tar.addfile(info, reader)
+                _count(read=f.size)
+                if reader.sha256.hexdigest() != f.sha256:
+                    raise OSError(f"{f.source} changed while bundling")
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
 # --- Public API ---
 
 
@@ -1415,6 +4086,7 @@ def import_only_mode(
     agents: list[AgentTarget] | None = None,
     preview: bool = False,
     exclude_dirs: frozenset[str] = frozenset(),
+    link_mode: LinkMode = "copy",
 ) -> None:
     """Run Phase 1 (target -> dotfiles) only; skip forward sync and deletions.
 
@@ -1430,6 +4102,7 @@ def import_only_mode(
         preview: If True, only print the plan without applying changes.
         exclude_dirs: Sync-directory names to skip entirely (e.g. skills
             under --no-skills).
+        link_mode: How imported files are materialized in dotfiles.
     """
     if agents is None:
         agents = _select_agents(list(_DEFAULT_TARGETS))
@@ -1439,10 +4112,13 @@ def import_only_mode(
     print(f"🎯 Targets: {', '.join(a.key for a in agents) or '(none)'}")
 
     manifest = _load_manifest(dotfiles_dir)
+    snapshot = _scan_source(dotfiles_dir)
 
     has_imports = False
     for agent in agents:
-        plan = _build_import_plan(dotfiles_dir, agent, manifest, exclude_dirs)
+        plan = _build_import_plan(
+            dotfiles_dir, agent, manifest, exclude_dirs, snapshot=snapshot
+        )
         if not plan.items:
             continue
 
@@ -1454,7 +4130,7 @@ def import_only_mode(
 
         importable = [a for a in plan.items if a.status == "import"]
         if importable:
-            _apply_import(plan)
+            _apply_import(plan, link_mode)
             for imported in importable:
                 dir_name = imported.relative_path.split("/")[0]
                 item_name = imported.relative_path.split("/", 1)[1]
@@ -1462,6 +4138,8 @@ def import_only_mode(
                 if item_name not in manifest.items[dir_name]:
                     manifest.items[dir_name].append(item_name)
             has_imports = True
+            # The import changed the source: later agents must see it.
+            snapshot = _scan_source(dotfiles_dir)
         for d in (a for a in plan.items if a.status == "deleted"):
             print(f"  ⏭️  {d.relative_path}: Skipped (deleted from dotfiles)")
         for c in (a for a in plan.items if a.status == "conflict"):
@@ -1483,36 +4161,358 @@ def import_only_mode(
         print("\n✅ Nothing to import.")
 
 
-def preview_mode(
-    dotfiles_dir: Path,
-    agents: list[AgentTarget] | None = None,
-    exclude_dirs: frozenset[str] = frozenset(),
-) -> None:
-    """Preview mode: show what would be synced without applying changes.
+# Plan files (--plan-out / --apply-plan): the non-synced actions of a preview,
+# with paths relative to the dotfiles dir / agent home so a plan computed in
+# CI applies on any machine. Each action records its source content digest
+# and its target pre-state; apply refuses an action when either moved.
+PLAN_FILE_VERSION = 1
 
-    Args:
-        dotfiles_dir: Path to dotfiles directory containing ROOT_AGENTS files.
+
+def _pre_state(path: Path, index: _DigestIndex) -> dict | None:
+    """A path's pre-state for a plan file; None when it does not exist.
+
+    Files carry their stat signature (same-machine fast check) and content
+    digest (portable check), directories their tree digest, symlinks their
+    link text.
+    """
+    try:
+        st = path.lstat()
+    except FileNotFoundError:
+        return None
+    if stat.S_ISLNK(st.st_mode):
+        return {"kind": "l", "link": os.readlink(path)}
+    if stat.S_ISDIR(st.st_mode):
+        return {"kind": "d", "digest": _tree_digest(path, index)}
+    digest = _cached_digest(path, index, st.st_size, st.st_mtime_ns, st.st_ino)
+    return {
+        "kind": "f",
+        "sig": [st.st_size, st.st_mtime_ns, st.st_ino],
+        "digest": digest,
+    }
+
+
+def _pre_state_matches(path: Path, recorded: dict | None, index: _DigestIndex) -> bool:
+    """True if path is still in the recorded pre-state (see _pre_state)."""
+    try:
+        st = path.lstat()
+    except FileNotFoundError:
+        return recorded is None
+    if recorded is None:
+        return False
+    if stat.S_ISLNK(st.st_mode):
+        return recorded["kind"] == "l" and os.readlink(path) == recorded["link"]
+    if stat.S_ISDIR(st.st_mode):
+        return recorded["kind"] == "d" and (
+            _tree_digest(path, index) == recorded["digest"]
+        )
+    if recorded["kind"] != "f":
+        return False
+    if [st.st_size, st.st_mtime_ns, st.st_ino] == recorded["sig"]:
+        return True
+    digest = _cached_digest(path, index, st.st_size, st.st_mtime_ns, st.st_ino)
+    return digest == recorded["digest"]
+
+
+def _content_digest(path: Path, is_directory: bool, index: _DigestIndex) -> str:
+    return _tree_digest(path, index) if is_directory else _file_digest(path, index)
+
+
+def _write_plan_file(
+    plan_path: Path,
+    dotfiles_dir: Path,
+    import_plans: list[_ImportPlan],
+    plans: list[_SyncPlan],
+    source_index: _DigestIndex,
+) -> None:
+    """Serialize the actionable part of a preview to a compact JSON plan file."""
+    imports = []
+    for import_plan in import_plans:
+        agent = import_plan.agent
+        index = _load_digest_index(agent.directory)
+        imports.append(
+            {
+                "agent": agent.key,
+                "items": [
+                    {
+                        "rel": a.relative_path,
+                        "src": a.source_path.relative_to(agent.directory).as_posix(),
+                        "dest": a.dotfiles_dest.relative_to(dotfiles_dir).as_posix(),
+                        "dir": a.is_directory,
+                        "symlink": a.is_symlink,
+                        "digest": _content_digest(
+                            a.resolved_path, a.is_directory, index
+                        ),
+                        "pre": _pre_state(a.dotfiles_dest, source_index),
+                    }
+                    for a in import_plan.items
+                    if a.status == "import"
+                ],
+            }
+        )
+    agents = []
+    for plan in plans:
+        home = plan.agent.directory
+        index = plan.target_index or _load_digest_index(home)
+        agents.append(
+            {
+                "agent": plan.agent.key,
+                "items": [
+                    {
+                        "rel": a.relative_path,
+                        "src": a.source.relative_to(dotfiles_dir).as_posix(),
+                        "dst": a.target.relative_to(home).as_posix(),
+                        "dir": a.is_directory,
+                        "status": a.status,
+                        "render": a.render,
+                        "digest": _content_digest(
+                            a.source, a.is_directory, source_index
+                        ),
+                        "pre": _pre_state(a.target, index),
+                    }
+                    for a in plan.items
+                    if a.status != "synced"
+                ],
+                "deletions": [
+                    {
+                        "rel": d.relative_path,
+                        "dst": d.target.relative_to(home).as_posix(),
+                        "dir": d.is_directory,
+                        "reason": d.reason,
+                        "pre": _pre_state(d.target, index),
+                    }
+                    for d in plan.deletions
+                ],
+            }
+        )
+    data = {"version": PLAN_FILE_VERSION, "imports": imports, "agents": agents}
+    plan_path.write_text(
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+
+
+def _plan_path(base: Path, rel: object, written: bool = False) -> Path | None:
+    """base / rel for a path read from a plan file, or None if it escapes base.
+
+    rel must pass the bundle-member rule (_bundle_member_path: relative, no
+    ``..``). For a path the apply writes or removes, the resolved parent must
+    also stay under base, so a symlinked directory cannot redirect the write.
+    """
+    if not isinstance(rel, str) or _bundle_member_path(rel) is None:
+        return None
+    path = base / rel
+    if written and not path.parent.resolve().is_relative_to(base.resolve()):
+        return None
+    return path
+
+
+def apply_plan_mode(
+    dotfiles_dir: Path,
+    plan_path: Path,
+    agents: list[AgentTarget] | None = None,
+    link_mode: LinkMode = "copy",
+) -> None:
+    """Apply a plan file written by ``--preview --plan-out`` without rescanning.
+
+    The reviewed plan is the confirmation, so nothing prompts. Every action is
+    checked first: its paths must stay inside the dotfiles and the agent home
+    (_plan_path), its source must still have the planned content and its
+    target the recorded pre-state, otherwise it is refused (reported, exit 1
+    at the end) while the rest still apply. Settings merges are recomputed at
+    apply time like in sync_mode.
+
+    Args:
+        dotfiles_dir: Path to dotfiles directory.
+        plan_path: JSON plan file.
+        agents: Agents the plan's keys resolve against (actions for any other
+            key are refused). None means AGENTS.
+        link_mode: How non-rendered files are materialized (see sync_mode).
+    """
+    _print_header("Apply Plan")
+    try:
+        data = json.loads(plan_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: cannot read plan {plan_path}: {e}")
+        sys.exit(2)
+    if data.get("version") != PLAN_FILE_VERSION:
+        print(f"❌ Error: unsupported plan version {data.get('version')!r}")
+        sys.exit(2)
+
+    by_key = {a.key: a for a in (AGENTS if agents is None else agents)}
+    manifest = _load_manifest(dotfiles_dir)
+    source_index = _load_digest_index(dotfiles_dir)
+    settings = _load_settings_sources(dotfiles_dir)
+    refused = 0
+
+    def _refuse(agent_name: str, rel: str, why: str) -> None:
+        nonlocal refused
+        refused += 1
+        print(f"  ⛔ {rel} ({agent_name}): Refused ({why})")
+
+    for entry in data["imports"]:
+        agent = by_key.get(entry["agent"])
+        if agent is None:
+            for raw in entry["items"]:
+                _refuse(entry["agent"], raw["rel"], "target not selected")
+            continue
+        index = _load_digest_index(agent.directory)
+        accepted: list[_ImportAction] = []
+        for raw in entry["items"]:
+            source = _plan_path(agent.directory, raw["src"])
+            dest = _plan_path(dotfiles_dir, raw["dest"], written=True)
+            if source is None or dest is None:
+                _refuse(agent.name, raw["rel"], "path outside the home or dotfiles")
+                continue
+            resolved = source.resolve()
+            if not resolved.exists() or (
+                _content_digest(resolved, raw["dir"], index) != raw["digest"]
+            ):
+                _refuse(agent.name, raw["rel"], "source changed since plan")
+            elif not _pre_state_matches(dest, raw["pre"], source_index):
+                _refuse(agent.name, raw["rel"], "dotfiles changed since plan")
+            else:
+                accepted.append(
+                    _ImportAction(
+                        source_path=source,
+                        resolved_path=resolved,
+                        dotfiles_dest=dest,
+                        relative_path=raw["rel"],
+                        is_directory=raw["dir"],
+                        is_symlink=raw["symlink"],
+                        status="import",
+                    )
+                )
+        if accepted:
+            print(f"\n⬅️  Importing from {agent.name}...")
+            _apply_import(_ImportPlan(agent=agent, items=accepted), link_mode)
+            for imported in accepted:
+                dir_name, item_name = imported.relative_path.split("/", 1)
+                names = manifest.items.setdefault(dir_name, [])
+                if item_name not in names:
+                    names.append(item_name)
+
+    for entry in data["agents"]:
+        agent = by_key.get(entry["agent"])
+        if agent is None:
+            for raw in (*entry["items"], *entry["deletions"]):
+                _refuse(entry["agent"], raw["rel"], "target not selected")
+            continue
+        home = agent.directory
+        index = _load_digest_index(home)
+        items: list[_SyncAction] = []
+        for raw in entry["items"]:
+            source = _plan_path(dotfiles_dir, raw["src"])
+            target = _plan_path(home, raw["dst"], written=True)
+            if source is None or target is None:
+                _refuse(agent.name, raw["rel"], "path outside the home or dotfiles")
+            elif not source.exists() or (
+                _content_digest(source, raw["dir"], source_index) != raw["digest"]
+            ):
+                _refuse(agent.name, raw["rel"], "source changed since plan")
+            elif not _pre_state_matches(target, raw["pre"], index):
+                _refuse(agent.name, raw["rel"], "target changed since plan")
+            else:
+                items.append(
+                    _SyncAction(
+                        source=source,
+                        target=target,
+                        relative_path=raw["rel"],
+                        is_directory=raw["dir"],
+                        status=raw["status"],
+                        render=raw["render"],
+                    )
+                )
+        deletions: list[_DeleteAction] = []
+        for raw in entry["deletions"]:
+            target = _plan_path(home, raw["dst"], written=True)
+            if target is None:
+                _refuse(agent.name, raw["rel"], "path outside the home")
+                continue
+            if not _pre_state_matches(target, raw["pre"], index):
+                _refuse(agent.name, raw["rel"], "target changed since plan")
+                continue
+            deletions.append(
+                _DeleteAction(
+                    target=target,
+                    relative_path=raw["rel"],
+                    is_directory=raw["dir"],
+                    reason=raw["reason"],
+                )
+            )
+        _save_digest_index(index)
+        plan = _SyncPlan(agent=agent, items=items, deletions=deletions)
+        _apply_plan(plan, dotfiles_dir, lambda p: True, None, link_mode, settings)
+    _save_digest_index(source_index)
+
+    # The plan did not look at everything a full sync does: no fingerprint,
+    # no incremental base until the next complete sync.
+    planned = [by_key[e["agent"]] for e in data["agents"] if e["agent"] in by_key]
+    for dir_name in SYNC_DIRECTORIES:
+        dir_path = dotfiles_dir / dir_name
+        if dir_path.is_dir():
+            current = set(manifest.items.get(dir_name, []))
+            current |= {c.name for c in dir_path.iterdir() if c.name[0] != "."}
+            manifest.items[dir_name] = sorted(current)
+    manifest.fingerprint = ""
+    for agent in planned:
+        manifest.synced.pop(agent.key, None)
+    _save_manifest(dotfiles_dir, manifest)
+
+    _link_learned_skills(dotfiles_dir / "skills")
+    for agent in planned:
+        if (agent.directory / "skills").is_dir():
+            _link_learned_skills(agent.directory / "skills")
+
+    if refused:
+        print(f"\n⚠️  {refused} action(s) refused; re-run --preview --plan-out")
+        sys.exit(1)
+    print("\n✨ Plan applied!")
+
+
+def preview_mode(
+    dotfiles_dir: Path,
+    agents: list[AgentTarget] | None = None,
+    exclude_dirs: frozenset[str] = frozenset(),
+    jobs: int = 1,
+    plan_out: Path | None = None,
+) -> None:
+    """Preview mode: show what would be synced without applying changes.
+
+    Args:
+        dotfiles_dir: Path to dotfiles directory containing ROOT_AGENTS files.
         agents: Filtered subset of AGENTS to operate on. None means default
             selection (claude only).
+        jobs: Number of agents planned concurrently (thread pool).
+        plan_out: Also write the previewed imports/actions/deletions to this
+            JSON plan file (apply it later with apply_plan_mode).
     """
     if agents is None:
         agents = _select_agents(list(_DEFAULT_TARGETS))
     _print_header("Sync Preview (Dry Run)")
 
     source_base = dotfiles_dir / BASE_FILE
-    if not source_base.exists():
+    if not _FS.exists(source_base):
         print(f"❌ Error: Base file not found: {source_base}")
         sys.exit(1)
 
     print(f"🎯 Targets: {', '.join(a.key for a in agents) or '(none)'}")
 
     manifest = _load_manifest(dotfiles_dir)
+    # Digest caches are read but not saved: preview writes nothing.
+    source_index = _load_digest_index(dotfiles_dir)
+    with _phase("source scan"):
+        snapshot = _scan_source(dotfiles_dir, source_index)
 
     # Phase 1: Import preview (only from selected import sources)
     has_imports = False
     import_sources = [a for a in agents if a.is_import_source]
+    import_plans: list[_ImportPlan] = []
     for agent in import_sources:
-        import_plan = _build_import_plan(dotfiles_dir, agent, manifest, exclude_dirs)
+        with _phase("import plan", agent=agent.key):
+            import_plan = _build_import_plan(
+                dotfiles_dir, agent, manifest, exclude_dirs, snapshot=snapshot
+            )
+        import_plans.append(import_plan)
         if import_plan.items:
             print(f"\n⬅️  Import from {agent.name}: {agent.directory}")
             if _print_import_plan(import_plan, verbose=True):
@@ -1521,34 +4521,123 @@ def preview_mode(
     # Phase 2-3: Forward sync + deletion + orphan preview
     additional = [
         item
-        for item in _get_additional_sources(dotfiles_dir)
+        for item in _get_additional_sources(dotfiles_dir, snapshot=snapshot)
         if item.relative_path.split("/")[0] not in exclude_dirs
     ]
-    plans: list[_SyncPlan] = []
-    for agent in agents:
-        sync_plan = _build_sync_plan(dotfiles_dir, agent, additional)
-        sync_plan.deletions = _build_deletion_plan(dotfiles_dir, agent, manifest)
-        sync_plan.deletions.extend(
-            _detect_target_only_items(dotfiles_dir, agent, manifest)
-        )
-        sync_plan.deletions.extend(_detect_managed_dir_orphans(agent, additional))
-        plans.append(sync_plan)
+
+    def _plan(agent: AgentTarget) -> _SyncPlan:
+        with _phase("plan", agent=agent.key):
+            return _plan_agent(dotfiles_dir, agent, additional, manifest, snapshot)
+
+    plans = _map_agents(_plan, agents, jobs)
 
     has_changes = _print_plan(
-        plans, dotfiles_dir, verbose=True, exclude_dirs=exclude_dirs
+        plans,
+        dotfiles_dir,
+        verbose=True,
+        exclude_dirs=exclude_dirs,
+        snapshot=snapshot,
+        settings=_load_settings_sources(dotfiles_dir),
     )
 
-    if has_imports or has_changes:
+    if plan_out is not None:
+        _write_plan_file(plan_out, dotfiles_dir, import_plans, plans, source_index)
+        print(f"\n📝 Plan written to {plan_out}")
+
+    if plan_out is not None and (has_imports or has_changes):
+        print(f"💡 Run with --apply-plan {plan_out} to apply exactly this plan")
+    elif has_imports or has_changes:
         print("\n💡 Run without --preview to apply changes")
     else:
         print("\n✅ All files are already in sync!")
 
 
+def simulate_mode(
+    dotfiles_dir: Path,
+    agents: list[AgentTarget] | None = None,
+    exclude_dirs: frozenset[str] = frozenset(),
+    jobs: int = 1,
+) -> dict[str, list[_Projected]]:
+    """Simulate mode: project the outcome of a --yes sync without writing.
+
+    Plans like preview_mode, then runs the real apply for every agent against
+    a _MemoryFS, so the report is file-level: the files inside directory items
+    that would actually change, settings.json merges and deletions. Imports
+    are not projected (they change the dotfiles the plan is built from).
+    Digest caches and the manifest are read but not saved.
+
+    Returns the projected changes per agent key.
+    """
+    if agents is None:
+        agents = _select_agents(list(_DEFAULT_TARGETS))
+    _print_header("Sync Simulation (nothing is written)")
+
+    source_base = dotfiles_dir / BASE_FILE
+    if not _FS.exists(source_base):
+        print(f"❌ Error: Base file not found: {source_base}")
+        sys.exit(1)
+
+    print(f"🎯 Targets: {', '.join(a.key for a in agents) or '(none)'}")
+
+    manifest = _load_manifest(dotfiles_dir)
+    source_index = _load_digest_index(dotfiles_dir)
+    with _phase("source scan"):
+        snapshot = _scan_source(dotfiles_dir, source_index)
+    additional = [
+        item
+        for item in _get_additional_sources(dotfiles_dir, snapshot=snapshot)
+        if item.relative_path.split("/")[0] not in exclude_dirs
+    ]
+    settings = _load_settings_sources(dotfiles_dir)
+
+    def _project(agent: AgentTarget) -> list[_Projected]:
+        with _phase("plan", agent=agent.key):
+            plan = _plan_agent(dotfiles_dir, agent, additional, manifest, snapshot)
+        fs = _MemoryFS(base=_FS)
+        with _phase("simulate", agent=agent.key):
+            _apply_plan(
+                plan, dotfiles_dir, lambda p: True, io.StringIO(), "copy", settings, fs
+            )
+        return sorted(fs.changes.values(), key=lambda c: c.path)
+
+    projected = dict(zip((a.key for a in agents), _map_agents(_project, agents, jobs)))
+
+    icons = {"create": "+", "update": "~", "delete": "-"}
+    totals = {"create": 0, "update": 0, "delete": 0}
+    written = 0
+    for agent in agents:
+        changes = projected[agent.key]
+        print(f"\n📋 {agent.name}: {agent.directory}")
+        if not changes:
+            print("  ✅ unchanged")
+        for change in changes:
+            shown = (
+                change.path.relative_to(agent.directory)
+                if change.path.is_relative_to(agent.directory)
+                else change.path
+            )
+            size = "" if change.change == "delete" else f" ({change.size} B)"
+            print(f"  {icons[change.change]} {shown}{size}")
+            totals[change.change] += 1
+            if change.change != "delete":
+                written += change.size
+
+    print(
+        f"\n📊 Projected: {totals['create']} created, {totals['update']} updated, "
+        f"{totals['delete']} deleted, {written} bytes written"
+    )
+    return projected
+
+
 def sync_mode(
     dotfiles_dir: Path,
     auto_yes: bool = False,
     agents: list[AgentTarget] | None = None,
     exclude_dirs: frozenset[str] = frozenset(),
+    jobs: int = 1,
+    link_mode: LinkMode = "copy",
+    force_scan: bool = False,
+    incremental: bool = False,
 ) -> None:
     """Sync mode: apply sync to selected agent directories.
 
@@ -1565,6 +4654,17 @@ def sync_mode(
         exclude_dirs: Sync-directory names to skip entirely in BOTH import and
             forward (e.g. {"skills"} under --no-skills) so instruction-only
             deploys never touch / import / copy those dirs.
+        jobs: Number of agents planned and applied concurrently. With
+            jobs > 1 every confirmation is asked up front, then each agent is
+            applied on a thread pool with its output buffered in plan order.
+        link_mode: How non-rendered files are materialized: "copy" (copy2),
+            "reflink" (FICLONE / copy_file_range clone) or "hardlink" (shared
+            inode). Unsupported filesystems fall back to copy2.
+        force_scan: Plan every item even when the whole-state fingerprint
+            recorded by the last complete sync still matches.
+        incremental: Plan only the items git reports as changed since the
+            selected agents' last complete sync (see _incremental_items);
+            falls back to a full scan when that cannot be trusted.
     """
     if agents is None:
         agents = _select_agents(list(_DEFAULT_TARGETS))
@@ -1572,21 +4672,67 @@ def sync_mode(
     print(f"🎯 Targets: {', '.join(a.key for a in agents) or '(none)'}")
 
     source_base = dotfiles_dir / BASE_FILE
-    if not source_base.exists():
+    if not _FS.exists(source_base):
         print(f"❌ Error: Base file not found: {source_base}")
         sys.exit(1)
 
     manifest = _load_manifest(dotfiles_dir)
+    source_index = _load_digest_index(dotfiles_dir)
+    only: frozenset[str] | None = None
+    if incremental:
+        only, reason = _incremental_items(dotfiles_dir, manifest, agents)
+        if only is None:
+            print(f"ℹ️  Incremental: full scan ({reason})")
+        else:
+            print(f"ℹ️  Incremental: {len(only)} changed item(s) since last sync")
+    with _phase("source scan"):
+        snapshot = _scan_source(dotfiles_dir, source_index, only)
+
+    # Fast path: nothing that could change the outcome moved since the last
+    # complete sync (most runs: shell init, post-pull hooks).
+    def _fingerprint() -> str:
+        return _sync_fingerprint(
+            dotfiles_dir, snapshot, manifest, agents, exclude_dirs, link_mode
+        )
 
-    # Phase 1: Import from selected import sources into dotfiles
-    import_sources = [a for a in agents if a.is_import_source]
+    with _phase("fingerprint"):
+        unchanged = only is None and not force_scan
+        unchanged = unchanged and manifest.fingerprint == _fingerprint()
+    if unchanged:
+        print("\n✅ All files are already in sync! (fingerprint unchanged)")
+        return
+
+    # Taken before anything is written: edits racing this run stay "changed"
+    # for the next incremental run instead of being recorded as synced.
+    git_state = _git_state(dotfiles_dir)
+
+    def _record_complete_sync() -> None:
+        # A partial snapshot cannot be fingerprinted; the next full run will.
+        manifest.fingerprint = _fingerprint() if only is None else ""
+        for agent in agents:
+            if git_state is None:
+                manifest.synced.pop(agent.key, None)
+                continue
+            manifest.synced[agent.key] = _SyncedState(
+                commit=git_state[0],
+                dirty=tuple(sorted(git_state[1])),
+                target=_target_state_digest(agent),
+            )
+
+    # Phase 1: Import from selected import sources into dotfiles. Skipped
+    # under a trusted incremental run: untouched homes have nothing to import.
+    import_sources = [a for a in agents if a.is_import_source and only is None]
     has_imports = False
     for agent in import_sources:
-        import_plan = _build_import_plan(dotfiles_dir, agent, manifest, exclude_dirs)
+        with _phase("import plan", agent=agent.key):
+            import_plan = _build_import_plan(
+                dotfiles_dir, agent, manifest, exclude_dirs, snapshot=snapshot
+            )
         importable = [a for a in import_plan.items if a.status == "import"]
         if importable:
             print(f"\n⬅️  Importing from {agent.name}...")
-            _apply_import(import_plan)
+            with _phase("import apply", agent=agent.key):
+                _apply_import(import_plan, link_mode)
             # Add newly imported items to manifest
             for imported in importable:
                 dir_name = imported.relative_path.split("/")[0]
@@ -1595,6 +4741,9 @@ def sync_mode(
                 if item_name not in manifest.items[dir_name]:
                     manifest.items[dir_name].append(item_name)
             has_imports = True
+            # The import changed the source: rescan once for what follows.
+            with _phase("source scan"):
+                snapshot = _scan_source(dotfiles_dir, source_index)
         deleted = [a for a in import_plan.items if a.status == "deleted"]
         for d in deleted:
             print(f"  ⏭️  {d.relative_path}: Skipped (deleted from dotfiles)")
@@ -1608,107 +4757,529 @@ def sync_mode(
     # Phase 2-3: Plan and apply forward sync + deletions + orphans
     additional = [
         item
-        for item in _get_additional_sources(dotfiles_dir)
+        for item in _get_additional_sources(dotfiles_dir, snapshot=snapshot)
         if item.relative_path.split("/")[0] not in exclude_dirs
     ]
-    plans: list[_SyncPlan] = []
-    for agent in agents:
-        sync_plan = _build_sync_plan(dotfiles_dir, agent, additional)
-        sync_plan.deletions = _build_deletion_plan(dotfiles_dir, agent, manifest)
-        sync_plan.deletions.extend(
-            _detect_target_only_items(dotfiles_dir, agent, manifest)
-        )
-        sync_plan.deletions.extend(_detect_managed_dir_orphans(agent, additional))
-        plans.append(sync_plan)
 
+    def _plan(agent: AgentTarget) -> _SyncPlan:
+        with _phase("plan", agent=agent.key):
+            return _plan_agent(
+                dotfiles_dir,
+                agent,
+                additional,
+                manifest,
+                snapshot,
+                save_index=True,
+                prune_index=only is None,
+            )
+
+    plans = _map_agents(_plan, agents, jobs)
+    _save_digest_index(source_index, prune=only is None)
+
+    # Hook + shared/OS settings layers: parsed once for every agent's merge.
+    settings = _load_settings_sources(dotfiles_dir)
     has_changes = _print_plan(
-        plans, dotfiles_dir, verbose=False, exclude_dirs=exclude_dirs
+        plans,
+        dotfiles_dir,
+        verbose=False,
+        exclude_dirs=exclude_dirs,
+        snapshot=snapshot,
+        settings=settings,
     )
 
     if not has_changes:
         print("\n✅ All files are already in sync!")
+        _record_items(
+            manifest,
+            snapshot,
+            {p.agent.key: {a.relative_path for a in p.items} for p in plans},
+        )
+        _record_complete_sync()
         _save_manifest(dotfiles_dir, manifest)
         return
 
     print()
 
-    for plan in plans:
-        print(f"\n📋 Processing {plan.agent.name}...")
+    in_sync: dict[str, set[str]] = {}
+    if jobs <= 1:
+        for plan in plans:
+            with _phase("apply", agent=plan.agent.key):
+                in_sync[plan.agent.key] = _apply_plan(
+                    plan,
+                    dotfiles_dir,
+                    lambda p: auto_yes or _confirm(p),
+                    None,
+                    link_mode,
+                    settings,
+                )
+    else:
+        # Single confirmation pass up front (prompts cannot interleave across
+        # threads), then apply each agent on the pool with its output buffered
+        # and printed in plan order.
+        answers: list[dict[str, bool]] = []
+        for plan in plans:
+            prompts = _plan_prompts(plan)
+            if prompts and not auto_yes:
+                print(f"\n📋 {plan.agent.name}: confirm")
+            answers.append({p: auto_yes or _confirm(p) for p in prompts})
+        work = {id(plan.agent): (plan, answer) for plan, answer in zip(plans, answers)}
+
+        def _apply_buffered(agent: AgentTarget) -> tuple[str, set[str]]:
+            plan, answer = work[id(agent)]
+            out = io.StringIO()
+            with _phase("apply", agent=agent.key):
+                synced = _apply_plan(
+                    plan,
+                    dotfiles_dir,
+                    lambda p: answer.get(p, False),
+                    out,
+                    link_mode,
+                    settings,
+                )
+            return out.getvalue(), synced
 
-        plan.agent.directory.mkdir(parents=True, exist_ok=True)
+        applied = _map_agents(_apply_buffered, [p.agent for p in plans], jobs)
+        for plan, (output, synced) in zip(plans, applied):
+            print(output, end="")
+            in_sync[plan.agent.key] = synced
 
-        for action in plan.items:
-            if action.status == "synced":
-                continue
+    # Update manifest: union of current dotfiles + existing manifest
+    for dir_name in SYNC_DIRECTORIES:
+        current_items = set(manifest.items.get(dir_name, []))
+        current_items |= snapshot.names.get(dir_name, frozenset())
+        manifest.items[dir_name] = sorted(current_items)
+    _record_items(manifest, snapshot, in_sync)
 
-            icon = "📁" if action.is_directory else "📄"
+    # Post-sync: create symlinks for learned skills
+    # (workaround for Claude Code flat skill discovery)
+    with _phase("learned links"):
+        _link_learned_skills(dotfiles_dir / "skills")
+        for agent in agents:
+            agent_skills_dir = agent.directory / "skills"
+            if _FS.is_dir(agent_skills_dir):
+                _link_learned_skills(agent_skills_dir)
+
+    # Record the post-sync world only when nothing was left pending (a
+    # declined prompt must come back next run, not be fingerprinted away).
+    if auto_yes:
+        # Imports already rescanned; only new learned-skill links can differ.
+        linked = {
+            c.name
+            for c in _list_dir(dotfiles_dir / "skills") or ()
+            if not c.name.startswith(".")
+        }
+        if linked != snapshot.names.get("skills", frozenset()):
+            with _phase("source scan"):
+                snapshot = _scan_source(dotfiles_dir, source_index, only)
+        with _phase("fingerprint"):
+            _record_complete_sync()
+    else:
+        manifest.fingerprint = ""
+        for agent in agents:
+            manifest.synced.pop(agent.key, None)
+    _save_manifest(dotfiles_dir, manifest)
 
-            if action.status == "new":
-                _apply_sync_action(action, plan.agent)
-                print(f"  ✅ {icon} {action.relative_path}: Created")
+    print("\n✨ Sync completed!")
 
-            elif action.status == "changed":
-                if auto_yes or _confirm(f"  Overwrite {action.relative_path}?"):
-                    _apply_sync_action(action, plan.agent)
-                    print(f"  ✅ {icon} {action.relative_path}: Updated")
-                else:
-                    print(f"  ⏭️  {icon} {action.relative_path}: Skipped")
-
-        # Merge the Claude hook fragment into the agent's settings.json
-        # (claude-family only; idempotent, manifest-independent).
-        if plan.agent.receives_hooks and _merge_hook_settings(dotfiles_dir, plan.agent):
-            print("  ✅ 📄 settings.json: hooks merged")
-
-        # Merge the shared settings fragment (env owned wholesale + curated
-        # top-level keys; claude-family only). Sequential after the hook merge so
-        # each reads the freshly written settings.json -- no lost update.
-        if plan.agent.receives_hooks and _merge_settings_fragment(
-            dotfiles_dir, plan.agent
-        ):
-            print("  ✅ 📄 settings.json: shared settings merged")
 
-        # Apply deletions
-        for deletion in plan.deletions:
-            icon = "📁" if deletion.is_directory else "📄"
-            if deletion.reason == "orphan":
-                prompt = (
-                    f"  Delete {deletion.relative_path} (target-only, not in dotfiles)?"
-                )
-            else:
-                prompt = f"  Delete {deletion.relative_path}?"
-            if auto_yes or _confirm(prompt):
-                if deletion.target.is_symlink():
-                    deletion.target.unlink()
-                elif deletion.is_directory:
-                    shutil.rmtree(deletion.target)
-                else:
-                    deletion.target.unlink()
-                print(f"  🗑️  {icon} {deletion.relative_path}: Deleted")
+def watch_mode(
+    dotfiles_dir: Path,
+    agents: list[AgentTarget] | None = None,
+    exclude_dirs: frozenset[str] = frozenset(),
+    link_mode: LinkMode = "copy",
+    debounce: float = WATCH_DEBOUNCE_S,
+    poll_interval: float | None = None,
+    stop: threading.Event | None = None,
+) -> None:
+    """Watch mode: push dotfiles edits to selected agents as they happen.
+
+    Subscribes to inotify on the sync sources (ROOT_AGENTS*, SYNC_DIRECTORIES,
+    settings fragments, skills denylist), falling back to stat polling, and
+    applies each debounced batch through _sync_changed_items: only the
+    touched items are scanned, planned and written, without prompts.
+
+    Args:
+        dotfiles_dir: Path to dotfiles directory containing ROOT_AGENTS files.
+        agents: Filtered subset of AGENTS to operate on. None means default
+            selection (claude only).
+        exclude_dirs: Sync-directory names never propagated (--no-skills).
+        link_mode: How non-rendered files are materialized (see sync_mode).
+        debounce: Seconds of quiet that close a batch of edits.
+        poll_interval: Force the polling watcher with this period (seconds).
+        stop: Set to end the watch (the CLI stops on Ctrl-C instead).
+    """
+    if agents is None:
+        agents = _select_agents(list(_DEFAULT_TARGETS))
+    print("👀 Watching Agent Instructions...")
+    print(f"🎯 Targets: {', '.join(a.key for a in agents) or '(none)'}")
+
+    source_base = dotfiles_dir / BASE_FILE
+    if not _FS.exists(source_base):
+        print(f"❌ Error: Base file not found: {source_base}")
+        sys.exit(1)
+
+    if stop is None:
+        stop = threading.Event()
+    watcher = _open_watcher(dotfiles_dir, poll_interval)
+    print(f"ℹ️  Watching {dotfiles_dir} ({watcher.kind}); Ctrl-C to stop")
+    try:
+        while not stop.is_set():
+            paths = _collect_changes(watcher, debounce, stop)
+            if paths is None:
+                print("\n🔁 Events were lost: replanning every item")
+            elif not paths:
+                continue
             else:
-                print(f"  ⏭️  {icon} {deletion.relative_path}: Skipped")
+                shown = ", ".join(sorted(paths)[:5])
+                more = f" (+{len(paths) - 5} more)" if len(paths) > 5 else ""
+                print(f"\n🔁 Changed: {shown}{more}")
+            if not _sync_changed_items(
+                dotfiles_dir, agents, paths, exclude_dirs, link_mode
+            ):
+                print("  ✅ All files are already in sync!")
+    except KeyboardInterrupt:
+        print("\n👋 Watch stopped")
+    finally:
+        watcher.close()
 
-    # Update manifest: union of current dotfiles + existing manifest
-    for dir_name in SYNC_DIRECTORIES:
-        dir_path = dotfiles_dir / dir_name
-        current_items = set(manifest.items.get(dir_name, []))
-        if dir_path.is_dir():
-            dotfiles_names = {
-                c.name for c in dir_path.iterdir() if not c.name.startswith(".")
+
+def verify_mode(
+    dotfiles_dir: Path,
+    agents: list[AgentTarget] | None = None,
+    exclude_dirs: frozenset[str] = frozenset(),
+    jobs: int | None = None,
+    rehash: bool = False,
+    out: TextIO | None = None,
+) -> int:
+    """Verify mode: report drift of deployed agent homes as JSON, read-only.
+
+    Every item a sync would write is compared with its dotfiles source on a
+    pool of hashing workers: target digests are served from each home's
+    digest index while the file's stat is unchanged (``rehash`` ignores the
+    caches), and nothing is written -- no index, manifest or settings file.
+    Drift is "modified" / "missing" for managed items and "extra" for items a
+    sync would delete (removed from dotfiles, target-only orphans, stale
+    spokes/hooks); a claude-family settings.json whose hook or settings merge
+    would change is "modified".
+
+    Args:
+        dotfiles_dir: Path to dotfiles directory containing ROOT_AGENTS files.
+        agents: Filtered subset of AGENTS to operate on. None means default
+            selection (claude only).
+        exclude_dirs: Sync-directory names not verified (--no-skills).
+        jobs: Hashing workers (None = the thread pool default, CPU-based).
+        rehash: Hash every target instead of trusting cached digests.
+        out: Where the JSON report goes (None = current stdout).
+
+    Returns:
+        The number of drifted items (0 = every home matches dotfiles).
+    """
+    if agents is None:
+        agents = _select_agents(list(_DEFAULT_TARGETS))
+    source_base = dotfiles_dir / BASE_FILE
+    if not _FS.exists(source_base):
+        print(f"❌ Error: Base file not found: {source_base}", file=sys.stderr)
+        sys.exit(1)
+
+    manifest = _load_manifest(dotfiles_dir)
+    # Digest caches are read but never saved: verify writes nothing.
+    with _phase("source scan"):
+        snapshot = _scan_source(dotfiles_dir, _load_digest_index(dotfiles_dir))
+    additional = [
+        item
+        for item in _get_additional_sources(dotfiles_dir, snapshot=snapshot)
+        if item.relative_path.split("/")[0] not in exclude_dirs
+    ]
+    settings = _load_settings_sources(dotfiles_dir)
+    indexes = {
+        agent.key: (
+            _DigestIndex(root=agent.directory)
+            if rehash
+            else _load_digest_index(agent.directory)
+        )
+        for agent in agents
+    }
+    checks = [
+        check
+        for agent in agents
+        for check in _verify_checks(dotfiles_dir, agent, additional)
+    ]
+    with _phase("verify"), ThreadPoolExecutor(max_workers=jobs) as pool:
+        statuses = list(
+            pool.map(lambda c: _verify_item(c, snapshot, indexes[c.agent.key]), checks)
+        )
+
+    reports = {
+        agent.key: {
+            "key": agent.key,
+            "directory": str(agent.directory),
+            "checked": 0,
+            "drift": [],
+        }
+        for agent in agents
+    }
+    for check, status in zip(checks, statuses):
+        report = reports[check.agent.key]
+        report["checked"] += 1
+        if status != "ok":
+            report["drift"].append(
+                {
+                    "path": check.item.relative_path,
+                    "status": status,
+                    "kind": "dir" if check.item.is_directory else "file",
+                }
+            )
+    for agent in agents:
+        report = reports[agent.key]
+        extras = _build_deletion_plan(dotfiles_dir, agent, manifest, snapshot)
+        extras.extend(
+            _detect_target_only_items(dotfiles_dir, agent, manifest, snapshot)
+        )
+        extras.extend(_detect_managed_dir_orphans(agent, additional, snapshot))
+        report["drift"].extend(
+            {
+                "path": extra.relative_path,
+                "status": "extra",
+                "kind": "dir" if extra.is_directory else "file",
+                "reason": extra.reason,
             }
-            current_items = current_items | dotfiles_names
-        manifest.items[dir_name] = sorted(current_items)
+            for extra in extras
+            if extra.relative_path.split("/")[0] not in exclude_dirs
+        )
+        if agent.receives_hooks:
+            report["checked"] += 1
+            try:
+                merged = _merge_agent_settings(
+                    dotfiles_dir, agent, dry_run=True, sources=settings
+                )
+            except ValueError:  # unparsable settings.json
+                merged = (True, True)
+            if any(merged):
+                report["drift"].append(
+                    {"path": "settings.json", "status": "modified", "kind": "file"}
+                )
 
-    _save_manifest(dotfiles_dir, manifest)
+    drifted = sum(len(r["drift"]) for r in reports.values())
+    result = {
+        "version": VERIFY_REPORT_VERSION,
+        "dotfiles": str(dotfiles_dir),
+        "clean": drifted == 0,
+        "agents": list(reports.values()),
+    }
+    print(json.dumps(result, indent=2, ensure_ascii=False), file=out)
+    return drifted
 
-    # Post-sync: create symlinks for learned skills
-    # (workaround for Claude Code flat skill discovery)
-    _link_learned_skills(dotfiles_dir / "skills")
+
+def export_bundle_mode(
+    dotfiles_dir: Path,
+    out_dir: Path,
+    agents: list[AgentTarget] | None = None,
+    exclude_dirs: frozenset[str] = frozenset(),
+    home: Path | None = None,
+) -> list[Path]:
+    """Bundle mode: write each agent's rendered home as one archive.
+
+    Each bundle holds every file a first sync would write (rendered
+    base/overlay/spokes, commands, skills, agents, hooks), preceded by a
+    BUNDLE_INDEX_MEMBER listing their sha256, size and mode, so
+    install_bundle_mode can provision a home in one sequential read. Spokes
+    embed the home's absolute path: ``home`` renders for another location
+    (e.g. a workspace's home; one agent only). settings.json is not bundled:
+    its merge depends on the home's own settings (run a sync for it).
+
+    Args:
+        dotfiles_dir: Path to dotfiles directory containing ROOT_AGENTS files.
+        out_dir: Directory receiving ``<key>.tar.<zst|gz>`` per agent.
+        agents: Filtered subset of AGENTS to operate on. None means default
+            selection (claude only).
+        exclude_dirs: Sync-directory names left out (--no-skills).
+        home: Render for this home directory instead of the agent's own.
+
+    Returns:
+        The bundle paths, in agent order.
+    """
+    if agents is None:
+        agents = _select_agents(list(_DEFAULT_TARGETS))
+    if home is not None and len(agents) != 1:
+        print("❌ Error: --bundle-home needs exactly one target")
+        sys.exit(2)
+    source_base = dotfiles_dir / BASE_FILE
+    if not _FS.exists(source_base):
+        print(f"❌ Error: Base file not found: {source_base}")
+        sys.exit(1)
+
+    source_index = _load_digest_index(dotfiles_dir)
+    with _phase("source scan"):
+        snapshot = _scan_source(dotfiles_dir, source_index)
+    additional = [
+        item
+        for item in _get_additional_sources(dotfiles_dir, snapshot=snapshot)
+        if item.relative_path.split("/")[0] not in exclude_dirs
+    ]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    bundles: list[Path] = []
     for agent in agents:
-        agent_skills_dir = agent.directory / "skills"
-        if agent_skills_dir.is_dir():
-            _link_learned_skills(agent_skills_dir)
+        target = agent if home is None else replace(agent, directory=home)
+        path = out_dir / f"{agent.key}.tar.{BUNDLE_COMPRESSION}"
+        with _phase("bundle export", agent=agent.key):
+            files = _bundle_files(dotfiles_dir, target, additional, snapshot)
+            _write_bundle(path, target, files)
+        size = sum(f.size for f in files)
+        print(
+            f"📦 {agent.name}: {path} ({len(files)} files, {size} bytes, "
+            f"for {target.directory})"
+        )
+        bundles.append(path)
+    _save_digest_index(source_index, prune=True)
+    return bundles
+
+
+def _read_bundle_index(tar: tarfile.TarFile) -> dict:
+    """The leading index member of a bundle, shape-checked (ValueError if not)."""
+    first = tar.next()
+    if first is None or first.name != BUNDLE_INDEX_MEMBER or not first.isfile():
+        raise ValueError("not an agent-home bundle")
+    index = json.load(tar.extractfile(first))
+    if not isinstance(index, dict) or index.get("version") != BUNDLE_VERSION:
+        raise ValueError("unsupported bundle version")
+    files = index.get("files")
+    if not isinstance(index.get("home"), str) or not isinstance(files, dict):
+        raise ValueError("malformed bundle index")
+    for rel, meta in files.items():
+        if not (
+            isinstance(meta, dict)
+            and isinstance(meta.get("sha256"), str)
+            and isinstance(meta.get("size"), int)
+            and isinstance(meta.get("mode"), int)
+        ):
+            raise ValueError(f"malformed bundle index entry {rel!r}")
+    return index
 
-    print("\n✨ Sync completed!")
+
+def install_bundle_mode(
+    bundle: Path,
+    home: Path | None = None,
+    agents: list[AgentTarget] | None = None,
+) -> None:
+    """Install mode: unpack an export_bundle_mode archive into an agent home.
+
+    No planning: the archive is read once, every file is staged inside the
+    home and checked against the bundle's digest index, and only a complete,
+    verified bundle is renamed into place (existing files are replaced,
+    nothing is deleted). Like a sync, additive items (skills) already in the
+    home are left alone, and no file is placed through a symlinked directory
+    that leaves the home. The home's digest index is seeded with the bundle
+    digests, so the next sync does not rehash what was just installed.
+
+    Args:
+        bundle: Archive written by export_bundle_mode.
+        home: Home to install into. None means the home of the one selected
+            agent. It must be the home the bundle was rendered for: the
+            archive never picks the directory it writes.
+        agents: Selected agents (the home when ``home`` is None).
+    """
+    if home is None:
+        if agents is None or len(agents) != 1:
+            print("❌ Error: --bundle-install needs --bundle-home or one target")
+            sys.exit(1)
+        home = agents[0].directory
+    print(f"📦 Installing {bundle}...")
+    try:
+        tar = tarfile.open(bundle, "r|*")
+    except (OSError, tarfile.TarError) as e:
+        print(f"❌ Error: cannot read bundle {bundle}: {e}")
+        sys.exit(1)
+    with tar, _phase("bundle install"):
+        try:
+            index = _read_bundle_index(tar)
+        except (OSError, ValueError, tarfile.TarError) as e:
+            print(f"❌ Error: cannot install {bundle}: {e}")
+            sys.exit(1)
+        rendered_for = Path(index["home"]).expanduser()
+        if home.expanduser().resolve() != rendered_for.resolve():
+            print(
+                f"❌ Error: {bundle} was rendered for {rendered_for}, not {home} "
+                f"(re-export with --bundle-home {home})"
+            )
+            sys.exit(1)
+        home = rendered_for
+        expected: dict[str, dict] = index["files"]
+
+        home.mkdir(parents=True, exist_ok=True)
+        stage = _stage_path(home / "bundle")
+        stage.mkdir()
+        staged: set[str] = set()
+        try:
+            while (member := tar.next()) is not None:
+                rel = _bundle_member_path(member.name)
+                meta = expected.get(rel) if rel is not None else None
+                if meta is None or not member.isfile() or rel in staged:
+                    raise ValueError(f"unexpected member {member.name!r}")
+                dest = stage / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                digest = hashlib.sha256()
+                with tar.extractfile(member) as src, dest.open("wb") as dst:
+                    while chunk := src.read(1 << 20):
+                        digest.update(chunk)
+                        dst.write(chunk)
+                _count(read=member.size)
+                if digest.hexdigest() != meta["sha256"]:
+                    raise ValueError(f"digest mismatch for {rel}")
+                os.chmod(dest, meta["mode"])
+                mtime_ns = int(member.mtime * 1_000_000_000)
+                os.utime(dest, ns=(mtime_ns, mtime_ns))
+                staged.add(rel)
+            missing = sorted(expected.keys() - staged)
+            if missing:
+                raise ValueError(f"{len(missing)} file(s) missing, e.g. {missing[0]}")
+        except (OSError, ValueError, tarfile.TarError) as e:
+            shutil.rmtree(stage, ignore_errors=True)
+            print(f"❌ Error: {bundle} failed verification: {e}")
+            sys.exit(1)
+
+        # Additive items are add-only (see _build_sync_plan): one already in
+        # the home, e.g. a bunx-skills symlink, is kept whole.
+        def _item(rel: str) -> str:
+            return "/".join(rel.split("/")[:2])
+
+        kept = {
+            _item(rel)
+            for rel in staged
+            if _is_additive_item(rel) and os.path.lexists(home / _item(rel))
+        }
+        placing = [rel for rel in sorted(staged) if _item(rel) not in kept]
+        outside = [rel for rel in placing if _plan_path(home, rel, True) is None]
+        if outside:
+            shutil.rmtree(stage)
+            print(f"❌ Error: {outside[0]} would be written outside {home}")
+            sys.exit(1)
+        for item in sorted(kept):
+            print(f"  ⏭️  {item}: Skipped (additive, already in the home)")
+
+        placed: list[Path] = []
+        for rel in placing:
+            dest = home / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if dest.is_dir() and not dest.is_symlink():
+                shutil.rmtree(dest)
+            os.replace(stage / rel, dest)
+            placed.append(dest)
+            _count(written=expected[rel]["size"])
+        shutil.rmtree(stage)
+        _flush_writes(placed)
+
+    # Seed the home's digest cache: installed files keep the source mtimes,
+    # so these entries stay valid until the files change.
+    target_index = _load_digest_index(home)
+    for rel in placing:
+        st = (home / rel).stat()
+        sha = expected[rel]["sha256"]
+        target_index.entries[rel] = [st.st_size, st.st_mtime_ns, st.st_ino, sha]
+        target_index.dirty = True
+    _save_digest_index(target_index)
+    if (home / "skills").is_dir():
+        _link_learned_skills(home / "skills")
+    print(f"✅ Installed {len(placed)} file(s) into {home}")
 
 
 def orphans_mode(dotfiles_dir: Path, agents: list[AgentTarget] | None = None) -> None:
@@ -1716,6 +5287,7 @@ def orphans_mode(dotfiles_dir: Path, agents: list[AgentTarget] | None = None) ->
 
     Lists items that exist in targets but not in the dotfiles source
     or manifest. These would be removed during a full override sync.
+    Also garbage-collects unreferenced objects from the link-mode store.
 
     Args:
         dotfiles_dir: Path to dotfiles directory.
@@ -1728,10 +5300,11 @@ def orphans_mode(dotfiles_dir: Path, agents: list[AgentTarget] | None = None) ->
     print(f"🎯 Targets: {', '.join(a.key for a in agents) or '(none)'}")
 
     manifest = _load_manifest(dotfiles_dir)
+    snapshot = _scan_source(dotfiles_dir)
     total = 0
 
     for agent in agents:
-        orphans = _detect_target_only_items(dotfiles_dir, agent, manifest)
+        orphans = _detect_target_only_items(dotfiles_dir, agent, manifest, snapshot)
         if not orphans:
             continue
 
@@ -1748,6 +5321,15 @@ def orphans_mode(dotfiles_dir: Path, agents: list[AgentTarget] | None = None) ->
         print(f"Found {total} target-only item(s).")
         print("💡 Run 'just sync-agents' to sync and confirm deletions.")
 
+    # Objects no home links to any more (homes re-synced in another mode,
+    # items deleted) are unreachable: collect them here.
+    removed, freed = _gc_object_store(OBJECT_STORE_DIR)
+    if removed:
+        print(
+            f"🧹 Object store: removed {removed} unreferenced object(s) "
+            f"({freed} bytes) from {OBJECT_STORE_DIR}"
+        )
+
 
 def main() -> None:
     """CLI entry point for sync-agents."""
@@ -1770,6 +5352,14 @@ def main() -> None:
         action="store_true",
         help="Preview mode: show what would be synced without making changes",
     )
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help=(
+            "Project the file-level outcome of a --yes sync in memory (files "
+            "created/updated/deleted, bytes written) without touching disk"
+        ),
+    )
     parser.add_argument(
         "--yes",
         "-y",
@@ -1805,6 +5395,138 @@ def main() -> None:
             "hooks/settings + commands/agents."
         ),
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help=(
+            "Plan and apply up to N agent homes concurrently (default: 1). "
+            "Confirmations are asked up front; output stays in agent order. "
+            "With --verify: hashing workers (default: CPU-based)"
+        ),
+    )
+    parser.add_argument(
+        "--link-mode",
+        choices=LINK_MODES,
+        default="copy",
+        help=(
+            "How non-rendered files reach agent homes and imports (default: "
+            "copy). reflink clones extents on btrfs/xfs; hardlink shares the "
+            "inode, so in-place edits in a home also change dotfiles; store "
+            "links every home to one object per unique content in "
+            f"{OBJECT_STORE_DIR} (gc via --orphans). Falls back to copy where "
+            "unsupported."
+        ),
+    )
+    parser.add_argument(
+        "--force-scan",
+        action="store_true",
+        help=(
+            "Plan every item even if nothing changed since the last complete "
+            "sync (bypass the whole-state fingerprint fast path)"
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Plan only items git reports as changed since the selected "
+            "targets' last complete sync; full scan if a target was modified "
+            "or the diff cannot be trusted"
+        ),
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help=(
+            "Read-only drift check: compare every managed item in the selected "
+            "targets with dotfiles and print a JSON report (exit 1 on drift). "
+            "Cached digests are trusted while a file's stat is unchanged; "
+            "--force-scan rehashes everything"
+        ),
+    )
+    parser.add_argument(
+        "--bundle-out",
+        type=Path,
+        metavar="DIR",
+        help=(
+            "Write each selected target's rendered home as DIR/<key>.tar.zst "
+            "(.tar.gz before Python 3.14) with a digest index, for "
+            "--bundle-install"
+        ),
+    )
+    parser.add_argument(
+        "--bundle-install",
+        type=Path,
+        metavar="ARCHIVE",
+        help=(
+            "Unpack a --bundle-out archive into --bundle-home (default: the one "
+            "selected target's home), which must be the home it was rendered "
+            "for; digest-checked, without planning (settings.json needs a sync)"
+        ),
+    )
+    parser.add_argument(
+        "--bundle-home",
+        type=Path,
+        metavar="PATH",
+        help=(
+            "With --bundle-out (one target): render for this home instead, "
+            "e.g. a workspace's ~/.claude. With --bundle-install: home to install into"
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running: apply each dotfiles edit (debounced) to the selected "
+            "targets without prompts, planning only the touched items. "
+            "Target-only orphans are never deleted; imports are not read"
+        ),
+    )
+    parser.add_argument(
+        "--watch-poll",
+        type=float,
+        metavar="SECONDS",
+        help="With --watch: poll every SECONDS instead of using inotify",
+    )
+    parser.add_argument(
+        "--plan-out",
+        type=Path,
+        metavar="PLAN",
+        help="With --preview: also write the plan as JSON for --apply-plan",
+    )
+    parser.add_argument(
+        "--apply-plan",
+        type=Path,
+        metavar="PLAN",
+        help=(
+            "Apply a --plan-out file to the selected targets without rescanning "
+            "or prompting; actions for other targets, or whose source or target "
+            "changed since, are refused (exit 1)"
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help=(
+            "Print per-phase wall time and files stat'ed / bytes read / bytes "
+            "written after the run"
+        ),
+    )
+    parser.add_argument(
+        "--timings-jsonl",
+        type=Path,
+        metavar="PATH",
+        help="Append the run's phase spans to PATH, one JSON object per line",
+    )
+    parser.add_argument(
+        "--timings-otlp",
+        action="store_true",
+        help=(
+            "Export the run's phase spans over OTLP/HTTP (OTEL_EXPORTER_OTLP_"
+            "[TRACES_]ENDPOINT, default http://localhost:4318; see telemetry/)"
+        ),
+    )
     parser.add_argument(
         "--dotfiles",
         "-d",
@@ -1830,32 +5552,146 @@ def main() -> None:
         print(f"❌ Error: {e}")
         sys.exit(2)
 
+    if args.jobs is not None and args.jobs < 1:
+        print(f"❌ Error: --jobs must be >= 1 (got {args.jobs})")
+        sys.exit(2)
+    jobs = args.jobs or 1
+
     selected = _select_agents(keys)
     exclude_dirs = frozenset({"skills"}) if args.no_skills else frozenset()
 
-    if args.import_only:
-        import_only_mode(
-            args.dotfiles,
-            agents=selected,
-            preview=args.preview,
-            exclude_dirs=exclude_dirs,
-        )
-    elif args.orphans:
-        orphans_mode(args.dotfiles, agents=selected)
-    elif args.preview:
-        preview_mode(args.dotfiles, agents=selected, exclude_dirs=exclude_dirs)
-    elif args.override:
-        print("⚡ Override mode: dotfiles → targets (no prompts)")
-        sync_mode(
-            args.dotfiles, auto_yes=True, agents=selected, exclude_dirs=exclude_dirs
-        )
-    else:
-        sync_mode(
-            args.dotfiles,
-            auto_yes=args.yes,
-            agents=selected,
-            exclude_dirs=exclude_dirs,
-        )
+    if args.plan_out is not None and not args.preview:
+        print("❌ Error: --plan-out requires --preview")
+        sys.exit(2)
+
+    exclusive = {
+        "--preview": args.preview,
+        "--simulate": args.simulate,
+        "--orphans": args.orphans,
+        "--import-only": args.import_only,
+        "--apply-plan": args.apply_plan is not None,
+        "--watch": args.watch,
+        "--verify": args.verify,
+        "--bundle-out": args.bundle_out is not None,
+        "--bundle-install": args.bundle_install is not None,
+    }
+    for flag in (
+        "--simulate",
+        "--apply-plan",
+        "--watch",
+        "--verify",
+        "--bundle-out",
+        "--bundle-install",
+    ):
+        others = [f for f, on in exclusive.items() if on and f != flag]
+        if exclusive[flag] and others:
+            print(f"❌ Error: {flag} cannot be combined with {', '.join(others)}")
+            sys.exit(2)
+    if args.bundle_home is not None and not (
+        exclusive["--bundle-out"] or exclusive["--bundle-install"]
+    ):
+        print("❌ Error: --bundle-home requires --bundle-out or --bundle-install")
+        sys.exit(2)
+    if args.watch_poll is not None and (not args.watch or args.watch_poll <= 0):
+        print("❌ Error: --watch-poll requires --watch and a positive interval")
+        sys.exit(2)
+
+    global _TIMINGS
+    timed = args.timings or args.timings_jsonl is not None or args.timings_otlp
+    _TIMINGS = _Timings() if timed else None
+    try:
+        if args.apply_plan is not None:
+            apply_plan_mode(
+                args.dotfiles,
+                args.apply_plan,
+                agents=selected,
+                link_mode=args.link_mode,
+            )
+        elif args.import_only:
+            import_only_mode(
+                args.dotfiles,
+                agents=selected,
+                preview=args.preview,
+                exclude_dirs=exclude_dirs,
+                link_mode=args.link_mode,
+            )
+        elif args.orphans:
+            orphans_mode(args.dotfiles, agents=selected)
+        elif args.preview:
+            preview_mode(
+                args.dotfiles,
+                agents=selected,
+                exclude_dirs=exclude_dirs,
+                jobs=jobs,
+                plan_out=args.plan_out,
+            )
+        elif args.simulate:
+            simulate_mode(
+                args.dotfiles, agents=selected, exclude_dirs=exclude_dirs, jobs=jobs
+            )
+        elif args.bundle_install is not None:
+            install_bundle_mode(
+                args.bundle_install, home=args.bundle_home, agents=selected
+            )
+        elif args.bundle_out is not None:
+            export_bundle_mode(
+                args.dotfiles,
+                args.bundle_out,
+                agents=selected,
+                exclude_dirs=exclude_dirs,
+                home=args.bundle_home,
+            )
+        elif args.verify:
+            drifted = verify_mode(
+                args.dotfiles,
+                agents=selected,
+                exclude_dirs=exclude_dirs,
+                jobs=args.jobs,
+                rehash=args.force_scan,
+            )
+            if drifted:
+                sys.exit(1)
+        elif args.watch:
+            watch_mode(
+                args.dotfiles,
+                agents=selected,
+                exclude_dirs=exclude_dirs,
+                link_mode=args.link_mode,
+                poll_interval=args.watch_poll,
+            )
+        elif args.override:
+            print("⚡ Override mode: dotfiles → targets (no prompts)")
+            sync_mode(
+                args.dotfiles,
+                auto_yes=True,
+                agents=selected,
+                exclude_dirs=exclude_dirs,
+                jobs=jobs,
+                link_mode=args.link_mode,
+                force_scan=args.force_scan,
+                incremental=args.incremental,
+            )
+        else:
+            sync_mode(
+                args.dotfiles,
+                auto_yes=args.yes,
+                agents=selected,
+                exclude_dirs=exclude_dirs,
+                jobs=jobs,
+                link_mode=args.link_mode,
+                force_scan=args.force_scan,
+                incremental=args.incremental,
+            )
+
+    finally:
+        if _TIMINGS is not None:
+            _TIMINGS.finish()
+            if args.timings:
+                _print_timings(_TIMINGS)
+            if args.timings_jsonl is not None:
+                _write_timings_jsonl(_TIMINGS, args.timings_jsonl)
+            if args.timings_otlp:
+                _export_timings_otlp(_TIMINGS)
 
 
 if __name__ == "__main__":
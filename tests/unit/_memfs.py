@@ -0,0 +1,51 @@
+"""In-memory filesystem for sync_agents tests that need no real disk.
+
+sync_agents reads and writes through its active backend, ``sync_agents._FS``
+(a _DiskFS). ``use_memory_fs`` swaps in a _MemoryFS for one test. After that,
+paths are only keys: nothing under them is created on disk. Seed the tree
+with ``write_text`` and check it with ``read_text``. Both go through whichever
+backend is active, so a helper shared with on-disk tests works in both modes.
+
+Symlinks are not modelled in memory. A test whose subject is symlink handling
+stays on disk (see _symlinks.py).
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import _MemoryFS  # noqa: E402
+
+
+def use_memory_fs(monkeypatch: pytest.MonkeyPatch) -> _MemoryFS:
+    """Make an empty in-memory tree the active backend for this test."""
+    fs = _MemoryFS()
+    monkeypatch.setattr(sync_agents, "_FS", fs)
+    return fs
+
+
+def mkdir(path: Path) -> Path:
+    """Create a directory (and its parents) through the active backend."""
+    sync_agents._FS.mkdir(path)
+    return path
+
+
+def write_text(path: Path, text: str) -> Path:
+    """Create or replace a file (parents included) through the active backend."""
+    mkdir(path.parent)
+    sync_agents._FS.write_bytes(path, text.encode("utf-8"))
+    return path
+
+
+def read_text(path: Path) -> str:
+    return sync_agents._FS.read_text(path, encoding="utf-8")
+
+
+def exists(path: Path) -> bool:
+    return sync_agents._FS.exists(path)
@@ -0,0 +1,264 @@
+"""Unit tests for sync_agents agent-home bundles.
+
+export_bundle_mode writes every file a first sync would produce for an agent
+(rendered for a given home) into one archive led by a digest index;
+install_bundle_mode unpacks it into that home in one read, refusing anything
+that does not match the index.
+"""
+
+import io
+import json
+import os
+import sys
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from _symlinks import requires_symlinks
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    BUNDLE_INDEX_MEMBER,
+    AgentTarget,
+    export_bundle_mode,
+    install_bundle_mode,
+    verify_mode,
+)
+
+OLD_NS = 1_600_000_000_000_000_000
+
+
+@pytest.fixture()
+def dotfiles(tmp_path: Path) -> Path:
+    root = tmp_path / "dotfiles"
+    (root / "commands").mkdir(parents=True)
+    (root / "ROOT_AGENTS.md").write_text("# base, see docs/agents/a.md\n")
+    (root / "ROOT_AGENTS_docs_agents_a.md").write_text("spoke, docs/agents/b.md\n")
+    (root / "commands" / "c.md").write_text("command\n")
+    skill = root / "skills" / "learned" / "s"
+    (skill / "scripts").mkdir(parents=True)
+    (skill / "SKILL.md").write_text("# s\n")
+    (skill / "scripts" / "run.sh").write_text("#!/bin/sh\n")
+    (skill / "scripts" / "run.sh").chmod(0o755)
+    (root / "skills" / "learned" / "s-workspace").mkdir()
+    (root / "skills" / "learned" / "s-workspace" / "draft.md").write_text("x\n")
+    for path in root.rglob("*"):
+        os.utime(path, ns=(OLD_NS, OLD_NS))
+    return root
+
+
+def _agent(tmp_path: Path) -> AgentTarget:
+    return AgentTarget(
+        directory=tmp_path / "exporter-home",
+        name="Home",
+        key="home",
+        main_file="AGENTS.md",
+    )
+
+
+def _export(dotfiles: Path, tmp_path: Path, home: Path) -> Path:
+    (bundle,) = export_bundle_mode(
+        dotfiles, tmp_path / "out", agents=[_agent(tmp_path)], home=home
+    )
+    return bundle
+
+
+def test_installed_home_matches_a_sync(
+    dotfiles: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: a bundle rendered for a home that does not exist yet
+    home = tmp_path / "workspace" / ".agent"
+    bundle = _export(dotfiles, tmp_path, home)
+    assert not home.exists()
+
+    # when
+    install_bundle_mode(bundle, home=home)
+
+    # then: spokes point at the new home, modes and workspace exclusion hold
+    assert (home / "docs" / "agents" / "a.md").read_text() == (
+        f"spoke, {home}/docs/agents/b.md\n"
+    )
+    run = home / "skills" / "learned" / "s" / "scripts" / "run.sh"
+    assert run.stat().st_mode & 0o777 == 0o755
+    assert not (home / "skills" / "learned" / "s-workspace").exists()
+    assert (home / "skills" / "s").readlink() == Path("learned") / "s"
+
+    # and: the home verifies clean from the seeded digest index alone
+    hashed: list[Path] = []
+    real = sync_agents._hash_file
+    monkeypatch.setattr(
+        sync_agents, "_hash_file", lambda p, fs=None: hashed.append(p) or real(p, fs)
+    )
+    agent = AgentTarget(directory=home, name="Home", key="home", main_file="AGENTS.md")
+    assert verify_mode(dotfiles, agents=[agent], out=io.StringIO()) == 0
+    assert [p for p in hashed if home in p.parents] == []
+
+
+def _rewrite(bundle: Path, member: str, edit) -> None:
+    """Rewrite one bundle member through ``edit(info, data)`` (None drops it)."""
+    with tarfile.open(bundle) as tar:
+        members = [(m, tar.extractfile(m).read()) for m in tar.getmembers()]
+    with tarfile.open(bundle, "w:gz") as tar:
+        for info, data in members:
+            if info.name == member:
+                edited = edit(info, data)
+                if edited is None:
+                    continue
+                info, data = edited
+                info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+def _rename(info: tarfile.TarInfo, data: bytes) -> tuple[tarfile.TarInfo, bytes]:
+    info.name = "../escape.md"
+    return info, data
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [
+        pytest.param(lambda info, data: (info, b"evil\n"), id="content"),
+        pytest.param(_rename, id="traversal"),
+        pytest.param(lambda info, data: None, id="missing"),
+    ],
+)
+def test_tampered_bundle_installs_nothing(dotfiles: Path, tmp_path: Path, edit) -> None:
+    home = tmp_path / "new-home"
+    bundle = _export(dotfiles, tmp_path, home)
+    _rewrite(bundle, "commands/c.md", edit)
+
+    with pytest.raises(SystemExit) as exc:
+        install_bundle_mode(bundle, home=home)
+
+    assert exc.value.code == 1
+    assert list(home.iterdir()) == []  # staging removed, nothing placed
+    assert not (tmp_path / "escape.md").exists()
+
+
+def test_bundle_for_another_home_is_refused(dotfiles: Path, tmp_path: Path) -> None:
+    bundle = _export(dotfiles, tmp_path, tmp_path / "rendered-for")
+
+    with pytest.raises(SystemExit) as exc:
+        install_bundle_mode(bundle, home=tmp_path / "elsewhere")
+
+    assert exc.value.code == 1
+    assert not (tmp_path / "elsewhere").exists()
+
+
+def _edit_index(change):
+    """A _rewrite edit that applies ``change(index)`` to the bundle index."""
+
+    def edit(info: tarfile.TarInfo, data: bytes) -> tuple[tarfile.TarInfo, bytes]:
+        index = json.loads(data)
+        return info, json.dumps(change(index)).encode()
+
+    return edit
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [
+        pytest.param(lambda info, data: (info, b"{not json"), id="not-json"),
+        pytest.param(_edit_index(lambda index: [index]), id="not-an-object"),
+        pytest.param(_edit_index(lambda index: {**index, "home": 1}), id="home"),
+        pytest.param(_edit_index(lambda index: {**index, "files": []}), id="files"),
+        pytest.param(
+            _edit_index(
+                lambda index: {**index, "files": dict.fromkeys(index["files"], "x")}
+            ),
+            id="entry",
+        ),
+    ],
+)
+def test_malformed_index_is_an_error(
+    dotfiles: Path,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    edit,
+) -> None:
+    home = tmp_path / "new-home"
+    bundle = _export(dotfiles, tmp_path, home)
+    _rewrite(bundle, BUNDLE_INDEX_MEMBER, edit)
+
+    with pytest.raises(SystemExit) as exc:
+        install_bundle_mode(bundle, home=home)
+
+    assert exc.value.code == 1
+    assert "❌ Error" in capsys.readouterr().out
+    assert not home.exists()
+
+
+def test_same_home_spelled_differently_is_accepted(
+    dotfiles: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    home = tmp_path / "new-home"
+    bundle = _export(dotfiles, tmp_path, home)
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    install_bundle_mode(bundle, home=Path("~") / "sub" / ".." / "new-home")
+
+    assert (home / "commands" / "c.md").read_text() == "command\n"
+    assert not (tmp_path / "sub").exists()
+
+
+def test_home_comes_from_the_caller_not_the_archive(
+    dotfiles: Path, tmp_path: Path
+) -> None:
+    home = tmp_path / "new-home"
+    bundle = _export(dotfiles, tmp_path, home)
+
+    # an archive alone does not choose where it is unpacked
+    with pytest.raises(SystemExit) as exc:
+        install_bundle_mode(bundle)
+    assert exc.value.code == 1
+    assert not home.exists()
+
+    # the one selected agent's home is an explicit choice
+    agent = AgentTarget(directory=home, name="Home", key="home", main_file="AGENTS.md")
+    install_bundle_mode(bundle, agents=[agent])
+    assert (home / "commands" / "c.md").read_text() == "command\n"
+
+
+@requires_symlinks
+def test_existing_additive_skill_is_kept(dotfiles: Path, tmp_path: Path) -> None:
+    # given: the bundle carries a skill the home already has, as a symlink
+    # into a CLI-managed store
+    (dotfiles / "skills" / "extra").mkdir()
+    (dotfiles / "skills" / "extra" / "SKILL.md").write_text("# from bundle\n")
+    home = tmp_path / "new-home"
+    bundle = _export(dotfiles, tmp_path, home)
+    store = tmp_path / "store" / "extra"
+    store.mkdir(parents=True)
+    (store / "SKILL.md").write_text("# from the CLI\n")
+    (home / "skills").mkdir(parents=True)
+    (home / "skills" / "extra").symlink_to(store, target_is_directory=True)
+
+    # when
+    install_bundle_mode(bundle, home=home)
+
+    # then: neither the link nor the store is touched; the rest lands
+    assert (home / "skills" / "extra").readlink() == store
+    assert (store / "SKILL.md").read_text() == "# from the CLI\n"
+    assert (home / "commands" / "c.md").read_text() == "command\n"
+
+
+@requires_symlinks
+def test_symlinked_directory_leaving_the_home_is_refused(
+    dotfiles: Path, tmp_path: Path
+) -> None:
+    home = tmp_path / "new-home"
+    bundle = _export(dotfiles, tmp_path, home)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    home.mkdir()
+    (home / "commands").symlink_to(outside, target_is_directory=True)
+
+    with pytest.raises(SystemExit) as exc:
+        install_bundle_mode(bundle, home=home)
+
+    assert exc.value.code == 1
+    assert list(outside.iterdir()) == []
+    assert sorted(p.name for p in home.iterdir()) == ["commands"]
@@ -0,0 +1,85 @@
+"""Smoke tests for scripts/bench_hooks.py.
+
+The benchmark replays a synthetic payload corpus through each agent hook (as
+a bash subprocess and in-process), reports p50/p95/p99 latency and exits 1
+when a --budget is exceeded or the two modes disagree on a verdict.
+"""
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import bench_hooks  # noqa: E402
+from bench_hooks import build_corpus, main, over_budget, percentile  # noqa: E402
+
+needs_bash = pytest.mark.skipif(
+    sys.platform == "win32"
+    or shutil.which("bash") is None
+    or shutil.which("python3") is None,
+    reason="subprocess mode runs the bash wrappers (Linux/macOS/WSL)",
+)
+
+
+def test_corpus_scales_and_is_never_blocked() -> None:
+    corpus = {p.name: p for p in build_corpus(large_mb=0.25)}
+
+    assert set(corpus) == {
+        "short-command",
+        "pipeline",
+        "heredoc",
+        "write-small",
+        "write-large",
+        "edit",
+    }
+    assert 0.25 * 2**20 <= len(corpus["write-large"].data) < 0.3 * 2**20
+    for hook in bench_hooks.HOOKS:
+        call = bench_hooks.in_process(hook)
+        if call is None:
+            continue
+        for payload in corpus.values():
+            if payload.tool in hook.tools:
+                assert call(payload.data) == 0, (hook.name, payload.name)
+
+
+def test_percentile_is_nearest_rank() -> None:
+    samples = [float(n) for n in range(1, 101)]
+
+    assert [percentile(samples, q) for q in (50, 95, 99)] == [50.0, 95.0, 99.0]
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_over_budget_matches_case_patterns() -> None:
+    results = {
+        "block-secrets/edit/subprocess": {"p95_ms": 60.0},
+        "block-secrets/edit/in-process": {"p95_ms": 0.1},
+    }
+
+    assert over_budget(results, [("*/subprocess", 50)]) == [
+        ("block-secrets/edit/subprocess", 60.0, 50)
+    ]
+    assert over_budget(results, [("*/in-process", 1), ("*/edit/*", 100)]) == []
+
+
+@needs_bash
+def test_main_writes_results_and_enforces_budgets(tmp_path: Path) -> None:
+    out = tmp_path / "results.json"
+    argv = ["--hooks", "block-secrets", "--iterations", "2", "--large-mb", "0.05"]
+
+    assert main([*argv, "--out", str(out), "--budget", "*=60000"]) == 0
+
+    results = json.loads(out.read_text())
+    assert results["version"] == bench_hooks.RESULTS_VERSION
+    assert set(results["results"]) == {
+        f"block-secrets/{payload}/{mode}"
+        for payload in ("write-small", "write-large", "edit")
+        for mode in ("subprocess", "in-process")
+    }
+    case = results["results"]["block-secrets/write-large/subprocess"]
+    assert case["exit"] == 0 and case["p50_ms"] <= case["p95_ms"] <= case["p99_ms"]
+
+    assert main([*argv, "--modes", "in-process", "--budget", "*=0"]) == 1
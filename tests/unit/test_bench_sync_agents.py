@@ -0,0 +1,66 @@
+"""Smoke tests for scripts/bench_sync_agents.py.
+
+The benchmark builds a synthetic dotfiles source and agent homes in a scratch
+directory, measures each sync_agents mode in an isolated process and writes
+JSON results that a later run compares against (exit 1 on regression).
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import bench_sync_agents  # noqa: E402
+from bench_sync_agents import WorldParams, build_world, compare, main  # noqa: E402
+
+
+def test_build_world_drifts_after_initial_sync(tmp_path: Path) -> None:
+    params = WorldParams(skills=4, files=3, commands=10, homes=2, orphaned=0.2)
+
+    dotfiles, agents = build_world(tmp_path, params)
+
+    assert [a.key for a in agents] == ["claude", "home-1"]
+    assert len(list((dotfiles / "skills").iterdir())) == 4
+    for agent in agents:
+        assert (agent.directory / "skills" / "skill-0000" / "SKILL.md").is_file()
+        strays = list((agent.directory / "commands").glob("stray-*.md"))
+        assert len(strays) == 2
+
+
+def test_main_writes_results_and_compares(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    out = tmp_path / "results.json"
+    argv = ["--skills", "3", "--files", "2", "--commands", "4", "--homes", "2"]
+    argv += ["--changed", "0.5", "--orphaned", "0.5"]
+    argv += ["--repeat", "1", "--workdir", str(tmp_path)]
+
+    assert main([*argv, "--out", str(out)]) == 0
+
+    results = json.loads(out.read_text())
+    assert results["version"] == bench_sync_agents.RESULTS_VERSION
+    assert set(results["results"]) == set(bench_sync_agents.SCENARIOS)
+    sync = results["results"]["sync"]
+    assert sync["wall_s"] > 0 and sync["stat"] > 0 and sync["written"] > 0
+    assert "plan" in sync["phases"]
+    # scratch worlds are removed after each measurement
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["results.json"]
+
+    # millisecond-scale timings are noise: only the comparison path is smoked
+    compare_argv = ["--scenarios", "orphans", "--baseline", str(out)]
+    assert main([*argv, *compare_argv, "--threshold", "1000"]) == 0
+    assert "delta" in capsys.readouterr().out
+
+
+def test_compare_flags_regressions_beyond_threshold() -> None:
+    baseline = {"params": {}, "results": {"sync": {"wall_s": 1.0}}}
+    results = {
+        "params": {},
+        "results": {"sync": {"wall_s": 1.5}, "preview": {"wall_s": 0.1}},
+    }
+
+    assert compare(results, baseline, threshold=0.2) == ["sync"]
+    assert compare(results, baseline, threshold=0.6) == []
@@ -109,3 +109,11 @@ def test_secret_via_notebook_new_source_is_blocked() -> None:
         check=False,
     )
     assert result.returncode == EXIT_BLOCK
+
+
+def test_secret_early_in_a_large_write_is_blocked() -> None:
+    """The grep pipeline quit on the first match and SIGPIPE'd printf; under
+    pipefail that read as "no match" and a multi-MB payload with an early
+    secret was allowed. The scanner reads the content once, whatever its size."""
+    secret = "AKIA" + "A" * 16
+    assert _run_hook(f"key = '{secret}'\n" + "filler line\n" * 400_000) == EXIT_BLOCK
@@ -0,0 +1,152 @@
+"""Unit tests for the file-level delta apply of directory items in sync_agents.
+
+`_sync_directory` writes only the files that differ between source and
+target, removes what the source no longer has, and leaves excluded children
+(EXCLUDE_PATTERNS, e.g. learned/*-workspace) in place.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from _symlinks import requires_symlinks
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import _sync_directory  # noqa: E402
+
+
+def _tree(root: Path) -> dict[str, str]:
+    return {
+        p.relative_to(root).as_posix(): p.read_text() if p.is_file() else "<dir>"
+        for p in sorted(root.rglob("*"))
+    }
+
+
+@pytest.fixture()
+def skill(tmp_path: Path) -> tuple[Path, Path]:
+    """A multi-file skill synced once into the target."""
+    source = tmp_path / "src" / "big-skill"
+    (source / "refs").mkdir(parents=True)
+    (source / "SKILL.md").write_text("# skill\n")
+    for i in range(20):
+        (source / "refs" / f"ref-{i}.md").write_text(f"ref {i}\n")
+    target = tmp_path / "dst" / "big-skill"
+    _sync_directory(source, target)
+    return source, target
+
+
+def test_only_changed_files_are_written(
+    skill: tuple[Path, Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: one file edited, one added, one removed in the source
+    source, target = skill
+    (source / "refs" / "ref-3.md").write_text("edited\n")
+    (source / "refs" / "new.md").write_text("new\n")
+    (source / "refs" / "ref-7.md").unlink()
+    untouched_ino = (target / "refs" / "ref-0.md").stat().st_ino
+
+    copied: list[str] = []
+    real_copy2 = sync_agents.shutil.copy2
+    monkeypatch.setattr(
+        sync_agents.shutil,
+        "copy2",
+        lambda s, d: copied.append(Path(d).name) or real_copy2(s, d),
+    )
+
+    # when
+    _sync_directory(source, target)
+
+    # then: two writes, the trees match, untouched files keep their inode
+    assert sorted(copied) == ["new.md", "ref-3.md"]
+    assert _tree(target) == _tree(source)
+    assert (target / "refs" / "ref-0.md").stat().st_ino == untouched_ino
+
+
+def test_same_size_edit_is_detected(skill: tuple[Path, Path]) -> None:
+    """Equal sizes fall through to a content compare when mtimes differ."""
+    source, target = skill
+    src_file = source / "SKILL.md"
+    st = src_file.stat()
+    src_file.write_text("# SKILL\n")
+    os.utime(src_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    _sync_directory(source, target)
+
+    assert (target / "SKILL.md").read_text() == "# SKILL\n"
+
+
+def test_same_stat_edit_is_detected(skill: tuple[Path, Path]) -> None:
+    """Equal size and mtime do not make two files equal: contents are hashed."""
+    source, target = skill
+    src_file = source / "SKILL.md"
+    src_file.write_text("# SKILL\n")
+    st = (target / "SKILL.md").stat()
+    os.utime(src_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    _sync_directory(source, target)
+
+    assert (target / "SKILL.md").read_text() == "# SKILL\n"
+
+
+def test_type_changes_are_replaced(skill: tuple[Path, Path]) -> None:
+    source, target = skill
+    (source / "refs" / "ref-0.md").unlink()
+    (source / "refs" / "ref-0.md").mkdir()
+    (source / "refs" / "ref-0.md" / "inner.md").write_text("inner\n")
+    for f in (source / "refs").glob("ref-1*.md"):
+        f.unlink()
+    (source / "refs-flat").write_text("was a dir name\n")
+    (target / "refs-flat").mkdir()
+    (target / "refs-flat" / "stale.md").write_text("stale\n")
+
+    _sync_directory(source, target)
+
+    assert _tree(target) == _tree(source)
+
+
+def test_excluded_children_are_preserved_in_place(tmp_path: Path) -> None:
+    # given: a learned/ dir whose target holds a skill-creator workspace
+    source = tmp_path / "src" / "learned"
+    (source / "skill").mkdir(parents=True)
+    (source / "skill" / "SKILL.md").write_text("# v2\n")
+    (source / "other-workspace").mkdir()
+    (source / "other-workspace" / "never-copied.txt").write_text("x")
+    target = tmp_path / "dst" / "learned"
+    (target / "skill").mkdir(parents=True)
+    (target / "skill" / "SKILL.md").write_text("# v1\n")
+    (target / "skill-workspace").mkdir()
+    (target / "skill-workspace" / "scratch.txt").write_text("keep me")
+    workspace_ino = (target / "skill-workspace").stat().st_ino
+
+    # when
+    _sync_directory(source, target)
+
+    # then: the workspace never moved, the source workspace was not copied
+    assert (target / "skill" / "SKILL.md").read_text() == "# v2\n"
+    assert (target / "skill-workspace" / "scratch.txt").read_text() == "keep me"
+    assert (target / "skill-workspace").stat().st_ino == workspace_ino
+    assert not (target / "other-workspace").exists()
+
+
+@requires_symlinks
+def test_symlinked_target_is_replaced_with_a_real_tree(
+    skill: tuple[Path, Path], tmp_path: Path
+) -> None:
+    """Writing through a symlinked target would modify the link's destination."""
+    source, _ = skill
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    (elsewhere / "SKILL.md").write_text("# not ours\n")
+    target = tmp_path / "linked" / "big-skill"
+    target.parent.mkdir()
+    target.symlink_to(elsewhere, target_is_directory=True)
+
+    _sync_directory(source, target)
+
+    assert not target.is_symlink()
+    assert _tree(target) == _tree(source)
+    assert (elsewhere / "SKILL.md").read_text() == "# not ours\n"
@@ -7,12 +7,16 @@ only in the target directory (not in dotfiles source or manifest).
 target-only skills are never flagged as orphans because the `bunx skills`
 CLI owns installs there. Orphan detection still applies to the non-additive
 sync directories (`commands`, `agents`).
+
+Tests run against the in-memory backend (_memfs); the two whose subject is
+symlink handling use the on-disk ``disk_workspace``.
 """
 
 from pathlib import Path
 
 import pytest
 
+from _memfs import mkdir, use_memory_fs, write_text
 from _symlinks import requires_symlinks
 
 # Import from scripts (add parent to path)
@@ -28,8 +32,17 @@ from sync_agents import (
 
 
 @pytest.fixture()
-def workspace(tmp_path: Path) -> dict[str, Path]:
-    """Create dotfiles and target directory structure."""
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> dict[str, Path]:
+    """Create dotfiles and target directory structure (in memory)."""
+    use_memory_fs(monkeypatch)
+    dotfiles_dir = mkdir(tmp_path / "dotfiles")
+    target_dir = mkdir(tmp_path / "target")
+    return {"dotfiles": dotfiles_dir, "target": target_dir}
+
+
+@pytest.fixture()
+def disk_workspace(tmp_path: Path) -> dict[str, Path]:
+    """Create dotfiles and target directory structure on disk (symlink tests)."""
     dotfiles_dir = tmp_path / "dotfiles"
     target_dir = tmp_path / "target"
     dotfiles_dir.mkdir()
@@ -45,18 +58,13 @@ def _make_agent(target_dir: Path) -> AgentTarget:
 def _make_skill(parent: Path, name: str) -> Path:
     """Create a minimal skill directory with SKILL.md."""
     skill_dir = parent / "skills" / name
-    skill_dir.mkdir(parents=True, exist_ok=True)
-    (skill_dir / "SKILL.md").write_text(f"# {name}\n")
+    write_text(skill_dir / "SKILL.md", f"# {name}\n")
     return skill_dir
 
 
 def _make_command(parent: Path, name: str) -> Path:
     """Create a minimal command file under commands/."""
-    cmd_dir = parent / "commands"
-    cmd_dir.mkdir(parents=True, exist_ok=True)
-    cmd_file = cmd_dir / f"{name}.md"
-    cmd_file.write_text(f"# {name}\n")
-    return cmd_file
+    return write_text(parent / "commands" / f"{name}.md", f"# {name}\n")
 
 
 def test_additive_skills_orphan_not_detected(workspace: dict[str, Path]) -> None:
@@ -98,9 +106,8 @@ def test_detects_orphan_directory_in_target(workspace: dict[str, Path]) -> None:
     """Target-only directory in a non-additive dir is detected with is_directory."""
     # given
     orphan_dir = workspace["target"] / "agents" / "orphan-agent"
-    orphan_dir.mkdir(parents=True, exist_ok=True)
-    (orphan_dir / "agent.md").write_text("# orphan\n")
-    (workspace["dotfiles"] / "agents").mkdir(parents=True, exist_ok=True)
+    write_text(orphan_dir / "agent.md", "# orphan\n")
+    mkdir(workspace["dotfiles"] / "agents")
     manifest = _SyncManifest(items={})
     agent = _make_agent(workspace["target"])
 
@@ -154,8 +161,7 @@ def test_skips_hidden_directories(workspace: dict[str, Path]) -> None:
     # given
     _make_skill(workspace["dotfiles"], "my-skill")
     _make_skill(workspace["target"], "my-skill")
-    hidden = workspace["target"] / "skills" / ".hidden-dir"
-    hidden.mkdir(parents=True, exist_ok=True)
+    mkdir(workspace["target"] / "skills" / ".hidden-dir")
     manifest = _SyncManifest(items={})
     agent = _make_agent(workspace["target"])
 
@@ -167,22 +173,22 @@ def test_skips_hidden_directories(workspace: dict[str, Path]) -> None:
 
 
 @requires_symlinks
-def test_skips_internal_symlinks(workspace: dict[str, Path]) -> None:
+def test_skips_internal_symlinks(disk_workspace: dict[str, Path]) -> None:
     """Internal symlinks (e.g., learned skill links) are ignored."""
     # given
-    _make_skill(workspace["dotfiles"], "real-skill")
-    _make_skill(workspace["target"], "real-skill")
+    _make_skill(disk_workspace["dotfiles"], "real-skill")
+    _make_skill(disk_workspace["target"], "real-skill")
     # Create learned/ with a skill and a symlink to it
-    learned_skill = workspace["target"] / "skills" / "learned" / "linked-skill"
+    learned_skill = disk_workspace["target"] / "skills" / "learned" / "linked-skill"
     learned_skill.mkdir(parents=True, exist_ok=True)
     (learned_skill / "SKILL.md").write_text("# linked\n")
-    link = workspace["target"] / "skills" / "linked-skill"
+    link = disk_workspace["target"] / "skills" / "linked-skill"
     link.symlink_to(Path("learned") / "linked-skill")
     manifest = _SyncManifest(items={})
-    agent = _make_agent(workspace["target"])
+    agent = _make_agent(disk_workspace["target"])
 
     # when
-    orphans = _detect_target_only_items(workspace["dotfiles"], agent, manifest)
+    orphans = _detect_target_only_items(disk_workspace["dotfiles"], agent, manifest)
 
     # then
     orphan_paths = [o.relative_path for o in orphans]
@@ -190,17 +196,19 @@ def test_skips_internal_symlinks(workspace: dict[str, Path]) -> None:
 
 
 @requires_symlinks
-def test_source_symlinks_count_as_valid_names(workspace: dict[str, Path]) -> None:
+def test_source_symlinks_count_as_valid_names(
+    disk_workspace: dict[str, Path],
+) -> None:
     """Symlinks in dotfiles source are included in valid names.
 
     e.g., skills/gcp-serverless-appdev -> learned/gcp-serverless-appdev
     should prevent that name from being flagged as orphan in target.
     """
     # given
-    dotfiles_skills = workspace["dotfiles"] / "skills"
+    dotfiles_skills = disk_workspace["dotfiles"] / "skills"
     dotfiles_skills.mkdir(parents=True, exist_ok=True)
     # Real skill
-    _make_skill(workspace["dotfiles"], "real-skill")
+    _make_skill(disk_workspace["dotfiles"], "real-skill")
     # Symlink in source (like learned skill links)
     learned = dotfiles_skills / "learned" / "symlinked-skill"
     learned.mkdir(parents=True, exist_ok=True)
@@ -209,13 +217,13 @@ def test_source_symlinks_count_as_valid_names(workspace: dict[str, Path]) -> Non
         Path("learned") / "symlinked-skill"
     )
     # Target has matching items
-    _make_skill(workspace["target"], "real-skill")
-    _make_skill(workspace["target"], "symlinked-skill")
+    _make_skill(disk_workspace["target"], "real-skill")
+    _make_skill(disk_workspace["target"], "symlinked-skill")
     manifest = _SyncManifest(items={})
-    agent = _make_agent(workspace["target"])
+    agent = _make_agent(disk_workspace["target"])
 
     # when
-    orphans = _detect_target_only_items(workspace["dotfiles"], agent, manifest)
+    orphans = _detect_target_only_items(disk_workspace["dotfiles"], agent, manifest)
 
     # then
     assert orphans == []
@@ -290,9 +298,7 @@ def test_respects_agent_sync_directories(workspace: dict[str, Path]) -> None:
     _make_skill(workspace["dotfiles"], "my-skill")
     _make_skill(workspace["target"], "my-skill")
     # Create orphan in commands/ (not in sync_directories for this agent)
-    cmd_dir = workspace["target"] / "commands"
-    cmd_dir.mkdir(parents=True, exist_ok=True)
-    (cmd_dir / "orphan-cmd.md").write_text("# orphan\n")
+    write_text(workspace["target"] / "commands" / "orphan-cmd.md", "# orphan\n")
     manifest = _SyncManifest(items={})
     agent = AgentTarget(
         directory=workspace["target"],
@@ -310,10 +316,8 @@ def test_respects_agent_sync_directories(workspace: dict[str, Path]) -> None:
 def test_orphan_file_not_directory(workspace: dict[str, Path]) -> None:
     """Non-directory orphan items are detected with is_directory=False."""
     # given
-    commands_dir = workspace["target"] / "commands"
-    commands_dir.mkdir(parents=True, exist_ok=True)
-    (commands_dir / "stray-file.md").write_text("# stray\n")
-    (workspace["dotfiles"] / "commands").mkdir(parents=True, exist_ok=True)
+    write_text(workspace["target"] / "commands" / "stray-file.md", "# stray\n")
+    mkdir(workspace["dotfiles"] / "commands")
     manifest = _SyncManifest(items={})
     agent = _make_agent(workspace["target"])
 
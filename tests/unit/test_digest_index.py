@@ -0,0 +1,207 @@
+"""Unit tests for the persistent digest index in sync_agents.
+
+`_build_sync_plan` decides "synced" vs "changed" from per-file content
+digests cached in `.sync-digests.json` (dotfiles dir + every agent home).
+A cached digest is reused only while the file's stat signature (size,
+mtime_ns, inode) is unchanged, so a no-op sync re-reads nothing.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    DIGEST_INDEX_FILE,
+    AgentTarget,
+    _build_sync_plan,
+    _DigestIndex,
+    _file_digest,
+    _get_additional_sources,
+    _load_digest_index,
+    _save_digest_index,
+    _tree_digest,
+)
+
+# Far enough in the past that no entry is inside the racy window.
+OLD_NS = 1_600_000_000_000_000_000
+
+
+@pytest.fixture()
+def workspace(tmp_path: Path) -> dict[str, Path]:
+    """Create dotfiles and target directory structure."""
+    dotfiles_dir = tmp_path / "dotfiles"
+    target_dir = tmp_path / "target"
+    dotfiles_dir.mkdir()
+    target_dir.mkdir()
+    (dotfiles_dir / "ROOT_AGENTS.md").write_text("# base\n")
+    return {"dotfiles": dotfiles_dir, "target": target_dir}
+
+
+def _make_command(parent: Path, name: str, body: str = "") -> Path:
+    """Create a command file under commands/."""
+    cmd = parent / "commands" / f"{name}.md"
+    cmd.parent.mkdir(parents=True, exist_ok=True)
+    cmd.write_text(f"# {name}\n{body}")
+    os.utime(cmd, ns=(OLD_NS, OLD_NS))
+    return cmd
+
+
+def _statuses(dotfiles: Path, agent: AgentTarget, **indexes) -> dict[str, str]:
+    plan = _build_sync_plan(
+        dotfiles, agent, _get_additional_sources(dotfiles), **indexes
+    )
+    return {a.relative_path: a.status for a in plan.items if not a.render}
+
+
+def test_cached_digest_skips_rehash(
+    workspace: dict[str, Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """An unchanged stat signature is served from the saved index."""
+    # given: an index saved after hashing the file once
+    cmd = _make_command(workspace["dotfiles"], "a")
+    index = _DigestIndex(root=workspace["dotfiles"])
+    digest = _file_digest(cmd, index)
+    _save_digest_index(index)
+    reloaded = _load_digest_index(workspace["dotfiles"])
+
+    # when: hashing is made impossible
+    def _fail(path: Path, fs: object = None) -> str:
+        raise AssertionError(f"re-hashed {path}")
+
+    monkeypatch.setattr(sync_agents, "_hash_file", _fail)
+
+    # then: the cached digest is returned
+    assert _file_digest(cmd, reloaded) == digest
+
+
+def test_changed_signature_is_rehashed(workspace: dict[str, Path]) -> None:
+    """A size/mtime change invalidates the cached entry."""
+    cmd = _make_command(workspace["dotfiles"], "a")
+    index = _DigestIndex(root=workspace["dotfiles"])
+    before = _file_digest(cmd, index)
+    _save_digest_index(index)
+
+    cmd.write_text("# a\nedited\n")
+    reloaded = _load_digest_index(workspace["dotfiles"])
+
+    assert _file_digest(cmd, reloaded) != before
+
+
+def test_racy_entry_is_not_trusted(
+    workspace: dict[str, Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A file modified right before the index was written is re-hashed."""
+    cmd = workspace["dotfiles"] / "fresh.md"
+    cmd.write_text("fresh\n")  # mtime == now, inside the racy window
+    index = _DigestIndex(root=workspace["dotfiles"])
+    _file_digest(cmd, index)
+    _save_digest_index(index)
+    reloaded = _load_digest_index(workspace["dotfiles"])
+
+    calls: list[Path] = []
+    real = sync_agents._hash_file
+    monkeypatch.setattr(
+        sync_agents, "_hash_file", lambda p, fs=None: calls.append(p) or real(p, fs)
+    )
+    _file_digest(cmd, reloaded)
+
+    assert calls == [cmd]
+
+
+def test_corrupt_index_is_discarded(workspace: dict[str, Path]) -> None:
+    (workspace["target"] / DIGEST_INDEX_FILE).write_text("{not json")
+
+    index = _load_digest_index(workspace["target"])
+
+    assert index.entries == {}
+
+
+def test_tree_digest_ignores_excluded_children(tmp_path: Path) -> None:
+    """learned/*-workspace never affects the learned/ tree digest."""
+    left = tmp_path / "a" / "learned"
+    right = tmp_path / "b" / "learned"
+    for root in (left, right):
+        (root / "skill").mkdir(parents=True)
+        (root / "skill" / "SKILL.md").write_text("# s\n")
+    (right / "skill-workspace").mkdir()
+    (right / "skill-workspace" / "scratch.txt").write_text("x")
+
+    index = _DigestIndex(root=tmp_path)
+
+    assert _tree_digest(left, index) == _tree_digest(right, index)
+
+
+def test_tree_digest_detects_type_and_content_changes(tmp_path: Path) -> None:
+    left = tmp_path / "a"
+    right = tmp_path / "b"
+    for root in (left, right):
+        root.mkdir()
+        (root / "f.md").write_text("same\n")
+    index = _DigestIndex(root=tmp_path)
+    assert _tree_digest(left, index) == _tree_digest(right, index)
+
+    (right / "f.md").write_text("different\n")
+    assert _tree_digest(left, index) != _tree_digest(right, index)
+
+    (right / "f.md").unlink()
+    (right / "f.md").mkdir()
+    assert _tree_digest(left, index) != _tree_digest(right, index)
+
+
+def test_plan_statuses_match_content(workspace: dict[str, Path]) -> None:
+    """synced / changed / new decided from digests across two indexes."""
+    _make_command(workspace["dotfiles"], "same")
+    _make_command(workspace["dotfiles"], "edited")
+    _make_command(workspace["dotfiles"], "added")
+    _make_command(workspace["target"], "same")
+    _make_command(workspace["target"], "edited", body="local edit\n")
+    agent = AgentTarget(directory=workspace["target"], name="Test")
+
+    statuses = _statuses(
+        workspace["dotfiles"],
+        agent,
+        target_index=_load_digest_index(workspace["target"]),
+    )
+
+    assert statuses == {
+        "commands/added.md": "new",
+        "commands/edited.md": "changed",
+        "commands/same.md": "synced",
+    }
+
+
+def test_pruning_drops_only_stale_unseen_entries(workspace: dict[str, Path]) -> None:
+    """A full run's save drops deleted and rewritten files, keeps valid ones."""
+    # given: a saved index over four files
+    dotfiles = workspace["dotfiles"]
+    cmds = {n: _make_command(dotfiles, n) for n in ("kept", "gone", "edited", "used")}
+    index = _DigestIndex(root=dotfiles)
+    for cmd in cmds.values():
+        _file_digest(cmd, index)
+    _save_digest_index(index)
+
+    # when: one file is deleted, one rewritten, and the next run only looks
+    # up "used" before saving
+    cmds["gone"].unlink()
+    cmds["edited"].write_text("# edited, longer\n")
+    partial = _load_digest_index(dotfiles)
+    _file_digest(cmds["used"], partial)
+    partial.dirty = True
+    _save_digest_index(partial)
+    full = _load_digest_index(dotfiles)
+    _file_digest(cmds["used"], full)
+    full.dirty = True
+    _save_digest_index(full, prune=True)
+
+    # then: a partial save prunes nothing; a full one keeps seen and still
+    # valid entries only
+    assert len(partial.entries) == 4
+    assert sorted(_load_digest_index(dotfiles).entries) == [
+        "commands/kept.md",
+        "commands/used.md",
+    ]
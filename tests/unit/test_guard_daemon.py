@@ -0,0 +1,127 @@
+"""Unit tests for the opt-in guard daemon behind block-prohibited-commands.sh.
+
+With AGENT_GUARD_DAEMON=1 the wrapper hands the payload to
+block-prohibited-commands-client.py, which talks to a long-lived
+`block-prohibited-commands.py --serve SOCKET` over a unix socket (starting it
+on first use). The exit-code contract must not change, and any daemon trouble
+must fall back to the in-process guard.
+"""
+
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parents[2]
+SOURCES = {
+    "block-prohibited-commands.sh": "ROOT_AGENTS_hooks_block-prohibited-commands.sh",
+    "block-prohibited-commands.py": "ROOT_AGENTS_hooks_block-prohibited-commands.py",
+    "block-prohibited-commands-client.py": (
+        "ROOT_AGENTS_hooks_block-prohibited-commands-client.py"
+    ),
+}
+
+EXIT_ALLOW = 0
+EXIT_BLOCK = 2
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32"
+    or shutil.which("bash") is None
+    or shutil.which("python3") is None,
+    reason="unix sockets + posix_spawn: Linux/macOS/WSL only",
+)
+
+
+@pytest.fixture()
+def hooks_dir(tmp_path: Path) -> Path:
+    """The deployed hooks/ layout of the wrapper and both companions."""
+    hooks = tmp_path / "hooks"
+    hooks.mkdir()
+    for deployed, source in SOURCES.items():
+        shutil.copy(REPO / source, hooks / deployed)
+    return hooks
+
+
+@pytest.fixture()
+def runtime_dir() -> Iterator[Path]:
+    """A short XDG_RUNTIME_DIR (unix socket paths are limited to ~104 bytes)."""
+    path = Path(tempfile.mkdtemp(prefix="ag-", dir="/tmp"))
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _run(hooks: Path, runtime: Path, command: str, idle: float = 2.0) -> int:
+    env = {
+        **os.environ,
+        "AGENT_GUARD_DAEMON": "1",
+        "AGENT_GUARD_IDLE_S": str(idle),
+        "XDG_RUNTIME_DIR": str(runtime),
+    }
+    result = subprocess.run(
+        ["bash", str(hooks / "block-prohibited-commands.sh")],
+        input=json.dumps({"tool_input": {"command": command}}),
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    return result.returncode
+
+
+def _sockets(runtime: Path) -> list[Path]:
+    return sorted(runtime.glob("agent-guard-*/*.sock"))
+
+
+def test_daemon_answers_with_the_exit_code_contract(
+    hooks_dir: Path, runtime_dir: Path
+) -> None:
+    assert _run(hooks_dir, runtime_dir, "npm install") == EXIT_BLOCK
+    (sock,) = _sockets(runtime_dir)
+    assert sock.parent.stat().st_mode & 0o777 == 0o700
+
+    assert _run(hooks_dir, runtime_dir, "uv sync") == EXIT_ALLOW
+    assert _run(hooks_dir, runtime_dir, "git push -f origin main") == EXIT_BLOCK
+    assert _sockets(runtime_dir) == [sock]
+
+
+def test_untrusted_socket_dir_falls_back_in_process(
+    hooks_dir: Path, runtime_dir: Path
+) -> None:
+    shared = runtime_dir / f"agent-guard-{os.getuid()}"
+    shared.mkdir()
+    shared.chmod(0o777)
+
+    assert _run(hooks_dir, runtime_dir, "pip install x") == EXIT_BLOCK
+    assert _run(hooks_dir, runtime_dir, "ls") == EXIT_ALLOW
+    assert _sockets(runtime_dir) == []
+
+
+def test_daemon_exits_when_idle(hooks_dir: Path, runtime_dir: Path) -> None:
+    assert _run(hooks_dir, runtime_dir, "ls", idle=0.3) == EXIT_ALLOW
+
+    deadline = time.monotonic() + 5
+    while _sockets(runtime_dir) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _sockets(runtime_dir) == []
+
+
+def test_decide_matches_the_in_process_verdict() -> None:
+    spec = importlib.util.spec_from_file_location(
+        "guard", REPO / SOURCES["block-prohibited-commands.py"]
+    )
+    assert spec is not None and spec.loader is not None
+    guard = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(guard)
+
+    code, message = guard.decide(b'{"tool_input":{"command":"make all"}}')
+    assert code == EXIT_BLOCK and message.startswith("BLOCKED: ")
+    assert guard.decide(b'{"tool_input":{"command":"just check"}}') == (0, "")
+    assert guard.decide(b"not json") == (0, "")
@@ -0,0 +1,220 @@
+"""Unit tests for the single-process hook dispatcher ROOT_AGENTS_hooks_dispatch.sh.
+
+One registration (`dispatch.sh PreToolUse` / `dispatch.sh PostToolUse`)
+replaces the per-hook scripts: the payload is parsed once and every rule that
+applies to the tool runs in-process. Verdicts must match the per-hook scripts
+they mirror, and sync must render the dispatcher command for every agent
+home and OS in place of the old per-hook blocks.
+
+Secret fixtures are assembled by concatenation (see test_block_secrets_hook).
+"""
+
+import json
+import shutil
+import sys
+from pathlib import Path, PureWindowsPath
+
+import pytest
+
+from _bash_hook import run_bash
+
+REPO = Path(__file__).resolve().parents[2]
+DISPATCH = REPO / "ROOT_AGENTS_hooks_dispatch.sh"
+COMPANIONS = (
+    REPO / "ROOT_AGENTS_hooks_dispatch.py",
+    REPO / "ROOT_AGENTS_hooks_block-prohibited-commands.py",
+    REPO / "ROOT_AGENTS_hooks_block-secrets.py",
+)
+
+sys.path.insert(0, str(REPO / "scripts"))
+
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _merge_hook_settings,
+    _render_hook_command,
+)
+
+EXIT_ALLOW = 0
+EXIT_BLOCK = 2
+
+AWS_KEY = "AKIA" + "ABCDEFGHIJKLMNOP"
+
+needs_hooks = pytest.mark.skipif(
+    sys.platform == "win32"
+    or shutil.which("bash") is None
+    or shutil.which("python3") is None,
+    reason="Linux/WSL/CI only (see test_agent_hooks: python3 on native Windows)",
+)
+
+
+def _run(script: Path, payload: dict, *args: str, cwd: Path) -> tuple[int, str]:
+    result = run_bash(
+        script,
+        *args,
+        cwd=cwd,
+        companions=COMPANIONS if script == DISPATCH else (),
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return result.returncode, result.stderr
+
+
+PARITY = [
+    ("block-prohibited-commands.sh", "Bash", {"command": "npm install"}),
+    ("block-prohibited-commands.sh", "Bash", {"command": "git commit -m 'no npm'"}),
+    ("block-prohibited-files.sh", "Write", {"file_path": "ci/build.yml"}),
+    ("block-prohibited-files.sh", "Write", {"file_path": "docker-compose.yaml"}),
+    ("block-prohibited-files.sh", "Edit", {"file_path": "repo/docs/agents/x.yml"}),
+    ("block-prohibited-files.sh", "Write", {"file_path": "compose.yaml"}),
+    ("block-secrets.sh", "Write", {"file_path": "a.py", "content": AWS_KEY}),
+    ("block-secrets.sh", "Edit", {"file_path": "a.md", "new_string": "risk-assess"}),
+    ("block-secrets.sh", "NotebookEdit", {"new_source": "xoxb-" + "1234567890ab"}),
+]
+
+
+@needs_hooks
+@pytest.mark.skipif(shutil.which("jq") is None, reason="per-hook scripts need jq")
+@pytest.mark.parametrize(("hook", "tool", "tool_input"), PARITY)
+def test_verdict_matches_the_per_hook_script(
+    hook: str, tool: str, tool_input: dict, tmp_path: Path
+) -> None:
+    payload = {"hook_event_name": "PreToolUse", "tool_name": tool}
+    payload["tool_input"] = tool_input
+    script = REPO / f"ROOT_AGENTS_hooks_{hook}"
+    expected = run_bash(
+        script,
+        cwd=tmp_path,
+        companions=COMPANIONS[1:],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    code, stderr = _run(DISPATCH, payload, "PreToolUse", cwd=tmp_path)
+
+    assert code == expected.returncode
+    assert stderr == expected.stderr
+
+
+@needs_hooks
+def test_every_blocking_rule_is_reported(tmp_path: Path) -> None:
+    payload = {
+        "tool_name": "Write",
+        "tool_input": {"file_path": "deploy.yml", "content": f"key: {AWS_KEY}"},
+    }
+
+    code, stderr = _run(DISPATCH, payload, "PreToolUse", cwd=tmp_path)
+
+    assert code == EXIT_BLOCK
+    assert [line.split(":")[0] for line in stderr.splitlines()] == ["BLOCKED"] * 2
+    assert "'.yml'" in stderr and "live secret" in stderr
+
+
+@needs_hooks
+def test_post_tool_use_never_blocks(tmp_path: Path) -> None:
+    target = tmp_path / "deploy.yml"
+    target.write_text(AWS_KEY)
+    payload = {"tool_name": "Write", "tool_input": {"file_path": str(target)}}
+
+    assert _run(DISPATCH, payload, "PostToolUse", cwd=tmp_path) == (EXIT_ALLOW, "")
+
+
+@needs_hooks
+def test_deployed_layout_and_fail_closed(tmp_path: Path) -> None:
+    hooks = tmp_path / "hooks"
+    hooks.mkdir()
+    shutil.copy(DISPATCH, hooks / "dispatch.sh")
+    payload = {"tool_name": "Bash", "tool_input": {"command": "ls"}}
+
+    # no companion: block, loudly
+    code, stderr = _run(hooks / "dispatch.sh", payload, "PreToolUse", cwd=tmp_path)
+    assert code == EXIT_BLOCK and "failing closed" in stderr
+
+    # dispatcher without the command guard: Bash calls still fail closed
+    shutil.copy(COMPANIONS[0], hooks / "dispatch.py")
+    code, stderr = _run(hooks / "dispatch.sh", payload, "PreToolUse", cwd=tmp_path)
+    assert code == EXIT_BLOCK and "failing closed" in stderr
+
+    shutil.copy(COMPANIONS[1], hooks / "block-prohibited-commands.py")
+    code, _ = _run(hooks / "dispatch.sh", payload, "PreToolUse", cwd=tmp_path)
+    assert code == EXIT_ALLOW
+
+
+def _command(event: str) -> dict:
+    return {
+        "type": "command",
+        "command": f'bash "$CLAUDE_PROJECT_DIR/.claude/hooks/dispatch.sh" {event}',
+    }
+
+
+@pytest.mark.parametrize(
+    ("system", "home", "shell"),
+    [
+        ("Linux", Path("/home/u/.claude"), "bash"),
+        ("Darwin", Path("/Users/u/.claude-work-a"), "bash"),
+        ("Windows", PureWindowsPath(r"C:\Users\u\.claude"), "sh"),
+    ],
+)
+def test_dispatcher_command_renders_per_home_and_os(
+    system: str, home: Path, shell: str
+) -> None:
+    agent = AgentTarget(directory=home, name="Home")
+
+    rendered = _render_hook_command(_command("PreToolUse")["command"], agent, system)
+
+    assert rendered == f'{shell} "{home.as_posix()}/hooks/dispatch.sh" PreToolUse'
+
+
+def test_dispatcher_replaces_per_hook_blocks_in_settings(tmp_path: Path) -> None:
+    # given: settings.json with per-hook managed blocks and one user block
+    dotfiles = tmp_path / "dotfiles"
+    fragment = dotfiles / ".claude" / "settings.hooks.json"
+    fragment.parent.mkdir(parents=True)
+    fragment.write_text(
+        json.dumps(
+            {
+                "hooks": {
+                    "PreToolUse": [
+                        {
+                            "matcher": "Bash|Write|Edit|NotebookEdit",
+                            "hooks": [_command("PreToolUse")],
+                        }
+                    ],
+                    "PostToolUse": [
+                        {"matcher": "Write|Edit", "hooks": [_command("PostToolUse")]}
+                    ],
+                }
+            }
+        )
+    )
+    agent = AgentTarget(directory=tmp_path / "home", name="Home")
+    agent.directory.mkdir()
+    hooks_dir = f"{agent.directory.as_posix()}/hooks"
+    user_block = {"matcher": "Bash", "hooks": [{"type": "command", "command": "x"}]}
+    old_blocks = [
+        {"matcher": matcher, "hooks": [{"type": "command", "command": command}]}
+        for matcher, command in [
+            ("Bash", f'bash "{hooks_dir}/block-prohibited-commands.sh"'),
+            ("Write|Edit", f'bash "{hooks_dir}/block-secrets.sh"'),
+        ]
+    ]
+    settings = agent.directory / "settings.json"
+    settings.write_text(
+        json.dumps({"hooks": {"PreToolUse": [user_block, *old_blocks]}})
+    )
+
+    # when
+    assert _merge_hook_settings(dotfiles, agent, system="Linux") is True
+
+    # then: one dispatcher block per event; the user block survives
+    hooks = json.loads(settings.read_text())["hooks"]
+    assert hooks["PreToolUse"][0] == user_block
+    assert [h["command"] for b in hooks["PreToolUse"][1:] for h in b["hooks"]] == [
+        f'bash "{hooks_dir}/dispatch.sh" PreToolUse'
+    ]
+    assert [h["command"] for b in hooks["PostToolUse"] for h in b["hooks"]] == [
+        f'bash "{hooks_dir}/dispatch.sh" PostToolUse'
+    ]
@@ -4,6 +4,8 @@ Tests that:
 1. import_only_mode runs Phase 1 (target -> dotfiles) and skips Phase 2-3.
 2. The is_import_source filter is dropped when running import-only:
    ALL selected agents become import candidates.
+
+Both run against the in-memory backend (_memfs): no disk is touched.
 """
 
 import sys
@@ -11,6 +13,8 @@ from pathlib import Path
 
 import pytest
 
+from _memfs import exists, mkdir, use_memory_fs, write_text
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
 
 from sync_agents import (
@@ -24,30 +28,23 @@ from sync_agents import (
 def _make_skill(parent: Path, name: str, content: str = "skill") -> Path:
     """Create a minimal skill directory with SKILL.md."""
     skill_dir = parent / "skills" / name
-    skill_dir.mkdir(parents=True, exist_ok=True)
-    (skill_dir / "SKILL.md").write_text(f"# {name}\n{content}\n")
+    write_text(skill_dir / "SKILL.md", f"# {name}\n{content}\n")
     return skill_dir
 
 
 def _make_command(parent: Path, name: str) -> Path:
     """Create a minimal command file (skills never import — declarative model)."""
-    commands_dir = parent / "commands"
-    commands_dir.mkdir(parents=True, exist_ok=True)
-    command = commands_dir / f"{name}.md"
-    command.write_text(f"# {name}\n")
-    return command
+    return write_text(parent / "commands" / f"{name}.md", f"# {name}\n")
 
 
 @pytest.fixture()
-def workspace(tmp_path: Path) -> dict[str, Path]:
-    """Create dotfiles + two target dirs."""
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> dict[str, Path]:
+    """Create dotfiles + two target dirs (in memory)."""
+    use_memory_fs(monkeypatch)
     dotfiles = tmp_path / "dotfiles"
-    target_a = tmp_path / "target-a"
-    target_b = tmp_path / "target-b"
-    dotfiles.mkdir()
-    target_a.mkdir()
-    target_b.mkdir()
-    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    target_a = mkdir(tmp_path / "target-a")
+    target_b = mkdir(tmp_path / "target-b")
+    write_text(dotfiles / "ROOT_AGENTS.md", "# base\n")
     return {"dotfiles": dotfiles, "target_a": target_a, "target_b": target_b}
 
 
@@ -75,7 +72,7 @@ def test_import_only_imports_from_non_import_source_agent(
 
 
 def test_import_only_mode_does_not_create_target_files(
-    workspace: dict[str, Path],
+    workspace: dict[str, Path], tmp_path: Path
 ) -> None:
     """import_only_mode runs Phase 1 only — no forward sync, no orphan removal."""
     # given: dotfiles has a skill that is NOT in target-a
@@ -93,7 +90,10 @@ def test_import_only_mode_does_not_create_target_files(
     import_only_mode(workspace["dotfiles"], agents=[agent])
 
     # then: target-a's unique command landed in dotfiles
-    assert (workspace["dotfiles"] / "commands" / "only-in-target.md").exists()
+    assert exists(workspace["dotfiles"] / "commands" / "only-in-target.md")
 
     # then: dotfiles' unique skill was NOT pushed into target-a
-    assert not (workspace["target_a"] / "skills" / "only-in-dotfiles").exists()
+    assert not exists(workspace["target_a"] / "skills" / "only-in-dotfiles")
+
+    # then: the whole run stayed in memory
+    assert list(tmp_path.iterdir()) == []
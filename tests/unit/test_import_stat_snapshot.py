@@ -0,0 +1,117 @@
+"""Unit tests for stat-snapshot import planning in sync_agents.
+
+An existing directory item is decided (exists / import / conflict) from one
+_scan_tree per side: the dotfiles side comes from the run's source snapshot
+and the import source is walked once, giving both the dircmp-style equality
+and the newest-mtime comparison.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _build_import_plan,
+    _scan_source,
+    _SyncManifest,
+)
+
+OLD_NS = 1_600_000_000_000_000_000
+NEW_NS = OLD_NS + 60_000_000_000
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, AgentTarget]:
+    """The same learned skill in dotfiles and in an import-source home."""
+    dotfiles = tmp_path / "dotfiles"
+    home = tmp_path / "home"
+    for root in (dotfiles, home):
+        skill = root / "skills" / "learned" / "foo"
+        skill.mkdir(parents=True)
+        (skill / "SKILL.md").write_text("# foo\n")
+        os.utime(skill / "SKILL.md", ns=(OLD_NS, OLD_NS))
+    agent = AgentTarget(directory=home, name="Home", key="home", is_import_source=True)
+    return dotfiles, agent
+
+
+def _status(dotfiles: Path, agent: AgentTarget) -> str:
+    plan = _build_import_plan(
+        dotfiles, agent, _SyncManifest(), snapshot=_scan_source(dotfiles)
+    )
+    (action,) = [a for a in plan.items if a.relative_path == "skills/learned"]
+    return action.status
+
+
+def test_identical_trees_exist(world: tuple[Path, AgentTarget]) -> None:
+    assert _status(*world) == "exists"
+
+
+def test_newer_import_source_is_imported(world: tuple[Path, AgentTarget]) -> None:
+    dotfiles, agent = world
+    edited = agent.directory / "skills" / "learned" / "foo" / "SKILL.md"
+    edited.write_text("# foo v2\n")
+    os.utime(edited, ns=(NEW_NS, NEW_NS))
+
+    assert _status(dotfiles, agent) == "import"
+
+
+def test_newer_dotfiles_is_a_conflict(world: tuple[Path, AgentTarget]) -> None:
+    dotfiles, agent = world
+    edited = dotfiles / "skills" / "learned" / "foo" / "SKILL.md"
+    edited.write_text("# foo v2\n")
+    os.utime(edited, ns=(NEW_NS, NEW_NS))
+
+    assert _status(dotfiles, agent) == "conflict"
+
+
+def test_same_size_touched_file_compares_content(
+    world: tuple[Path, AgentTarget],
+) -> None:
+    """dircmp's shallow rule: a differing mtime alone is not a difference."""
+    dotfiles, agent = world
+    os.utime(
+        agent.directory / "skills" / "learned" / "foo" / "SKILL.md",
+        ns=(NEW_NS, NEW_NS),
+    )
+
+    assert _status(dotfiles, agent) == "exists"
+
+
+def test_excluded_workspace_is_ignored(world: tuple[Path, AgentTarget]) -> None:
+    """A fresh skill-creator workspace neither breaks equality nor wins by age."""
+    dotfiles, agent = world
+    workspace = agent.directory / "skills" / "learned" / "foo-workspace"
+    workspace.mkdir()
+    (workspace / "draft.md").write_text("draft\n")
+    os.utime(workspace / "draft.md", ns=(NEW_NS, NEW_NS))
+
+    assert _status(dotfiles, agent) == "exists"
+
+
+def test_each_side_is_walked_at_most_once(
+    world: tuple[Path, AgentTarget], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: a conflicting item (equality and age both needed)
+    dotfiles, agent = world
+    edited = dotfiles / "skills" / "learned" / "foo" / "SKILL.md"
+    edited.write_text("# foo v2\n")
+    snapshot = _scan_source(dotfiles)
+    walked: list[Path] = []
+    real = sync_agents._scan_tree
+    monkeypatch.setattr(
+        sync_agents,
+        "_scan_tree",
+        lambda path, with_stat=True: walked.append(path) or real(path, with_stat),
+    )
+
+    # when
+    _build_import_plan(dotfiles, agent, _SyncManifest(), snapshot=snapshot)
+
+    # then: only the import source is walked; dotfiles comes from the snapshot
+    assert walked == [agent.directory / "skills" / "learned"]
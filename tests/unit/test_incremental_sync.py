@@ -0,0 +1,209 @@
+"""Unit tests for --incremental (git-diff driven planning) in sync_agents.
+
+A complete sync records the dotfiles commit, its dirty paths and each home's
+stat state; the next incremental run plans only the items git reports as
+changed since, and falls back to a full scan whenever that is not safe.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import AgentTarget, _changed_items, sync_mode  # noqa: E402
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-C", str(repo), *args],
+        check=True,
+        capture_output=True,
+        env={
+            **os.environ,
+            "GIT_AUTHOR_NAME": "t",
+            "GIT_AUTHOR_EMAIL": "t@example.com",
+            "GIT_COMMITTER_NAME": "t",
+            "GIT_COMMITTER_EMAIL": "t@example.com",
+        },
+    )
+
+
+@pytest.fixture()
+def repo(tmp_path: Path) -> tuple[Path, AgentTarget]:
+    """A committed dotfiles checkout, fully synced once into one home."""
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    for name in ("a", "b", "c"):
+        (dotfiles / "commands" / f"{name}.md").write_text(f"# {name}\n")
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    (dotfiles / "ROOT_AGENTS_hooks_guard.sh").write_text("exit 0\n")
+    (dotfiles / ".gitignore").write_text(".sync-*.json\n")
+    _git(dotfiles, "init", "-q")
+    _git(dotfiles, "add", "-A")
+    _git(dotfiles, "commit", "-q", "-m", "init")
+    agent = AgentTarget(directory=tmp_path / "home", name="Home", key="home")
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+    return dotfiles, agent
+
+
+@pytest.fixture()
+def scanned(monkeypatch: pytest.MonkeyPatch) -> list[frozenset[str] | None]:
+    """Record the ``only`` set of every source scan."""
+    calls: list[frozenset[str] | None] = []
+    real = sync_agents._scan_source
+    monkeypatch.setattr(
+        sync_agents,
+        "_scan_source",
+        lambda d, index=None, only=None: calls.append(only) or real(d, index, only),
+    )
+    return calls
+
+
+def test_changed_items_mapping() -> None:
+    assert _changed_items(
+        frozenset(
+            {
+                "ROOT_AGENTS_docs_agents_testing.md",
+                "commands/a.md",
+                "skills/learned/x/SKILL.md",
+                "ROOT_AGENTS.md",
+                ".claude/settings.shared.json",
+                "scripts/unrelated.py",
+            }
+        )
+    ) == {"docs/agents/testing.md", "commands/a.md", "skills/learned"}
+    # the skills submodule gitlink / the denylist cannot be mapped to items
+    assert _changed_items(frozenset({"skills"})) is None
+    assert _changed_items(frozenset({"dump/harness/skills-sync-exclude.toml"})) is None
+
+
+@requires_git
+def test_incremental_plans_only_changed_items(
+    repo: tuple[Path, AgentTarget], scanned: list[frozenset[str] | None]
+) -> None:
+    # given: one committed edit and one uncommitted new command
+    dotfiles, agent = repo
+    (dotfiles / "commands" / "a.md").write_text("# a v2\n")
+    _git(dotfiles, "commit", "-q", "-am", "edit a")
+    (dotfiles / "commands" / "d.md").write_text("# d\n")
+
+    # when
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], incremental=True)
+
+    # then
+    assert scanned == [frozenset({"commands/a.md", "commands/d.md"})]
+    assert (agent.directory / "commands" / "a.md").read_text() == "# a v2\n"
+    assert (agent.directory / "commands" / "d.md").read_text() == "# d\n"
+
+
+@requires_git
+def test_dirty_paths_are_replanned_until_committed(
+    repo: tuple[Path, AgentTarget], scanned: list[frozenset[str] | None]
+) -> None:
+    """A path dirty at the last sync is re-planned even if reverted since."""
+    dotfiles, agent = repo
+    (dotfiles / "commands" / "b.md").write_text("# b draft\n")
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], incremental=True)
+    _git(dotfiles, "checkout", "--", "commands/b.md")
+    scanned.clear()
+
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], incremental=True)
+
+    assert scanned == [frozenset({"commands/b.md"})]
+    assert (agent.directory / "commands" / "b.md").read_text() == "# b\n"
+
+
+@requires_git
+def test_deleted_source_item_is_removed(repo: tuple[Path, AgentTarget]) -> None:
+    dotfiles, agent = repo
+    _git(dotfiles, "rm", "-q", "commands/c.md")
+    _git(dotfiles, "commit", "-q", "-m", "drop c")
+
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], incremental=True)
+
+    assert not (agent.directory / "commands" / "c.md").exists()
+
+
+@requires_git
+def test_touched_target_falls_back_to_full_scan(
+    repo: tuple[Path, AgentTarget],
+    scanned: list[frozenset[str] | None],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    dotfiles, agent = repo
+    (agent.directory / "commands" / "b.md").write_text("# local edit\n")
+
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], incremental=True)
+
+    assert scanned[0] is None
+    assert "was modified since the last sync" in capsys.readouterr().out
+    assert (agent.directory / "commands" / "b.md").read_text() == "# b\n"
+
+
+@requires_git
+def test_unknown_base_commit_falls_back_to_full_scan(
+    repo: tuple[Path, AgentTarget],
+    scanned: list[frozenset[str] | None],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    dotfiles, agent = repo
+    manifest = sync_agents._load_manifest(dotfiles)
+    state = manifest.synced[agent.key]
+    manifest.synced[agent.key] = sync_agents._SyncedState(
+        "0" * 40, state.dirty, state.target
+    )
+    sync_agents._save_manifest(dotfiles, manifest)
+
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], incremental=True)
+
+    assert scanned[0] is None
+    assert "git cannot diff" in capsys.readouterr().out
+
+
+@requires_git
+def test_incremental_keeps_unchanged_spokes_and_hooks(tmp_path: Path) -> None:
+    """docs/agents/ and hooks/ orphans come from every ROOT_AGENTS_* source,
+    not from the partial snapshot: unchanged spokes/hooks are not orphans."""
+    # given: a claude-like home fully synced with one spoke and one hook
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "commands" / "a.md").write_text("# a\n")
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    (dotfiles / "ROOT_AGENTS_docs_agents_testing.md").write_text("# testing\n")
+    (dotfiles / "ROOT_AGENTS_hooks_guard.sh").write_text("exit 0\n")
+    (dotfiles / ".gitignore").write_text(".sync-*.json\n")
+    _git(dotfiles, "init", "-q")
+    _git(dotfiles, "add", "-A")
+    _git(dotfiles, "commit", "-q", "-m", "init")
+    agent = AgentTarget(
+        directory=tmp_path / "home", name="Home", key="home", receives_hooks=True
+    )
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+    before = sorted(
+        p.relative_to(agent.directory).as_posix()
+        for p in agent.directory.rglob("*")
+        if p.is_file() and not p.name.startswith(".")
+    )
+
+    # when: only commands/a.md changed
+    (dotfiles / "commands" / "a.md").write_text("# a v2\n")
+    _git(dotfiles, "commit", "-q", "-am", "edit a")
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], incremental=True)
+
+    # then: nothing outside the changed item was removed
+    after = sorted(
+        p.relative_to(agent.directory).as_posix()
+        for p in agent.directory.rglob("*")
+        if p.is_file() and not p.name.startswith(".")
+    )
+    assert "docs/agents/testing.md" in before and "hooks/guard.sh" in before
+    assert after == before
+    assert (agent.directory / "commands" / "a.md").read_text() == "# a v2\n"
@@ -0,0 +1,174 @@
+"""Unit tests for --link-mode (copy / reflink / hardlink) in sync_agents.
+
+Non-rendered items may be cloned (FICLONE / copy_file_range) or hardlinked
+instead of copied; rendered base/overlay/spokes always get their own content,
+and every mode falls back to copy2 when the filesystem refuses.
+"""
+
+import errno
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _apply_import,
+    _copy_file,
+    _ImportAction,
+    _ImportPlan,
+    sync_mode,
+)
+
+
+@pytest.fixture()
+def workspace(tmp_path: Path) -> tuple[Path, AgentTarget]:
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "commands" / "strict.md").write_text("# strict\n")
+    (dotfiles / "skills" / "demo").mkdir(parents=True)
+    (dotfiles / "skills" / "demo" / "SKILL.md").write_text("# demo\n")
+    (dotfiles / "ROOT_AGENTS.md").write_text("see docs/agents/testing.md\n")
+    agent = AgentTarget(
+        directory=tmp_path / "home", name="Home", key="home", main_file="AGENTS.md"
+    )
+    return dotfiles, agent
+
+
+def _ino(path: Path) -> int:
+    return path.stat().st_ino
+
+
+def test_hardlink_mode_shares_inodes_except_rendered(
+    workspace: tuple[Path, AgentTarget],
+) -> None:
+    dotfiles, agent = workspace
+
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], link_mode="hardlink")
+
+    home = agent.directory
+    assert _ino(home / "commands/strict.md") == _ino(dotfiles / "commands/strict.md")
+    assert _ino(home / "skills/demo/SKILL.md") == _ino(
+        dotfiles / "skills/demo/SKILL.md"
+    )
+    assert _ino(home / "AGENTS.md") != _ino(dotfiles / "ROOT_AGENTS.md")
+    assert str(home) in (home / "AGENTS.md").read_text()
+
+
+@pytest.mark.parametrize("link_mode", ["hardlink", "store"])
+def test_import_never_links_into_dotfiles(
+    workspace: tuple[Path, AgentTarget], link_mode: str
+) -> None:
+    """Import writes its own files: dotfiles never shares an agent's inode."""
+    # given: a command and a skill that exist only in the agent home
+    dotfiles, agent = workspace
+    command = agent.directory / "commands" / "local.md"
+    skill = agent.directory / "skills" / "local"
+    skill.mkdir(parents=True)
+    command.parent.mkdir()
+    command.write_text("# local\n")
+    (skill / "SKILL.md").write_text("# local skill\n")
+    items = [
+        _ImportAction(
+            source_path=path,
+            resolved_path=path,
+            dotfiles_dest=dotfiles / path.relative_to(agent.directory),
+            relative_path=path.relative_to(agent.directory).as_posix(),
+            is_directory=path.is_dir(),
+            is_symlink=False,
+            status="import",
+        )
+        for path in (command, skill)
+    ]
+
+    # when
+    _apply_import(_ImportPlan(agent=agent, items=items), link_mode)
+
+    # then
+    imported = dotfiles / "commands" / "local.md"
+    assert imported.read_text() == "# local\n"
+    assert _ino(imported) != _ino(command)
+    skill_md = dotfiles / "skills" / "local" / "SKILL.md"
+    assert skill_md.read_text() == "# local skill\n"
+    assert _ino(skill_md) != _ino(skill / "SKILL.md")
+
+
+def test_copy_mode_breaks_an_existing_hardlink(
+    workspace: tuple[Path, AgentTarget],
+) -> None:
+    """Re-syncing in copy mode never writes through a shared inode."""
+    # given: a hardlinked deploy, then a new source revision written by rename
+    dotfiles, agent = workspace
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], link_mode="hardlink")
+    source = dotfiles / "commands" / "strict.md"
+    shared = agent.directory / "commands" / "strict.md"
+    other_home_copy = agent.directory.parent / "other-home-strict.md"
+    os.link(shared, other_home_copy)  # e.g. a second home on the same inode
+    fresh = source.with_suffix(".tmp")
+    fresh.write_text("# strict v2\n")
+    fresh.replace(source)
+
+    # when
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+
+    # then: the target is its own file; the other link kept the old content
+    assert shared.read_text() == "# strict v2\n"
+    assert shared.stat().st_nlink == 1
+    assert other_home_copy.read_text() == "# strict\n"
+
+
+def test_hardlink_falls_back_to_copy_across_devices(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source = tmp_path / "a.md"
+    source.write_text("a\n")
+    target = tmp_path / "b.md"
+
+    def _exdev(src: object, dst: object) -> None:
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(sync_agents.os, "link", _exdev)
+    _copy_file(source, target, "hardlink")
+
+    assert target.read_text() == "a\n"
+    assert _ino(target) != _ino(source)
+
+
+def test_reflink_copies_content_and_metadata(tmp_path: Path) -> None:
+    """Whatever path wins (clone, copy_file_range, copy2) the result matches copy2."""
+    source = tmp_path / "big.bin"
+    source.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+    os.utime(source, ns=(1_600_000_000_000_000_000, 1_600_000_000_000_000_000))
+    target = tmp_path / "clone.bin"
+    target.write_text("stale and shorter")
+
+    _copy_file(source, target, "reflink")
+
+    assert target.read_bytes() == source.read_bytes()
+    assert target.stat().st_mtime_ns == source.stat().st_mtime_ns
+    assert _ino(target) != _ino(source)
+
+
+def test_reflink_without_kernel_support_uses_copy2(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source = tmp_path / "a.md"
+    source.write_text("a\n")
+    target = tmp_path / "b.md"
+    copied: list[Path] = []
+    real_copy2 = sync_agents.shutil.copy2
+    monkeypatch.setattr(sync_agents, "fcntl", None)
+    monkeypatch.setattr(
+        sync_agents.shutil,
+        "copy2",
+        lambda s, d: copied.append(Path(d)) or real_copy2(s, d),
+    )
+
+    _copy_file(source, target, "reflink")
+
+    assert copied == [target]
+    assert target.read_text() == "a\n"
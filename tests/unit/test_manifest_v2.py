@@ -0,0 +1,128 @@
+"""Unit tests for the v2 sync manifest in sync_agents.
+
+v2 keeps, per managed item, the content digest, file count, total size and
+the agent homes it was last applied to. The file is compact JSON written
+atomically (and not at all when unchanged); records are decoded on first use
+and a v1 manifest migrates on load.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    MANIFEST_FILE,
+    AgentTarget,
+    _load_manifest,
+    _ManifestItem,
+    _save_manifest,
+    sync_mode,
+)
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, list[AgentTarget]]:
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    (dotfiles / "commands" / "a.md").write_text("# a\n")
+    skill = dotfiles / "skills" / "learned" / "foo"
+    skill.mkdir(parents=True)
+    (skill / "SKILL.md").write_text("# foo\n")
+    (skill / "ref.md").write_text("ref\n")
+    agents = [
+        AgentTarget(directory=tmp_path / f"home-{i}", name=f"H{i}", key=f"h{i}")
+        for i in range(2)
+    ]
+    return dotfiles, agents
+
+
+def test_v1_manifest_migrates_on_load(tmp_path: Path) -> None:
+    (tmp_path / MANIFEST_FILE).write_text(
+        json.dumps({"version": 1, "items": {"commands": ["b.md", "a.md"]}})
+    )
+
+    manifest = _load_manifest(tmp_path)
+    _save_manifest(tmp_path, manifest)
+
+    assert manifest.items == {"commands": ["a.md", "b.md"]}
+    assert manifest.records == {}
+    data = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    assert data["version"] == 2
+    empty = ["", 0, 0, []]
+    assert data["items"] == {"commands": {"a.md": empty, "b.md": empty}}
+
+
+def test_sync_records_digest_size_and_agents(
+    world: tuple[Path, list[AgentTarget]],
+) -> None:
+    dotfiles, agents = world
+
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+
+    records = _load_manifest(dotfiles).records
+    command = records["commands/a.md"]
+    assert command.files == 1 and command.size == len("# a\n")
+    assert len(command.digest) == 64
+    assert command.agents == ("h0", "h1")
+    skill = records["skills/learned"]
+    assert skill.files == 2 and skill.agents == ("h0", "h1")
+
+
+def test_agents_reset_when_digest_changes(
+    world: tuple[Path, list[AgentTarget]],
+) -> None:
+    # given: both homes synced, then the command edited
+    dotfiles, agents = world
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+    (dotfiles / "commands" / "a.md").write_text("# a v2\n")
+
+    # when: only the first home is synced
+    sync_mode(dotfiles, auto_yes=True, agents=agents[:1])
+
+    # then: the second home no longer holds the recorded content
+    record = _load_manifest(dotfiles).records["commands/a.md"]
+    assert record.agents == ("h0",)
+    assert record.size == len("# a v2\n")
+
+
+def test_save_is_compact_atomic_and_skips_unchanged(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    manifest = _load_manifest(tmp_path)
+    manifest.items = {"commands": ["a.md"]}
+    manifest.records["commands/a.md"] = _ManifestItem("d" * 64, 1, 4, ("h0",))
+    replaced: list[str] = []
+    real_replace = os.replace
+    monkeypatch.setattr(
+        sync_agents.os,
+        "replace",
+        lambda src, dst: replaced.append(str(dst)) or real_replace(src, dst),
+    )
+
+    _save_manifest(tmp_path, manifest)
+    _save_manifest(tmp_path, manifest)
+    _save_manifest(tmp_path, _load_manifest(tmp_path))
+
+    path = tmp_path / MANIFEST_FILE
+    assert replaced == [str(path)]
+    assert ": " not in path.read_text() and "\n" not in path.read_text()[:-1]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [MANIFEST_FILE]
+
+
+def test_records_are_decoded_on_first_use(tmp_path: Path) -> None:
+    manifest = _load_manifest(tmp_path)
+    manifest.items = {"commands": ["a.md"]}
+    manifest.records["commands/a.md"] = _ManifestItem("d" * 64, 1, 4, ("h0",))
+    _save_manifest(tmp_path, manifest)
+
+    loaded = _load_manifest(tmp_path)
+
+    assert loaded._records is None
+    assert loaded.records["commands/a.md"] == _ManifestItem("d" * 64, 1, 4, ("h0",))
@@ -13,6 +13,7 @@ way as the hook fragment. Ownership model (stronger than the hook merge):
   preserved untouched. Top-level key removal is NOT auto-propagated (v1).
 
 The function is idempotent and dry-run aware, mirroring `_merge_hook_settings`.
+Tests run against the in-memory backend (_memfs): no disk is touched.
 """
 
 import json
@@ -21,6 +22,8 @@ from pathlib import Path
 
 import pytest
 
+from _memfs import exists, mkdir, read_text, use_memory_fs, write_text
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
 
 from sync_agents import (  # noqa: E402
@@ -31,12 +34,11 @@ from sync_agents import (  # noqa: E402
 
 
 @pytest.fixture()
-def workspace(tmp_path: Path) -> dict[str, Path]:
-    """Create dotfiles and target (agent home) directory structure."""
-    dotfiles_dir = tmp_path / "dotfiles"
-    target_dir = tmp_path / "target"
-    dotfiles_dir.mkdir()
-    target_dir.mkdir()
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> dict[str, Path]:
+    """Create dotfiles and target (agent home) directory structure (in memory)."""
+    use_memory_fs(monkeypatch)
+    dotfiles_dir = mkdir(tmp_path / "dotfiles")
+    target_dir = mkdir(tmp_path / "target")
     return {"dotfiles": dotfiles_dir, "target": target_dir}
 
 
@@ -48,28 +50,26 @@ def _make_agent(target_dir: Path) -> AgentTarget:
 def _write_shared_fragment(dotfiles_dir: Path, data: dict) -> Path:
     """Write the shared settings fragment under <dotfiles>/.claude/."""
     path = dotfiles_dir / ".claude" / "settings.shared.json"
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data))
+    write_text(path, json.dumps(data))
     return path
 
 
 def _write_hook_fragment(dotfiles_dir: Path, data: dict) -> Path:
     """Write the hook settings fragment under <dotfiles>/.claude/."""
     path = dotfiles_dir / ".claude" / "settings.hooks.json"
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data))
+    write_text(path, json.dumps(data))
     return path
 
 
 def _write_target(target_dir: Path, data: dict) -> Path:
     """Write the agent's settings.json target."""
     path = target_dir / "settings.json"
-    path.write_text(json.dumps(data, indent=2))
+    write_text(path, json.dumps(data, indent=2))
     return path
 
 
 def _read_target(target_dir: Path) -> dict:
-    return json.loads((target_dir / "settings.json").read_text())
+    return json.loads(read_text(target_dir / "settings.json"))
 
 
 def test_env_replaced_wholesale(workspace: dict[str, Path]) -> None:
@@ -163,9 +163,9 @@ def test_idempotent(workspace: dict[str, Path]) -> None:
 
     # when
     first = _merge_settings_fragment(workspace["dotfiles"], agent)
-    after_first = (workspace["target"] / "settings.json").read_text()
+    after_first = read_text(workspace["target"] / "settings.json")
     second = _merge_settings_fragment(workspace["dotfiles"], agent)
-    after_second = (workspace["target"] / "settings.json").read_text()
+    after_second = read_text(workspace["target"] / "settings.json")
 
     # then
     assert first is True
@@ -178,7 +178,7 @@ def test_dry_run_detects_without_writing(workspace: dict[str, Path]) -> None:
     # given
     _write_shared_fragment(workspace["dotfiles"], {"env": {"A": "1"}})
     _write_target(workspace["target"], {"env": {"OLD": "x"}})
-    before = (workspace["target"] / "settings.json").read_text()
+    before = read_text(workspace["target"] / "settings.json")
     agent = _make_agent(workspace["target"])
 
     # when
@@ -186,14 +186,14 @@ def test_dry_run_detects_without_writing(workspace: dict[str, Path]) -> None:
 
     # then
     assert changed is True
-    assert (workspace["target"] / "settings.json").read_text() == before
+    assert read_text(workspace["target"] / "settings.json") == before
 
 
 def test_missing_fragment_is_noop(workspace: dict[str, Path]) -> None:
     """No fragment file => no change, target untouched."""
     # given
     _write_target(workspace["target"], {"env": {"A": "1"}})
-    before = (workspace["target"] / "settings.json").read_text()
+    before = read_text(workspace["target"] / "settings.json")
     agent = _make_agent(workspace["target"])
 
     # when
@@ -201,7 +201,7 @@ def test_missing_fragment_is_noop(workspace: dict[str, Path]) -> None:
 
     # then
     assert changed is False
-    assert (workspace["target"] / "settings.json").read_text() == before
+    assert read_text(workspace["target"] / "settings.json") == before
 
 
 def test_creates_target_when_absent(workspace: dict[str, Path]) -> None:
@@ -212,7 +212,7 @@ def test_creates_target_when_absent(workspace: dict[str, Path]) -> None:
         {"env": {"A": "1"}, "settings": {"promptSuggestionEnabled": False}},
     )
     agent = _make_agent(workspace["target"])
-    assert not (workspace["target"] / "settings.json").exists()
+    assert not exists(workspace["target"] / "settings.json")
 
     # when
     changed = _merge_settings_fragment(workspace["dotfiles"], agent)
@@ -272,23 +272,21 @@ def test_integration_hooks_then_settings(workspace: dict[str, Path]) -> None:
 def _write_os_fragment(dotfiles_dir: Path, os_name: str, data: dict) -> Path:
     """Write an OS overlay fragment under <dotfiles>/.claude/."""
     path = dotfiles_dir / ".claude" / f"settings.shared.{os_name}.json"
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data))
+    write_text(path, json.dumps(data))
     return path
 
 
 def _write_profile_fragment(dotfiles_dir: Path, key: str, data: dict) -> Path:
     """Write a per-profile fragment under <dotfiles>/.claude/settings.profiles/."""
     path = dotfiles_dir / ".claude" / "settings.profiles" / f"{key}.json"
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data))
+    write_text(path, json.dumps(data))
     return path
 
 
 def _write_machine_local(target_dir: Path, data: dict) -> Path:
     """Write the machine-local layer in the agent home (untracked, user-owned)."""
     path = target_dir / "settings.sync-local.json"
-    path.write_text(json.dumps(data))
+    write_text(path, json.dumps(data))
     return path
 
 
@@ -332,8 +330,7 @@ def test_profile_fragment_selected_by_agent_key(workspace: dict[str, Path]) -> N
     )
     keyed = AgentTarget(directory=workspace["target"], name="Test", key="work-c")
 
-    unkeyed_dir = workspace["target"].parent / "target2"
-    unkeyed_dir.mkdir()
+    unkeyed_dir = mkdir(workspace["target"].parent / "target2")
     unkeyed = AgentTarget(directory=unkeyed_dir, name="Test2")
 
     # when
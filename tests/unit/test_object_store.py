@@ -0,0 +1,183 @@
+"""Unit tests for the content-addressed object store (--link-mode store).
+
+Every unique file content is stored once under OBJECT_STORE_DIR and linked
+into each agent home; orphans_mode garbage-collects objects no home links to.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _apply_import,
+    _gc_object_store,
+    _ImportAction,
+    _ImportPlan,
+    _store_object,
+    orphans_mode,
+    sync_mode,
+)
+
+
+@pytest.fixture()
+def store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    root = tmp_path / "objects"
+    monkeypatch.setattr(sync_agents, "OBJECT_STORE_DIR", root)
+    return root
+
+
+@pytest.fixture()
+def dotfiles(tmp_path: Path) -> Path:
+    root = tmp_path / "dotfiles"
+    (root / "commands").mkdir(parents=True)
+    (root / "commands" / "a.md").write_text("# same\n")
+    (root / "commands" / "b.md").write_text("# same\n")
+    (root / "commands" / "c.md").write_text("# other\n")
+    (root / "ROOT_AGENTS.md").write_text("# base\n")
+    return root
+
+
+def _homes(root: Path, count: int) -> list[AgentTarget]:
+    return [
+        AgentTarget(directory=root / f"home-{i}", name=f"H{i}", key=f"h{i}")
+        for i in range(count)
+    ]
+
+
+def _objects(store: Path) -> list[Path]:
+    return sorted(p for p in store.glob("*/*") if p.is_file())
+
+
+def test_homes_share_one_object_per_unique_content(
+    store: Path, dotfiles: Path, tmp_path: Path
+) -> None:
+    # given: three homes, three command files with two distinct contents
+    homes = _homes(tmp_path, 3)
+
+    # when
+    sync_mode(dotfiles, auto_yes=True, agents=homes, link_mode="store")
+
+    # then: two objects, each linked from every home (+ the store entry)
+    objects = _objects(store)
+    assert len(objects) == 2
+    same = (homes[0].directory / "commands" / "a.md").stat()
+    assert same.st_nlink == 1 + 3 * 2  # a.md and b.md in each of 3 homes
+    for home in homes:
+        for name in ("a.md", "b.md"):
+            assert (home.directory / "commands" / name).stat().st_ino == same.st_ino
+    assert (dotfiles / "commands" / "a.md").stat().st_nlink == 1
+
+
+def test_objects_are_named_by_content(store: Path, tmp_path: Path) -> None:
+    script = tmp_path / "hook.sh"
+    script.write_text("echo hi\n")
+    plain = tmp_path / "hook.txt"
+    plain.write_text("echo hi\n")
+    script.chmod(0o755)
+
+    exec_obj = _store_object(script, store)
+    plain_obj = _store_object(plain, store)
+
+    assert exec_obj.name == plain_obj.name + ".x"
+    assert exec_obj.parent.name == plain_obj.name[:2]
+    assert os.access(exec_obj, os.X_OK)
+    assert _store_object(plain, store) == plain_obj
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="objects stay writable")
+def test_objects_are_read_only(store: Path, dotfiles: Path, tmp_path: Path) -> None:
+    """A home's linked file shares the object's inode: no write bit anywhere."""
+    homes = _homes(tmp_path, 2)
+
+    sync_mode(dotfiles, auto_yes=True, agents=homes, link_mode="store")
+
+    for obj in _objects(store):
+        assert obj.stat().st_mode & 0o222 == 0
+    linked = homes[0].directory / "commands" / "a.md"
+    assert linked.stat().st_mode & 0o222 == 0
+    assert (dotfiles / "commands" / "a.md").stat().st_mode & 0o200
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="objects stay writable")
+def test_import_of_a_linked_file_is_writable(
+    store: Path, dotfiles: Path, tmp_path: Path
+) -> None:
+    # given: a store-linked command that dotfiles no longer has
+    home = _homes(tmp_path, 1)[0]
+    sync_mode(dotfiles, auto_yes=True, agents=[home], link_mode="store")
+    linked = home.directory / "commands" / "c.md"
+    (dotfiles / "commands" / "c.md").unlink()
+    action = _ImportAction(
+        source_path=linked,
+        resolved_path=linked,
+        dotfiles_dest=dotfiles / "commands" / "c.md",
+        relative_path="commands/c.md",
+        is_directory=False,
+        is_symlink=False,
+        status="import",
+    )
+
+    # when
+    _apply_import(_ImportPlan(agent=home, items=[action]), "store")
+
+    # then: dotfiles gets an editable file; the object stays sealed
+    assert action.dotfiles_dest.read_text() == "# other\n"
+    assert action.dotfiles_dest.stat().st_mode & 0o200
+    assert linked.stat().st_mode & 0o222 == 0
+
+
+def test_stored_content_is_linked_from_the_digest_index(
+    store: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: content already in the store, and a digest index that knows it
+    source = tmp_path / "a.md"
+    source.write_text("# same\n")
+    obj = _store_object(source, store)
+    index = sync_agents._DigestIndex(root=tmp_path)
+    sync_agents._file_digest(source, index)
+    hashed: list[Path] = []
+    real_hash = sync_agents._hash_file
+    monkeypatch.setattr(
+        sync_agents,
+        "_hash_file",
+        lambda p, fs=None: hashed.append(p) or real_hash(p, fs),
+    )
+
+    # when: the index is trusted (written well after the file's mtime)
+    index.written_ns = source.stat().st_mtime_ns + 10 * 10**9
+    found = _store_object(source, store, index)
+
+    # then: the object is found without reading source
+    assert found == obj
+    assert hashed == []
+
+
+def test_orphans_mode_collects_unreferenced_objects(
+    store: Path,
+    dotfiles: Path,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given: a store-linked deploy, then c.md is deleted from dotfiles
+    homes = _homes(tmp_path, 2)
+    sync_mode(dotfiles, auto_yes=True, agents=homes, link_mode="store")
+    (dotfiles / "commands" / "c.md").unlink()
+    sync_mode(dotfiles, auto_yes=True, agents=homes, link_mode="store")
+    assert len(_objects(store)) == 2
+
+    # when
+    orphans_mode(dotfiles, agents=homes)
+
+    # then: only the still-linked object survives
+    assert len(_objects(store)) == 1
+    assert "removed 1 unreferenced object(s)" in capsys.readouterr().out
+
+
+def test_gc_on_missing_store_is_a_no_op(tmp_path: Path) -> None:
+    assert _gc_object_store(tmp_path / "nope") == (0, 0)
@@ -0,0 +1,132 @@
+"""Unit tests for --jobs (parallel per-agent planning and apply) in sync_agents.
+
+Agent homes are disjoint, so planning and applying them on a thread pool must
+produce exactly the same trees and the same printed plan (agent order) as the
+sequential path. With jobs > 1 every confirmation is asked up front, before
+any agent is written.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import AgentTarget, _map_agents, preview_mode, sync_mode  # noqa: E402
+
+
+def _make_dotfiles(root: Path) -> Path:
+    dotfiles = root / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    (dotfiles / "ROOT_CLAUDE.md").write_text("@AGENTS.md\n")
+    for i in range(5):
+        (dotfiles / "commands" / f"cmd-{i}.md").write_text(f"# {i}\n")
+    return dotfiles
+
+
+def _make_agents(root: Path, count: int) -> list[AgentTarget]:
+    return [
+        AgentTarget(
+            directory=root / f"home-{i}",
+            name=f"Home-{i}",
+            key=f"home-{i}",
+            main_file="CLAUDE.md",
+            overlay_main=True,
+            base_secondary="AGENTS.md",
+        )
+        for i in range(count)
+    ]
+
+
+def _tree(root: Path) -> dict[str, str]:
+    return {
+        p.relative_to(root).as_posix(): p.read_text()
+        for p in sorted(root.rglob("*"))
+        if p.is_file() and not p.name.startswith(".")
+    }
+
+
+def test_map_agents_preserves_order() -> None:
+    agents = [AgentTarget(directory=Path(f"/h{i}"), name=f"h{i}") for i in range(8)]
+
+    names = _map_agents(lambda a: a.name, agents, jobs=4)
+
+    assert names == [a.name for a in agents]
+
+
+def test_parallel_sync_matches_sequential(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    # given: identical sources synced sequentially and in parallel
+    seq_root, par_root = tmp_path / "seq", tmp_path / "par"
+    seq_dotfiles = _make_dotfiles(seq_root)
+    par_dotfiles = _make_dotfiles(par_root)
+    seq_agents = _make_agents(seq_root, 4)
+    par_agents = _make_agents(par_root, 4)
+
+    # when
+    sync_mode(seq_dotfiles, auto_yes=True, agents=seq_agents)
+    seq_out = capsys.readouterr().out
+    sync_mode(par_dotfiles, auto_yes=True, agents=par_agents, jobs=4)
+    par_out = capsys.readouterr().out
+
+    # then: same trees, same (path-normalized) output in agent order
+    for seq_agent, par_agent in zip(seq_agents, par_agents):
+        assert _tree(seq_agent.directory) == _tree(par_agent.directory)
+    assert seq_out.replace(str(seq_root), "<root>") == par_out.replace(
+        str(par_root), "<root>"
+    )
+    assert [line for line in par_out.splitlines() if "Processing" in line] == [
+        f"📋 Processing Home-{i}..." for i in range(4)
+    ]
+
+
+def test_parallel_preview_matches_sequential(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    dotfiles = _make_dotfiles(tmp_path)
+    agents = _make_agents(tmp_path, 3)
+
+    preview_mode(dotfiles, agents=agents)
+    seq_out = capsys.readouterr().out
+    preview_mode(dotfiles, agents=agents, jobs=3)
+
+    assert capsys.readouterr().out == seq_out
+
+
+def test_parallel_confirmations_are_asked_before_apply(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """All prompts are answered up front; a declined overwrite is skipped."""
+    # given: both homes already synced, then one command changes in dotfiles
+    dotfiles = _make_dotfiles(tmp_path)
+    agents = _make_agents(tmp_path, 2)
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+    (dotfiles / "commands" / "cmd-0.md").write_text("# edited\n")
+
+    asked: list[str] = []
+    written_before_last_prompt: list[bool] = []
+
+    def _answer(prompt: str) -> bool:
+        asked.append(prompt)
+        written_before_last_prompt.append(
+            any(
+                (a.directory / "commands" / "cmd-0.md").read_text() == "# edited\n"
+                for a in agents
+            )
+        )
+        return len(asked) == 1  # accept the first agent only
+
+    monkeypatch.setattr(sync_agents, "_confirm", _answer)
+
+    # when
+    sync_mode(dotfiles, agents=agents, jobs=2)
+
+    # then: one prompt per agent, none after a write; only agent 0 updated
+    assert asked == ["  Overwrite commands/cmd-0.md?"] * 2
+    assert written_before_last_prompt == [False, False]
+    assert (agents[0].directory / "commands/cmd-0.md").read_text() == "# edited\n"
+    assert (agents[1].directory / "commands/cmd-0.md").read_text() == "# 0\n"
@@ -0,0 +1,267 @@
+"""Unit tests for serializable sync plans (--plan-out / --apply-plan).
+
+A preview can write its actionable part as JSON (paths relative to dotfiles
+and agent homes, source digests, target pre-states); applying it later skips
+planning and refuses any action whose source or target moved since.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from _memfs import read_text, use_memory_fs, write_text
+from _symlinks import requires_symlinks
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _apply_sync_action,
+    _SyncAction,
+    apply_plan_mode,
+    preview_mode,
+)
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, AgentTarget]:
+    """Dotfiles with one stale, one new and one orphaned item in the home."""
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "commands" / "edited.md").write_text("# v2\n")
+    (dotfiles / "commands" / "added.md").write_text("# added\n")
+    (dotfiles / "skills" / "demo").mkdir(parents=True)
+    (dotfiles / "skills" / "demo" / "SKILL.md").write_text("# demo\n")
+    (dotfiles / "ROOT_AGENTS.md").write_text("see docs/agents/x.md\n")
+    home = tmp_path / "home"
+    (home / "commands").mkdir(parents=True)
+    (home / "commands" / "edited.md").write_text("# v1\n")
+    (home / "commands" / "stray.md").write_text("# stray\n")
+    agent = AgentTarget(directory=home, name="Home", key="home", main_file="AGENTS.md")
+    return dotfiles, agent
+
+
+def _plan(world: tuple[Path, AgentTarget], tmp_path: Path) -> Path:
+    dotfiles, agent = world
+    plan_path = tmp_path / "plan.json"
+    preview_mode(dotfiles, agents=[agent], plan_out=plan_path)
+    return plan_path
+
+
+def test_plan_file_is_compact_and_relative(
+    world: tuple[Path, AgentTarget], tmp_path: Path
+) -> None:
+    plan_path = _plan(world, tmp_path)
+
+    raw = plan_path.read_text()
+    data = json.loads(raw)
+    assert "\n" not in raw.rstrip("\n")
+    assert str(tmp_path) not in raw
+    (entry,) = data["agents"]
+    assert {i["rel"]: i["status"] for i in entry["items"]} == {
+        "AGENTS.md": "new",
+        "commands/added.md": "new",
+        "commands/edited.md": "changed",
+        "skills/demo": "new",
+    }
+    assert [d["rel"] for d in entry["deletions"]] == ["commands/stray.md"]
+    edited = next(i for i in entry["items"] if i["rel"] == "commands/edited.md")
+    assert edited["pre"]["kind"] == "f"
+
+
+def test_apply_plan_matches_sync_without_planning(
+    world: tuple[Path, AgentTarget],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # given: a reviewed plan
+    dotfiles, agent = world
+    plan_path = _plan(world, tmp_path)
+
+    def _no_planning(*args: object, **kwargs: object) -> None:
+        raise AssertionError("apply-plan must not rescan or re-plan")
+
+    monkeypatch.setattr(sync_agents, "_scan_source", _no_planning)
+    monkeypatch.setattr(sync_agents, "_plan_agent", _no_planning)
+
+    # when
+    apply_plan_mode(dotfiles, plan_path, agents=[agent])
+
+    # then
+    home = agent.directory
+    assert (home / "commands" / "edited.md").read_text() == "# v2\n"
+    assert (home / "commands" / "added.md").read_text() == "# added\n"
+    assert (home / "skills" / "demo" / "SKILL.md").is_file()
+    assert not (home / "commands" / "stray.md").exists()
+    assert str(home) in (home / "AGENTS.md").read_text()
+
+
+def test_stale_actions_are_refused_and_the_rest_applied(
+    world: tuple[Path, AgentTarget],
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given: after review, the target of one action and the source of
+    # another change, and the orphan gains content
+    dotfiles, agent = world
+    plan_path = _plan(world, tmp_path)
+    home = agent.directory
+    (home / "commands" / "edited.md").write_text("# hand edit\n")
+    (dotfiles / "commands" / "added.md").write_text("# added, revised\n")
+    (home / "commands" / "stray.md").write_text("# now important\n")
+    capsys.readouterr()
+
+    # when
+    with pytest.raises(SystemExit) as exc:
+        apply_plan_mode(dotfiles, plan_path, agents=[agent])
+
+    # then: the three stale actions are refused, the skill still lands
+    out = capsys.readouterr().out
+    assert exc.value.code == 1
+    assert "3 action(s) refused" in out
+    assert (home / "commands" / "edited.md").read_text() == "# hand edit\n"
+    assert not (home / "commands" / "added.md").exists()
+    assert (home / "commands" / "stray.md").read_text() == "# now important\n"
+    assert (home / "skills" / "demo" / "SKILL.md").is_file()
+
+
+def test_plan_applies_on_another_machine_with_same_content(
+    world: tuple[Path, AgentTarget], tmp_path: Path
+) -> None:
+    """Different inodes/mtimes but equal content still match the pre-state."""
+    dotfiles, agent = world
+    plan_path = _plan(world, tmp_path)
+    edited = agent.directory / "commands" / "edited.md"
+    edited.unlink()
+    edited.write_text("# v1\n")  # same bytes, new inode and mtime
+
+    apply_plan_mode(dotfiles, plan_path, agents=[agent])
+
+    assert edited.read_text() == "# v2\n"
+
+
+def test_unsupported_plan_version_exits_2(tmp_path: Path) -> None:
+    plan_path = tmp_path / "plan.json"
+    plan_path.write_text('{"version": 99}')
+
+    with pytest.raises(SystemExit) as exc:
+        apply_plan_mode(tmp_path, plan_path, agents=[])
+
+    assert exc.value.code == 2
+
+
+@requires_symlinks
+def test_plan_paths_outside_the_home_are_refused(
+    world: tuple[Path, AgentTarget],
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given: a plan edited to write above the home, through a symlinked
+    # directory that leaves it, and to delete by absolute path
+    dotfiles, agent = world
+    plan_path = _plan(world, tmp_path)
+    home = agent.directory
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "victim.md").write_text("# keep\n")
+    (home / "escape").symlink_to(outside, target_is_directory=True)
+    data = json.loads(plan_path.read_text())
+    (entry,) = data["agents"]
+    items = {i["rel"]: i for i in entry["items"]}
+    items["commands/added.md"]["dst"] = "../added.md"
+    items["commands/edited.md"]["dst"] = "escape/edited.md"
+    (deletion,) = entry["deletions"]
+    deletion["dst"] = str(outside / "victim.md")
+    plan_path.write_text(json.dumps(data))
+    capsys.readouterr()
+
+    # when
+    with pytest.raises(SystemExit) as exc:
+        apply_plan_mode(dotfiles, plan_path, agents=[agent])
+
+    # then: the three tampered actions are refused, nothing outside changes
+    out = capsys.readouterr().out
+    assert exc.value.code == 1
+    assert "3 action(s) refused" in out
+    assert "path outside the home" in out
+    assert not (tmp_path / "added.md").exists()
+    assert sorted(p.name for p in outside.iterdir()) == ["victim.md"]
+    assert (outside / "victim.md").read_text() == "# keep\n"
+    assert (home / "skills" / "demo" / "SKILL.md").is_file()
+
+
+def test_main_applies_the_plan_to_the_selected_targets_only(
+    world: tuple[Path, AgentTarget],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given: a plan for "home", and a run that selects another target
+    dotfiles, agent = world
+    plan_path = _plan(world, tmp_path)
+    other = AgentTarget(
+        directory=tmp_path / "other", name="Other", key="other", main_file="AGENTS.md"
+    )
+    argv = ["sync_agents.py", "--apply-plan", str(plan_path), "-d", str(dotfiles)]
+    monkeypatch.setattr(sys, "argv", argv)
+    monkeypatch.setattr(sync_agents, "_select_agents", lambda keys: [other])
+    capsys.readouterr()
+
+    # when
+    with pytest.raises(SystemExit) as exc:
+        sync_agents.main()
+
+    # then: every action is refused and the home is untouched
+    assert exc.value.code == 1
+    assert "(home): Refused (target not selected)" in capsys.readouterr().out
+    assert (agent.directory / "commands" / "edited.md").read_text() == "# v1\n"
+
+    # when: the plan's target is selected
+    monkeypatch.setattr(sync_agents, "_select_agents", lambda keys: [agent])
+    sync_agents.main()
+
+    # then
+    assert (agent.directory / "commands" / "edited.md").read_text() == "# v2\n"
+
+
+def test_main_refuses_apply_plan_with_another_mode(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    argv = ["sync_agents.py", "--apply-plan", str(tmp_path / "plan.json"), "--preview"]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    with pytest.raises(SystemExit) as exc:
+        sync_agents.main()
+
+    assert exc.value.code == 2
+    assert "--apply-plan cannot be combined with --preview" in capsys.readouterr().out
+
+
+def test_unplanned_render_reads_the_source_through_the_backend(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: a rendered action from a plan file (no rendered bytes), whose
+    # source only exists in the in-memory backend
+    use_memory_fs(monkeypatch)
+    home = tmp_path / "home"
+    agent = AgentTarget(directory=home, name="Home", key="home", main_file="AGENTS.md")
+    source = write_text(
+        tmp_path / "dotfiles" / "ROOT_AGENTS.md", "see docs/agents/x.md\n"
+    )
+    action = _SyncAction(
+        source=source,
+        target=home / "AGENTS.md",
+        relative_path="AGENTS.md",
+        is_directory=False,
+        status="new",
+        render=True,
+    )
+
+    # when
+    _apply_sync_action(action, agent)
+
+    # then
+    assert read_text(home / "AGENTS.md") == f"see {home}/docs/agents/x.md\n"
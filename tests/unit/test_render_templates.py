@@ -0,0 +1,132 @@
+"""Unit tests for template-compiled rendering in sync_agents.
+
+Base, overlay and spokes are compiled once per source content into a
+_Template, rendered once per (source digest, agent home), compared against
+targets by digest, and the planned bytes are what the apply writes.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _encode_rendered,
+    _render_for_agent,
+    sync_mode,
+)
+
+# Far enough in the past that no entry is inside the racy window.
+OLD_NS = 1_600_000_000_000_000_000
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, list[AgentTarget]]:
+    dotfiles = tmp_path / "dotfiles"
+    dotfiles.mkdir()
+    (dotfiles / "ROOT_AGENTS.md").write_text("base: docs/agents/a.md\n")
+    (dotfiles / "ROOT_CLAUDE.md").write_text("overlay\n")
+    (dotfiles / "ROOT_AGENTS_docs_agents_a.md").write_text("see docs/agents/b.md\n")
+    agents = [
+        AgentTarget(
+            directory=tmp_path / f"home-{i}",
+            name=f"H{i}",
+            key=f"h{i}",
+            main_file="CLAUDE.md",
+            overlay_main=True,
+            base_secondary="AGENTS.md",
+        )
+        for i in range(3)
+    ]
+    return dotfiles, agents
+
+
+@pytest.fixture()
+def compiled(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record the text of every template compilation."""
+    calls: list[str] = []
+    real = sync_agents._Template.compile.__func__
+    monkeypatch.setattr(
+        sync_agents._Template,
+        "compile",
+        classmethod(lambda cls, text: calls.append(text) or real(cls, text)),
+    )
+    return calls
+
+
+def test_template_render_matches_replace() -> None:
+    agent = AgentTarget(directory=Path("/h"), name="H")
+    text = "docs/agents/x.md and docs/agents/ and none\ndocs/agents/"
+
+    assert _render_for_agent(text, agent) == text.replace(
+        "docs/agents/", "/h/docs/agents/"
+    )
+
+
+def test_each_source_is_compiled_once_per_run(
+    world: tuple[Path, list[AgentTarget]], compiled: list[str]
+) -> None:
+    dotfiles, agents = world
+
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+
+    # three rendered sources x three homes, planned and applied: 3 compiles
+    assert sorted(compiled) == sorted(
+        [
+            "base: docs/agents/a.md\n",
+            "overlay\n",
+            "see docs/agents/b.md\n",
+        ]
+    )
+    for agent in agents:
+        spoke = agent.directory / "docs" / "agents" / "a.md"
+        assert spoke.read_text() == f"see {agent.directory}/docs/agents/b.md\n"
+
+
+def test_synced_targets_are_compared_by_digest(
+    world: tuple[Path, list[AgentTarget]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: a completed sync whose files are all outside the racy window
+    dotfiles, agents = world
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+    for path in dotfiles.parent.rglob("*.md"):
+        os.utime(path, ns=(OLD_NS, OLD_NS))
+    sync_mode(dotfiles, auto_yes=True, agents=agents, force_scan=True)
+    hashed: list[Path] = []
+    real = sync_agents._hash_file
+    monkeypatch.setattr(
+        sync_agents, "_hash_file", lambda p, fs=None: hashed.append(p) or real(p, fs)
+    )
+
+    # when: replanning everything
+    sync_mode(dotfiles, auto_yes=True, agents=agents, force_scan=True)
+
+    # then: every rendered target is synced from the digest caches
+    assert hashed == []
+
+
+def test_edited_target_with_same_size_is_changed(
+    world: tuple[Path, list[AgentTarget]],
+) -> None:
+    dotfiles, agents = world
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+    overlay = agents[0].directory / "CLAUDE.md"
+    overlay.write_text("OVERLAY\n")
+
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+
+    assert overlay.read_text() == "overlay\n"
+
+
+def test_rendered_bytes_use_platform_newlines(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Parity with write_text: digests match what lands on disk on Windows."""
+    monkeypatch.setattr(sync_agents.os, "linesep", "\r\n")
+
+    assert _encode_rendered("a\nb ✓\n") == "a\r\nb ✓\r\n".encode()
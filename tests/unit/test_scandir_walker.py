@@ -0,0 +1,140 @@
+"""Unit tests for the os.scandir walker layer in sync_agents.
+
+Target directories are listed once with _list_dir; child types come from the
+cached DirEntry data, so orphan detection, deletion planning, import planning
+and learned-skill linking no longer stat every child.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _build_deletion_plan,
+    _detect_target_only_items,
+    _link_learned_skills,
+    _list_dir,
+    _scan_source,
+    _SyncManifest,
+)
+
+ENTRIES = 50
+
+
+@pytest.fixture()
+def syscalls(monkeypatch: pytest.MonkeyPatch) -> dict[str, int]:
+    """Count stat/lstat/listdir/scandir calls (pathlib looks them up on os)."""
+    counts = dict.fromkeys(("stat", "lstat", "listdir", "scandir"), 0)
+    for name in counts:
+        real = getattr(os, name)
+
+        def counted(*args, _name=name, _real=real, **kwargs):
+            counts[_name] += 1
+            return _real(*args, **kwargs)
+
+        monkeypatch.setattr(os, name, counted)
+    return counts
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, AgentTarget]:
+    """Empty dotfiles source and a home with many target-only commands."""
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    home = tmp_path / "home"
+    commands = home / "commands"
+    commands.mkdir(parents=True)
+    for i in range(ENTRIES):
+        (commands / f"cmd-{i:03d}.md").write_text("x\n")
+    (commands / "sub").mkdir()
+    (commands / "dangling.md").symlink_to(tmp_path / "missing.md")
+    agent = AgentTarget(directory=home, name="Home", key="home")
+    return dotfiles, agent
+
+
+def test_list_dir_reports_types(world: tuple[Path, AgentTarget]) -> None:
+    _, agent = world
+
+    children = {c.name: c for c in _list_dir(agent.directory / "commands")}
+
+    assert list(children) == sorted(children)
+    assert children["sub"].is_dir and not children["sub"].is_symlink
+    dangling = children["dangling.md"]
+    assert dangling.is_symlink and not dangling.exists and not dangling.is_dir
+    assert children["cmd-000.md"].exists and not children["cmd-000.md"].is_dir
+    assert _list_dir(agent.directory / "missing") is None
+    assert _list_dir(agent.directory / "commands" / "cmd-000.md") is None
+
+
+def test_target_only_detection_is_one_listing(
+    world: tuple[Path, AgentTarget], syscalls: dict[str, int]
+) -> None:
+    dotfiles, agent = world
+    snapshot = _scan_source(dotfiles)
+
+    def detect() -> tuple[int, dict[str, int]]:
+        for name in syscalls:
+            syscalls[name] = 0
+        found = _detect_target_only_items(dotfiles, agent, _SyncManifest(), snapshot)
+        assert [o.is_directory for o in found if o.target.name == "sub"] == [True]
+        return len(found), dict(syscalls)
+
+    found, before = detect()
+    for i in range(ENTRIES, 2 * ENTRIES):
+        (agent.directory / "commands" / f"cmd-{i:03d}.md").write_text("x\n")
+    grown, after = detect()
+
+    assert (found, grown) == (ENTRIES + 2, 2 * ENTRIES + 2)
+    # one scandir per synced dir; only the symlink is resolved, so doubling
+    # the regular entries costs no extra syscalls
+    assert before["listdir"] == 0
+    assert after == before
+
+
+def test_deletion_plan_is_one_listing(
+    world: tuple[Path, AgentTarget], syscalls: dict[str, int]
+) -> None:
+    dotfiles, agent = world
+    snapshot = _scan_source(dotfiles)
+    names = [f"cmd-{i:03d}.md" for i in range(ENTRIES)] + ["gone.md", "dangling.md"]
+    manifest = _SyncManifest(items={"commands": names})
+    for name in syscalls:
+        syscalls[name] = 0
+
+    deletions = _build_deletion_plan(dotfiles, agent, manifest, snapshot)
+
+    # a dangling symlink is still deleted; a missing item is not planned
+    assert len(deletions) == ENTRIES + 1
+    assert syscalls["scandir"] == 1
+    assert syscalls["stat"] + syscalls["lstat"] < 5
+
+
+def test_link_learned_skills_stats_only_skill_md(
+    tmp_path: Path, syscalls: dict[str, int]
+) -> None:
+    # given: learned skills, one workspace, one already linked, one shadowed
+    skills = tmp_path / "skills"
+    learned = skills / "learned"
+    for i in range(ENTRIES):
+        (learned / f"s-{i:03d}").mkdir(parents=True)
+        (learned / f"s-{i:03d}" / "SKILL.md").write_text("# s\n")
+    (learned / "s-000-workspace").mkdir()
+    (skills / "s-001").symlink_to(Path("learned") / "s-001")
+    (skills / "s-002").mkdir()
+    for name in syscalls:
+        syscalls[name] = 0
+
+    # when
+    _link_learned_skills(skills)
+
+    # then: two listings, one SKILL.md check per candidate, no other stats
+    assert syscalls["scandir"] == 2
+    assert syscalls["stat"] + syscalls["lstat"] <= ENTRIES - 2 + 2
+    assert (skills / "s-049").readlink() == Path("learned") / "s-049"
+    assert not (skills / "s-002").is_symlink()
+    assert not (skills / "s-000-workspace").exists()
@@ -0,0 +1,119 @@
+"""Unit tests for the secret scanner ROOT_AGENTS_hooks_block-secrets.py.
+
+block-secrets.sh is a thin wrapper around it (its hook verdicts are pinned in
+test_block_secrets_hook). Here: the streaming matcher (chunk boundaries,
+overlapping prefixes, bounded reads), the optional entropy filter and the
+repo-wide `--scan` command.
+
+Token fixtures are assembled by concatenation (see test_block_secrets_hook).
+"""
+
+import importlib.util
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCANNER_PATH = (
+    Path(__file__).resolve().parents[2] / "ROOT_AGENTS_hooks_block-secrets.py"
+)
+_spec = importlib.util.spec_from_file_location("block_secrets", SCANNER_PATH)
+assert _spec is not None and _spec.loader is not None
+scanner = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(scanner)
+
+AWS_KEY = "AKIA" + "Q7RZ2M4XKD9LTB3W"
+SLACK = "xoxb-" + "1234567890-abcDEF123456"
+
+
+class _CountingReader(io.BytesIO):
+    """BytesIO that records the largest single read."""
+
+    largest = 0
+
+    def read(self, size: int | None = -1) -> bytes:
+        data = super().read(size)
+        self.largest = max(self.largest, len(data))
+        return data
+
+
+@pytest.mark.parametrize("cut", [1, 7, 13, 19])
+def test_token_split_across_reads_is_found_once(cut: int) -> None:
+    # given: the key straddles a chunk boundary at every possible split
+    chunk = 64
+    body = "x" * (chunk - cut) + AWS_KEY + "\n" + "y" * 200 + "\n"
+
+    found = list(scanner.scan_stream(io.BytesIO(body.encode()), chunk_size=chunk))
+
+    assert [(f.offset, f.line, f.prefix) for f in found] == [(chunk - cut, 1, "AKIA")]
+    assert found[0].redacted == "AKIAQ7RZ..."
+
+
+def test_reads_stay_bounded_and_lines_are_counted() -> None:
+    filler = ("lorem ipsum dolor sit amet\n" * 40_000).encode()  # ~1 MB
+    stream = _CountingReader(filler + f"token = {SLACK}\n".encode() + filler)
+
+    found = list(scanner.scan_stream(stream, chunk_size=4096))
+
+    assert [(f.line, f.prefix) for f in found] == [(40_001, "xox")]
+    assert stream.largest == 4096
+
+
+def test_overlapping_prefixes_are_each_tried() -> None:
+    # "xox" at offset 0 is not a token; the one at offset 2 is
+    assert scanner.find_secret("xo" + SLACK).offset == 2
+
+
+def test_entropy_filter_drops_placeholders_only() -> None:
+    placeholder = "ghp_" + "a" * 36
+    real = "ghp_" + "Zq81vKd0Lw2RbN7sYe4TfXc9GuPj3HmAoWi5"
+    pem = "-----BEGIN RSA " + "PRIVATE KEY-----"
+
+    assert scanner.find_secret(placeholder) is not None  # default: grep parity
+    assert scanner.find_secret(placeholder, min_entropy=3.0) is None
+    assert scanner.find_secret(real, min_entropy=3.0) is not None
+    assert scanner.find_secret(pem, min_entropy=3.0) is not None
+
+
+def test_hook_entropy_opt_in_via_env() -> None:
+    payload = json.dumps({"tool_input": {"content": "AKIA" + "A" * 16}})
+
+    def run(**env: str) -> int:
+        return subprocess.run(
+            [sys.executable, str(SCANNER_PATH)],
+            input=payload,
+            text=True,
+            capture_output=True,
+            env={"PATH": "", **env},
+            check=False,
+        ).returncode
+
+    assert run() == scanner.EXIT_BLOCK
+    assert run(AGENT_SECRETS_MIN_ENTROPY="2.5") == scanner.EXIT_ALLOW
+
+
+def test_scan_reports_tracked_files_and_skips_binaries(tmp_path: Path) -> None:
+    # given: a git repo with one secret, one clean file, one binary, one ignored
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "clean.md").write_text("nothing to see\n")
+    (tmp_path / "app.py").write_text(f"# config\nKEY = '{AWS_KEY}'\n")
+    (tmp_path / "blob.bin").write_bytes(b"\0" + AWS_KEY.encode())
+    (tmp_path / ".gitignore").write_text("local.env\n")
+    (tmp_path / "local.env").write_text(f"KEY={AWS_KEY}\n")
+    subprocess.run(["git", "-C", str(tmp_path), "add", "."], check=True)
+
+    result = subprocess.run(
+        [sys.executable, str(SCANNER_PATH), "--scan", "--jobs", "2"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == scanner.EXIT_FOUND
+    assert result.stdout == "app.py:2: AKIA secret (AKIAQ7RZ...)\n"
+    assert AWS_KEY not in result.stdout + result.stderr
@@ -0,0 +1,145 @@
+"""Unit tests for the single-transaction settings.json merge in sync_agents.
+
+The hook fragment and the shared/OS settings layers are parsed once per run;
+each claude-family home's settings.json is then parsed once, both merges are
+applied in memory, and the file is written at most once, atomically.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import AgentTarget, _merge_agent_settings, sync_mode  # noqa: E402
+
+HOOKS = {
+    "hooks": {
+        "PreToolUse": [
+            {
+                "matcher": "Bash",
+                "hooks": [
+                    {
+                        "type": "command",
+                        "command": 'bash "$CLAUDE_PROJECT_DIR/.claude/hooks/guard.sh"',
+                    }
+                ],
+            }
+        ]
+    }
+}
+
+
+@pytest.fixture()
+def dotfiles(tmp_path: Path) -> Path:
+    root = tmp_path / "dotfiles"
+    (root / ".claude").mkdir(parents=True)
+    (root / ".claude" / "settings.hooks.json").write_text(json.dumps(HOOKS))
+    (root / ".claude" / "settings.shared.json").write_text(
+        json.dumps({"env": {"A": "1"}, "settings": {"theme": "dark"}})
+    )
+    (root / "ROOT_AGENTS.md").write_text("# base\n")
+    (root / "ROOT_CLAUDE.md").write_text("# overlay\n")
+    return root
+
+
+def _claude_home(path: Path, key: str) -> AgentTarget:
+    return AgentTarget(
+        directory=path,
+        name=key,
+        key=key,
+        main_file="CLAUDE.md",
+        overlay_main=True,
+        base_secondary="AGENTS.md",
+        receives_hooks=True,
+    )
+
+
+def test_both_merges_write_settings_once(
+    dotfiles: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: an existing settings.json with a user key and a restrictive mode
+    agent = _claude_home(tmp_path / "home", "home")
+    agent.directory.mkdir()
+    settings = agent.directory / "settings.json"
+    settings.write_text(json.dumps({"model": "opus"}))
+    settings.chmod(0o600)
+    replaced: list[tuple[str, str]] = []
+    real_replace = os.replace
+    monkeypatch.setattr(
+        sync_agents.os,
+        "replace",
+        lambda src, dst: (
+            replaced.append((str(src), str(dst))) or real_replace(src, dst)
+        ),
+    )
+
+    # when
+    changed = _merge_agent_settings(dotfiles, agent)
+
+    # then: one atomic write carrying both merges; mode kept, no temp left
+    assert changed == (True, True)
+    assert [dst for _, dst in replaced] == [str(settings)]
+    data = json.loads(settings.read_text())
+    assert data["model"] == "opus"
+    assert data["env"] == {"A": "1"} and data["theme"] == "dark"
+    assert data["hooks"]["PreToolUse"][0]["matcher"] == "Bash"
+    assert settings.stat().st_mode & 0o777 == 0o600
+    assert sorted(p.name for p in agent.directory.iterdir()) == ["settings.json"]
+
+    # and: an unchanged world is a no-op
+    replaced.clear()
+    assert _merge_agent_settings(dotfiles, agent) == (False, False)
+    assert replaced == []
+
+
+def test_symlinked_settings_is_written_through(dotfiles: Path, tmp_path: Path) -> None:
+    agent = _claude_home(tmp_path / "home", "home")
+    agent.directory.mkdir()
+    real = tmp_path / "real-settings.json"
+    real.write_text("{}")
+    (agent.directory / "settings.json").symlink_to(real)
+
+    _merge_agent_settings(dotfiles, agent)
+
+    assert (agent.directory / "settings.json").is_symlink()
+    assert json.loads(real.read_text())["env"] == {"A": "1"}
+
+
+def test_json_value_semantics_detect_type_changes(
+    dotfiles: Path, tmp_path: Path
+) -> None:
+    """true -> 1 is a change even though Python compares them equal."""
+    (dotfiles / ".claude" / "settings.shared.json").write_text(
+        json.dumps({"settings": {"flag": 1}})
+    )
+    agent = _claude_home(tmp_path / "home", "home")
+    agent.directory.mkdir()
+    (agent.directory / "settings.json").write_text(json.dumps({"flag": True}))
+
+    assert _merge_agent_settings(dotfiles, agent, hooks=False) == (False, True)
+    assert json.loads((agent.directory / "settings.json").read_text())["flag"] == 1
+
+
+def test_sync_parses_dotfiles_settings_once_per_run(
+    dotfiles: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    homes = [_claude_home(tmp_path / f"home-{i}", f"h{i}") for i in range(3)]
+    loads: list[Path] = []
+    real = sync_agents._load_settings_sources
+    monkeypatch.setattr(
+        sync_agents,
+        "_load_settings_sources",
+        lambda d, system=None: loads.append(d) or real(d, system),
+    )
+
+    sync_mode(dotfiles, auto_yes=True, agents=homes)
+
+    assert loads == [dotfiles]
+    for home in homes:
+        data = json.loads((home.directory / "settings.json").read_text())
+        assert data["env"] == {"A": "1"} and "PreToolUse" in data["hooks"]
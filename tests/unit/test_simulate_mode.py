@@ -0,0 +1,152 @@
+"""Unit tests for the in-memory apply backend and --simulate in sync_agents.
+
+_apply_plan routes every mutation through an apply backend: _DiskFS writes
+to disk, _MemoryFS records the file-level outcome in memory. simulate_mode
+runs the real apply against _MemoryFS, so its projection must match what a
+sync then does, while leaving the disk untouched.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _MemoryFS,
+    simulate_mode,
+    sync_mode,
+)
+
+
+def _tree(root: Path) -> dict[str, bytes]:
+    """File contents under root, minus the digest cache (not an apply write)."""
+    return {
+        str(p.relative_to(root)): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file() and p.name != ".sync-digests.json"
+    }
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, AgentTarget]:
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / ".claude").mkdir(parents=True)
+    (dotfiles / ".claude" / "settings.shared.json").write_text(
+        json.dumps({"env": {"A": "1"}})
+    )
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    (dotfiles / "ROOT_CLAUDE.md").write_text("# overlay\n")
+    skill = dotfiles / "skills" / "learned" / "foo"
+    skill.mkdir(parents=True)
+    (skill / "SKILL.md").write_text("# foo\n")
+    (skill / "ref.md").write_text("ref\n")
+    agent = AgentTarget(
+        directory=tmp_path / "home",
+        name="Home",
+        key="home",
+        main_file="CLAUDE.md",
+        overlay_main=True,
+        base_secondary="AGENTS.md",
+        receives_hooks=True,
+    )
+    return dotfiles, agent
+
+
+def test_simulate_writes_nothing(world: tuple[Path, AgentTarget]) -> None:
+    dotfiles, agent = world
+    before = _tree(dotfiles.parent)
+
+    projected = simulate_mode(dotfiles, agents=[agent])
+
+    assert _tree(dotfiles.parent) == before
+    assert not agent.directory.exists()
+    changes = {
+        str(c.path.relative_to(agent.directory)): c.change for c in projected["home"]
+    }
+    assert changes == {
+        "AGENTS.md": "create",
+        "CLAUDE.md": "create",
+        "settings.json": "create",
+        "skills/learned/foo/SKILL.md": "create",
+        "skills/learned/foo/ref.md": "create",
+    }
+
+
+def test_projection_matches_the_sync_it_predicts(
+    world: tuple[Path, AgentTarget],
+) -> None:
+    # given: a synced home, then one skill file edited and one removed
+    dotfiles, agent = world
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+    skill = dotfiles / "skills" / "learned" / "foo"
+    (skill / "SKILL.md").write_text("# foo v2\n")
+    (skill / "ref.md").unlink()
+    before = _tree(agent.directory)
+
+    # when
+    projected = simulate_mode(dotfiles, agents=[agent])
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+
+    # then: the projection is exactly the file-level diff of the real apply
+    after = _tree(agent.directory)
+    actual = {
+        name: ("create" if name not in before else "update")
+        for name in after
+        if before.get(name) != after[name]
+    }
+    actual.update({name: "delete" for name in before if name not in after})
+    assert (
+        {str(c.path.relative_to(agent.directory)): c.change for c in projected["home"]}
+        == actual
+        == {
+            "skills/learned/foo/SKILL.md": "update",
+            "skills/learned/foo/ref.md": "delete",
+        }
+    )
+
+
+def test_same_stat_edit_is_applied_and_projected(
+    world: tuple[Path, AgentTarget],
+) -> None:
+    """Plan, apply and --simulate agree on a same-size, same-mtime edit."""
+    # given: a skill file rewritten with the target's size and mtime (plus
+    # a visible edit next to it, so the run fingerprint forces a replan)
+    dotfiles, agent = world
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+    skill = dotfiles / "skills" / "learned" / "foo"
+    target = agent.directory / "skills" / "learned" / "foo" / "SKILL.md"
+    (skill / "SKILL.md").write_text("# FOO\n")
+    st = target.stat()
+    os.utime(skill / "SKILL.md", ns=(st.st_atime_ns, st.st_mtime_ns))
+    (skill / "ref.md").write_text("ref v2\n")
+
+    # when
+    projected = simulate_mode(dotfiles, agents=[agent])
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+
+    # then
+    assert [
+        (str(c.path.relative_to(agent.directory)), c.change) for c in projected["home"]
+    ] == [
+        ("skills/learned/foo/SKILL.md", "update"),
+        ("skills/learned/foo/ref.md", "update"),
+    ]
+    assert target.read_text() == "# FOO\n"
+
+
+def test_memory_fs_keeps_projected_bytes(tmp_path: Path) -> None:
+    fs = _MemoryFS()
+    target = tmp_path / "home" / "settings.json"
+
+    fs.write_settings(target, {"env": {"A": "1"}})
+    fs.remove(target)
+    fs.write_bytes(target, b"{}\n")
+
+    assert fs.changes[target].change == "create" and fs.changes[target].size == 3
+    assert fs.data == {target: b"{}\n"}
+    assert not target.parent.exists()
@@ -0,0 +1,112 @@
+"""Unit tests for the shared source snapshot in sync_agents.
+
+`_scan_source` walks the dotfiles sync sources once per invocation and every
+planning function (forward plan, deletion plan, target-only detection,
+import plan) consumes the resulting `_SourceSnapshot` instead of re-walking
+the source and re-parsing the skills denylist per agent.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+from _symlinks import requires_symlinks
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _DigestIndex,
+    _scan_source,
+    _tree_digest,
+    sync_mode,
+)
+
+
+@pytest.fixture()
+def dotfiles(tmp_path: Path) -> Path:
+    """A dotfiles dir with a base file, commands and two skills."""
+    root = tmp_path / "dotfiles"
+    (root / "commands").mkdir(parents=True)
+    (root / "commands" / "strict.md").write_text("# strict\n")
+    (root / "ROOT_AGENTS.md").write_text("# base\n")
+    (root / "ROOT_AGENTS_docs_agents_testing.md").write_text("# testing\n")
+    for name in ("alpha", "beta"):
+        (root / "skills" / name).mkdir(parents=True)
+        (root / "skills" / name / "SKILL.md").write_text(f"# {name}\n")
+    (root / "skills" / "docs").mkdir()
+    (root / "skills" / "docs" / "README.md").write_text("not a skill\n")
+    return root
+
+
+def test_snapshot_applies_skills_gate_and_denylist(dotfiles: Path) -> None:
+    exclude = dotfiles / "dump" / "harness" / "skills-sync-exclude.toml"
+    exclude.parent.mkdir(parents=True)
+    exclude.write_text('exclude = ["beta"]\n')
+
+    snapshot = _scan_source(dotfiles)
+
+    assert [i.relative_path for i in snapshot.items["skills"]] == ["skills/alpha"]
+    assert snapshot.names["skills"] == {"alpha", "beta", "docs"}
+    assert [i.relative_path for i in snapshot.root_items] == ["docs/agents/testing.md"]
+
+
+@requires_symlinks
+def test_snapshot_names_keep_symlinks_but_items_skip_them(dotfiles: Path) -> None:
+    (dotfiles / "commands" / "linked.md").symlink_to(dotfiles / "commands/strict.md")
+
+    snapshot = _scan_source(dotfiles)
+
+    assert "linked.md" in snapshot.names["commands"]
+    assert [i.relative_path for i in snapshot.items["commands"]] == [
+        "commands/strict.md"
+    ]
+
+
+def test_snapshot_digest_matches_tree_walk(dotfiles: Path) -> None:
+    (dotfiles / "skills" / "learned" / "mine").mkdir(parents=True)
+    (dotfiles / "skills" / "learned" / "mine" / "SKILL.md").write_text("# mine\n")
+    snapshot = _scan_source(dotfiles)
+    learned = next(
+        i for i in snapshot.items["skills"] if i.relative_path == "skills/learned"
+    )
+
+    expected = _tree_digest(learned.source, _DigestIndex(root=dotfiles))
+
+    assert snapshot.digest(learned) == expected
+
+
+def test_sync_scans_source_and_denylist_once(
+    dotfiles: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """One scan and one TOML parse per run, however many agents."""
+    # given: four homes, nothing to import
+    agents = [
+        AgentTarget(directory=tmp_path / f"home-{i}", name=f"H{i}", key=f"h{i}")
+        for i in range(4)
+    ]
+    scans: list[Path] = []
+    parses: list[Path] = []
+    real_scan = sync_agents._scan_source
+    real_parse = sync_agents._load_skills_sync_exclude
+    monkeypatch.setattr(
+        sync_agents,
+        "_scan_source",
+        lambda d, *a, **k: scans.append(d) or real_scan(d, *a, **k),
+    )
+    monkeypatch.setattr(
+        sync_agents,
+        "_load_skills_sync_exclude",
+        lambda d: parses.append(d) or real_parse(d),
+    )
+
+    # when
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+
+    # then
+    assert scans == [dotfiles]
+    assert parses == [dotfiles]
+    for agent in agents:
+        assert (agent.directory / "commands" / "strict.md").is_file()
@@ -0,0 +1,214 @@
+"""Unit tests for the staged, atomically swapped apply in sync_agents.
+
+Each changed item is built at a dot-prefixed sibling temp path and renamed
+into place (directories swapped with renameat2 RENAME_EXCHANGE where
+available), and an agent's writes are flushed once at the end of its apply.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _flush_writes,
+    _sync_directory,
+    _sync_file,
+    sync_mode,
+)
+
+
+@pytest.fixture()
+def skill(tmp_path: Path) -> tuple[Path, Path]:
+    """A skill synced once, then edited in the source."""
+    source = tmp_path / "src" / "skill"
+    (source / "refs").mkdir(parents=True)
+    (source / "SKILL.md").write_text("# v1\n")
+    for i in range(5):
+        (source / "refs" / f"ref-{i}.md").write_text(f"ref {i}\n")
+    target = tmp_path / "dst" / "skill"
+    _sync_directory(source, target)
+    (source / "SKILL.md").write_text("# v2, longer\n")
+    return source, target
+
+
+@pytest.mark.parametrize("exchange", [True, False])
+def test_directory_is_swapped_in_whole(
+    skill: tuple[Path, Path], monkeypatch: pytest.MonkeyPatch, exchange: bool
+) -> None:
+    # given: a copy that checks the live tree while the new one is staged
+    source, target = skill
+    if not exchange:
+        monkeypatch.setattr(sync_agents, "_rename_exchange", lambda a, b: False)
+    live_during_copy: list[str] = []
+    real_copy = sync_agents._copy_file
+
+    def copy(src: Path, dst: Path, link_mode: str = "copy", index=None) -> None:
+        live_during_copy.append((target / "SKILL.md").read_text())
+        real_copy(src, dst, link_mode, index)
+
+    monkeypatch.setattr(sync_agents, "_copy_file", copy)
+
+    # when
+    _sync_directory(source, target)
+
+    # then: the live item was untouched until the swap; no temp dir remains
+    assert live_during_copy == ["# v1\n"]
+    assert (target / "SKILL.md").read_text() == "# v2, longer\n"
+    assert (target / "refs" / "ref-4.md").read_text() == "ref 4\n"
+    assert sorted(p.name for p in target.parent.iterdir()) == ["skill"]
+
+
+def test_failed_copy_leaves_live_item_intact(
+    skill: tuple[Path, Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source, target = skill
+
+    def fail(src: Path, dst: Path, link_mode: str = "copy", index=None) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(sync_agents, "_copy_file", fail)
+
+    with pytest.raises(OSError, match="disk full"):
+        _sync_directory(source, target)
+
+    assert (target / "SKILL.md").read_text() == "# v1\n"
+    assert sorted(p.name for p in target.parent.iterdir()) == ["skill"]
+
+
+@pytest.mark.parametrize("exchange", [True, False])
+def test_file_target_stays_until_the_stage_is_built(
+    skill: tuple[Path, Path], monkeypatch: pytest.MonkeyPatch, exchange: bool
+) -> None:
+    # given: a file where the directory item goes, and a copy that fails
+    source, _ = skill
+    target = source.parent.parent / "dst" / "other"
+    target.write_text("a file\n")
+    if not exchange:
+        monkeypatch.setattr(sync_agents, "_rename_exchange", lambda a, b: False)
+    real_copy = sync_agents._copy_file
+
+    def fail(src: Path, dst: Path, link_mode: str = "copy", index=None) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(sync_agents, "_copy_file", fail)
+
+    # when / then: the file is still there
+    with pytest.raises(OSError, match="disk full"):
+        _sync_directory(source, target)
+    assert target.read_text() == "a file\n"
+
+    # when: the copy works again
+    monkeypatch.setattr(sync_agents, "_copy_file", real_copy)
+    _sync_directory(source, target)
+
+    # then: the directory replaced the file; no temp path remains
+    assert (target / "SKILL.md").read_text() == "# v2, longer\n"
+    assert sorted(p.name for p in target.parent.iterdir()) == ["other", "skill"]
+
+
+def test_failed_swap_puts_excluded_children_back(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: a live learned/ dir holding a skill-creator workspace
+    source = tmp_path / "src" / "learned"
+    source.mkdir(parents=True)
+    (source / "SKILL.md").write_text("# v1\n")
+    target = tmp_path / "dst" / "learned"
+    _sync_directory(source, target)
+    (target / "foo-workspace").mkdir()
+    (target / "foo-workspace" / "notes.md").write_text("draft\n")
+    (source / "SKILL.md").write_text("# v2\n")
+
+    def fail(stage: Path, target: Path) -> None:
+        raise OSError("swap failed")
+
+    monkeypatch.setattr(sync_agents, "_swap_in", fail)
+
+    # when
+    with pytest.raises(OSError, match="swap failed"):
+        _sync_directory(source, target)
+
+    # then: the live tree, workspace included, is as it was
+    assert (target / "SKILL.md").read_text() == "# v1\n"
+    assert (target / "foo-workspace" / "notes.md").read_text() == "draft\n"
+    assert sorted(p.name for p in target.parent.iterdir()) == ["learned"]
+
+
+def test_file_is_replaced_not_rewritten(tmp_path: Path) -> None:
+    """A reader holding the old file (or a hardlink to it) keeps the old bytes."""
+    source = tmp_path / "new.md"
+    source.write_text("new\n")
+    target = tmp_path / "home" / "cmd.md"
+    target.parent.mkdir()
+    target.write_text("old\n")
+    other = tmp_path / "other.md"
+    os.link(target, other)
+
+    _sync_file(source, target)
+
+    assert target.read_text() == "new\n"
+    assert other.read_text() == "old\n"
+    assert sorted(p.name for p in target.parent.iterdir()) == ["cmd.md"]
+
+
+class _CountingLibc:
+    def __init__(self, real: object) -> None:
+        self.real = real
+        self.syncfs_calls = 0
+
+    def syncfs(self, fd: int) -> int:
+        self.syncfs_calls += 1
+        return self.real.syncfs(fd)
+
+
+def test_agent_apply_flushes_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: twenty commands to write into one home
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    for i in range(20):
+        (dotfiles / "commands" / f"c-{i}.md").write_text(f"{i}\n")
+    agent = AgentTarget(
+        directory=tmp_path / "home", name="Home", key="home", main_file="AGENTS.md"
+    )
+    real = sync_agents._load_libc()
+    if real is None or not hasattr(real, "syncfs"):
+        pytest.skip("syncfs(2) unavailable")
+    libc = _CountingLibc(real)
+    monkeypatch.setattr(sync_agents, "_load_libc", lambda: libc)
+    fsyncs: list[int] = []
+    monkeypatch.setattr(sync_agents.os, "fsync", fsyncs.append)
+
+    # when
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+
+    # then: 21 files written, one blocking flush for the whole agent
+    assert len(list((agent.directory / "commands").iterdir())) == 20
+    assert libc.syncfs_calls == 1
+    assert fsyncs == []
+
+
+def test_flush_falls_back_to_fsync_per_file_and_dir(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    paths = []
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        for i in range(3):
+            (tmp_path / name / f"{i}.md").write_text("x\n")
+            paths.append(tmp_path / name / f"{i}.md")
+    monkeypatch.setattr(sync_agents, "_load_libc", lambda: None)
+    fsyncs: list[int] = []
+    monkeypatch.setattr(sync_agents.os, "fsync", fsyncs.append)
+
+    _flush_writes(paths)
+
+    assert len(fsyncs) == 6 + 2
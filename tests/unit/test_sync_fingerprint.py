@@ -0,0 +1,133 @@
+"""Unit tests for the whole-state fingerprint fast path in sync_agents.
+
+A complete sync records one digest over the source snapshot, the settings
+fragment layers and every target's post-sync stat state in the manifest; the
+next run returns before any planning while that digest still matches.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import MANIFEST_FILE, AgentTarget, sync_mode  # noqa: E402
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, list[AgentTarget]]:
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "commands" / "strict.md").write_text("# strict\n")
+    (dotfiles / "skills" / "demo").mkdir(parents=True)
+    (dotfiles / "skills" / "demo" / "SKILL.md").write_text("# demo\n")
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    agents = [
+        AgentTarget(directory=tmp_path / f"home-{i}", name=f"H{i}", key=f"h{i}")
+        for i in range(2)
+    ]
+    return dotfiles, agents
+
+
+@pytest.fixture()
+def planned(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record every per-agent planning call."""
+    calls: list[str] = []
+    real = sync_agents._plan_agent
+    monkeypatch.setattr(
+        sync_agents,
+        "_plan_agent",
+        lambda dotfiles_dir, agent, *a, **k: (
+            calls.append(agent.key) or real(dotfiles_dir, agent, *a, **k)
+        ),
+    )
+    return calls
+
+
+def _fingerprint(dotfiles: Path) -> str:
+    data = json.loads((dotfiles / MANIFEST_FILE).read_text())
+    return data.get("fingerprint", "")
+
+
+def test_unchanged_world_skips_planning(
+    world: tuple[Path, list[AgentTarget]],
+    planned: list[str],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    dotfiles, agents = world
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+    planned.clear()
+    capsys.readouterr()
+
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+
+    assert planned == []
+    assert "fingerprint unchanged" in capsys.readouterr().out
+
+
+def test_force_scan_bypasses_fingerprint(
+    world: tuple[Path, list[AgentTarget]], planned: list[str]
+) -> None:
+    dotfiles, agents = world
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+    planned.clear()
+
+    sync_mode(dotfiles, auto_yes=True, agents=agents, force_scan=True)
+
+    assert planned == ["h0", "h1"]
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        pytest.param(
+            lambda d, h: (d / "commands" / "strict.md").write_text("# v2\n"),
+            id="source-edit",
+        ),
+        pytest.param(
+            lambda d, h: (h / "skills" / "demo" / "SKILL.md").write_text("# x\n"),
+            id="target-nested-edit",
+        ),
+        pytest.param(
+            lambda d, h: (h / "commands" / "strict.md").unlink(),
+            id="target-delete",
+        ),
+        pytest.param(
+            lambda d, h: (
+                (d / ".claude").mkdir()
+                or (d / ".claude" / "settings.shared.json").write_text("{}")
+            ),
+            id="fragment-added",
+        ),
+    ],
+)
+def test_any_relevant_change_replans(
+    world: tuple[Path, list[AgentTarget]], planned: list[str], change
+) -> None:
+    dotfiles, agents = world
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+    before = _fingerprint(dotfiles)
+    planned.clear()
+
+    change(dotfiles, agents[0].directory)
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+
+    assert planned == ["h0", "h1"]
+    assert _fingerprint(dotfiles) not in ("", before)
+
+
+def test_declined_changes_are_not_fingerprinted(
+    world: tuple[Path, list[AgentTarget]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A skipped overwrite must be offered again on the next run."""
+    dotfiles, agents = world
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+    (dotfiles / "commands" / "strict.md").write_text("# v2\n")
+    monkeypatch.setattr(sync_agents, "_confirm", lambda prompt: False)
+
+    sync_mode(dotfiles, agents=agents)
+
+    assert _fingerprint(dotfiles) == ""
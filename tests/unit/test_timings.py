@@ -0,0 +1,186 @@
+"""Unit tests for --timings / --timings-jsonl / --timings-otlp in sync_agents.
+
+Each sync phase becomes a span (wall time + files stat'ed, bytes read, bytes
+written) under one root span; spans are summarized as a table, appended as
+JSONL, or posted to an OTLP/HTTP collector without ever failing the run.
+"""
+
+import json
+import sys
+import urllib.error
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import AgentTarget, sync_mode  # noqa: E402
+
+
+@pytest.fixture()
+def timings(monkeypatch: pytest.MonkeyPatch) -> sync_agents._Timings:
+    recorder = sync_agents._Timings()
+    monkeypatch.setattr(sync_agents, "_TIMINGS", recorder)
+    return recorder
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, list[AgentTarget]]:
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "commands" / "strict.md").write_text("# strict\n" * 100)
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    (dotfiles / "ROOT_AGENTS_hooks_guard.sh").write_text("exit 0\n")
+    agents = [
+        AgentTarget(directory=tmp_path / f"home-{i}", name=f"H{i}", key=f"h{i}")
+        for i in range(2)
+    ]
+    return dotfiles, agents
+
+
+def _by_name(recorder: sync_agents._Timings) -> dict[str, list[sync_agents._Span]]:
+    spans: dict[str, list[sync_agents._Span]] = {}
+    for span in recorder.spans:
+        spans.setdefault(span.name, []).append(span)
+    return spans
+
+
+def test_disabled_timings_record_nothing() -> None:
+    assert sync_agents._TIMINGS is None
+    with sync_agents._phase("plan", agent="x"):
+        sync_agents._count(stat=1)
+
+
+def test_threads_without_a_phase_update_root_under_the_lock(
+    timings: sync_agents._Timings,
+) -> None:
+    """Pool workers with no open phase all count into the shared root span."""
+    unlocked: list[str] = []
+
+    class _Counters(dict):
+        def __setitem__(self, key: str, value: int) -> None:
+            if not timings._lock.locked():
+                unlocked.append(key)
+            super().__setitem__(key, value)
+
+    timings.root.counters = _Counters(timings.root.counters)
+    worker = threading.Thread(target=lambda: sync_agents._count(stat=1, read=2))
+    worker.start()
+    worker.join()
+
+    assert unlocked == []
+    assert timings.root.counters["stat"] == 1
+    assert timings.root.counters["read"] == 2
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_sync_records_phases_and_counters(
+    world: tuple[Path, list[AgentTarget]], timings: sync_agents._Timings, jobs: int
+) -> None:
+    dotfiles, agents = world
+
+    sync_mode(dotfiles, auto_yes=True, agents=agents, jobs=jobs)
+    timings.finish()
+
+    spans = _by_name(timings)
+    assert {"source scan", "plan", "apply", "learned links"} <= spans.keys()
+    assert sorted(s.attrs["agent"] for s in spans["plan"]) == ["h0", "h1"]
+    assert all(s.parent_id == timings.root.span_id for s in spans["plan"])
+    assert spans["source scan"][0].counters["stat"] >= 2
+    # the 900-byte command is copied into both homes
+    assert sum(s.counters["written"] for s in spans["apply"]) >= 2 * 900
+    assert timings.root.counters["written"] >= 2 * 900
+    assert all(s.end_ns >= s.start_ns for s in timings.spans)
+
+
+def test_summary_table_and_jsonl(
+    world: tuple[Path, list[AgentTarget]],
+    timings: sync_agents._Timings,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    dotfiles, agents = world
+    sync_mode(dotfiles, auto_yes=True, agents=agents)
+    timings.finish()
+    capsys.readouterr()
+
+    sync_agents._print_timings(timings)
+    jsonl = tmp_path / "spans.jsonl"
+    sync_agents._write_timings_jsonl(timings, jsonl)
+
+    table = capsys.readouterr().out
+    assert "⏱️  Timings" in table
+    assert "source scan" in table and "total" in table
+    records = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert len(records) == len(timings.spans) + 1
+    assert records[-1]["name"] == "sync-agents"
+    assert {r["trace_id"] for r in records} == {timings.trace_id}
+    assert {"stat", "read", "written", "duration_ms"} <= records[0].keys()
+
+
+def test_otlp_endpoint_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", raising=False)
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_ENDPOINT", raising=False)
+    assert sync_agents._otlp_traces_endpoint() == "http://localhost:4318/v1/traces"
+
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_ENDPOINT", "collector:4318/")
+    assert sync_agents._otlp_traces_endpoint() == "http://collector:4318/v1/traces"
+
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", "https://t/api/traces")
+    assert sync_agents._otlp_traces_endpoint() == "https://t/api/traces"
+
+
+def test_otlp_export_posts_resource_spans(
+    timings: sync_agents._Timings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    with sync_agents._phase("plan", agent="h0"):
+        sync_agents._count(stat=2, read=10)
+    timings.finish()
+    posted: list[dict] = []
+
+    class _Response:
+        def __enter__(self) -> "_Response":
+            return self
+
+        def __exit__(self, *exc: object) -> None:
+            return None
+
+    def _urlopen(request, timeout: float) -> _Response:
+        posted.append(json.loads(request.data))
+        return _Response()
+
+    monkeypatch.setattr(sync_agents.urllib.request, "urlopen", _urlopen)
+
+    sync_agents._export_timings_otlp(timings)
+
+    (payload,) = posted
+    (resource_spans,) = payload["resourceSpans"]
+    assert resource_spans["resource"]["attributes"][0]["value"] == {
+        "stringValue": "sync-agents"
+    }
+    root, plan = resource_spans["scopeSpans"][0]["spans"]
+    assert "parentSpanId" not in root
+    assert plan["parentSpanId"] == root["spanId"]
+    assert len(plan["traceId"]) == 32 and len(plan["spanId"]) == 16
+    attrs = {a["key"]: a["value"] for a in plan["attributes"]}
+    assert attrs["agent"] == {"stringValue": "h0"}
+    assert attrs["sync.stat"] == {"intValue": "2"}
+
+
+def test_otlp_export_failure_only_warns(
+    timings: sync_agents._Timings,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    timings.finish()
+
+    def _refused(request, timeout: float) -> None:
+        raise urllib.error.URLError("connection refused")
+
+    monkeypatch.setattr(sync_agents.urllib.request, "urlopen", _refused)
+
+    sync_agents._export_timings_otlp(timings)
+
+    assert "OTLP export" in capsys.readouterr().err
@@ -0,0 +1,147 @@
+"""Unit tests for sync_agents --verify.
+
+verify_mode compares every managed item of the selected agent homes with
+dotfiles on a pool of hashing workers, writes nothing, and reports drift
+(modified / missing / extra) as JSON; main exits 1 when anything drifted.
+"""
+
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import AgentTarget, sync_mode, verify_mode  # noqa: E402
+
+OLD_NS = 1_600_000_000_000_000_000
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, AgentTarget]:
+    """Dotfiles with a spoke, commands and a skill, synced once into a home."""
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base, see docs/agents/a.md\n")
+    (dotfiles / "ROOT_AGENTS_docs_agents_a.md").write_text("spoke\n")
+    for name in ("a", "b", "c"):
+        (dotfiles / "commands" / f"{name}.md").write_text(f"{name}\n")
+    (dotfiles / "skills" / "s").mkdir(parents=True)
+    (dotfiles / "skills" / "s" / "SKILL.md").write_text("# s\n")
+    agent = AgentTarget(
+        directory=tmp_path / "home", name="Home", key="home", main_file="AGENTS.md"
+    )
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+    return dotfiles, agent
+
+
+def _verify(dotfiles: Path, agent: AgentTarget, **kwargs: object) -> dict:
+    out = io.StringIO()
+    drifted = verify_mode(dotfiles, agents=[agent], out=out, **kwargs)
+    report = json.loads(out.getvalue())
+    assert drifted == sum(len(a["drift"]) for a in report["agents"])
+    return report
+
+
+def _snapshot(root: Path) -> dict[str, tuple[int, int]]:
+    return {
+        p.relative_to(root).as_posix(): (p.stat().st_mtime_ns, p.stat().st_size)
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+
+def test_synced_home_is_clean(world: tuple[Path, AgentTarget]) -> None:
+    dotfiles, agent = world
+
+    report = _verify(dotfiles, agent)
+
+    assert report["clean"] is True
+    (home,) = report["agents"]
+    assert home["key"] == "home" and home["drift"] == []
+    # AGENTS.md + spoke + three commands + skill
+    assert home["checked"] == 6
+
+
+def test_drift_is_reported_without_writing(
+    world: tuple[Path, AgentTarget], tmp_path: Path
+) -> None:
+    # given: an edited spoke, a missing and an extra command, an edited
+    # additive skill (never overwritten by sync, so not drift)
+    dotfiles, agent = world
+    home = agent.directory
+    (home / "docs" / "agents" / "a.md").write_text("edited spoke\n")
+    (home / "commands" / "b.md").unlink()
+    (home / "commands" / "stray.md").write_text("mine\n")
+    (home / "skills" / "s" / "SKILL.md").write_text("# local edit\n")
+    (dotfiles / "commands" / "c.md").unlink()
+    before = _snapshot(tmp_path)
+
+    # when
+    report = _verify(dotfiles, agent)
+
+    # then
+    drift = {d["path"]: d for d in report["agents"][0]["drift"]}
+    assert report["clean"] is False
+    assert drift["docs/agents/a.md"]["status"] == "modified"
+    assert drift["commands/b.md"]["status"] == "missing"
+    assert drift["commands/stray.md"] == {
+        "path": "commands/stray.md",
+        "status": "extra",
+        "kind": "file",
+        "reason": "orphan",
+    }
+    assert drift["commands/c.md"]["reason"] == "removed"
+    assert set(drift) == {
+        "docs/agents/a.md",
+        "commands/b.md",
+        "commands/stray.md",
+        "commands/c.md",
+    }
+    assert _snapshot(tmp_path) == before
+
+
+def test_cached_digests_are_trusted_unless_rehashing(
+    world: tuple[Path, AgentTarget], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given: a synced world outside the racy window with warm digest caches
+    dotfiles, agent = world
+    for path in dotfiles.parent.rglob("*.md"):
+        os.utime(path, ns=(OLD_NS, OLD_NS))
+    sync_mode(dotfiles, auto_yes=True, agents=[agent], force_scan=True)
+    hashed: list[Path] = []
+    real = sync_agents._hash_file
+    monkeypatch.setattr(
+        sync_agents, "_hash_file", lambda p, fs=None: hashed.append(p) or real(p, fs)
+    )
+
+    assert _verify(dotfiles, agent, jobs=4)["clean"] is True
+    assert hashed == []
+
+    assert _verify(dotfiles, agent, jobs=4, rehash=True)["clean"] is True
+    assert {p.name for p in hashed} >= {"AGENTS.md", "a.md", "b.md", "c.md"}
+
+
+def test_main_exits_nonzero_on_drift(
+    world: tuple[Path, AgentTarget],
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    dotfiles, agent = world
+    monkeypatch.setattr(sync_agents, "_select_agents", lambda keys: [agent])
+    argv = ["sync_agents.py", "--verify", "--dotfiles", str(dotfiles)]
+    monkeypatch.setattr(sys, "argv", argv)
+    sync_agents.main()  # clean: returns normally
+    assert json.loads(capsys.readouterr().out)["clean"] is True
+
+    (agent.directory / "AGENTS.md").write_text("drift\n")
+    with pytest.raises(SystemExit) as exc:
+        sync_agents.main()
+
+    assert exc.value.code == 1
+    report = json.loads(capsys.readouterr().out)
+    assert report["agents"][0]["drift"][0]["path"] == "AGENTS.md"
@@ -0,0 +1,134 @@
+"""Unit tests for sync_agents --watch.
+
+A watcher (inotify, or stat polling as the fallback) reports the dotfiles
+paths touched since the last read; _collect_changes debounces them into one
+batch and _sync_changed_items plans and applies only the touched items.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import sync_agents  # noqa: E402
+from sync_agents import (  # noqa: E402
+    AgentTarget,
+    _collect_changes,
+    _is_watched_path,
+    _load_libc,
+    _open_watcher,
+    _PollWatcher,
+    _sync_changed_items,
+    sync_mode,
+    watch_mode,
+)
+
+
+@pytest.fixture()
+def world(tmp_path: Path) -> tuple[Path, AgentTarget]:
+    """A dotfiles source with two commands, synced once into one home."""
+    dotfiles = tmp_path / "dotfiles"
+    (dotfiles / "commands").mkdir(parents=True)
+    (dotfiles / "ROOT_AGENTS.md").write_text("# base\n")
+    (dotfiles / "commands" / "a.md").write_text("a\n")
+    (dotfiles / "commands" / "b.md").write_text("b\n")
+    agent = AgentTarget(
+        directory=tmp_path / "home", name="Home", key="home", main_file="AGENTS.md"
+    )
+    sync_mode(dotfiles, auto_yes=True, agents=[agent])
+    return dotfiles, agent
+
+
+def _watchers(dotfiles: Path) -> list:
+    watchers = [_PollWatcher(dotfiles, interval=0.05)]
+    if _load_libc() is not None:
+        watchers.append(_open_watcher(dotfiles))
+    return watchers
+
+
+def test_is_watched_path() -> None:
+    assert _is_watched_path("ROOT_AGENTS_docs_agents_a.md")
+    assert _is_watched_path("ROOT_CLAUDE.md")
+    assert _is_watched_path("commands/a.md")
+    assert _is_watched_path("skills/learned/foo/SKILL.md")
+    assert _is_watched_path(".claude/settings.shared.json")
+    assert _is_watched_path(sync_agents.SKILLS_SYNC_EXCLUDE_FILE)
+    assert not _is_watched_path("README.md")
+    assert not _is_watched_path("commands/.a.md.swp")
+    assert not _is_watched_path(".claude/hooks/guard.sh")
+
+
+def test_watchers_report_touched_paths(world: tuple[Path, AgentTarget]) -> None:
+    dotfiles, _ = world
+    for watcher in _watchers(dotfiles):
+        try:
+            (dotfiles / "commands" / "a.md").write_text("a2\n")
+            (dotfiles / "commands" / "new").mkdir()
+            (dotfiles / "README.md").write_text("unrelated\n")
+
+            changed = _collect_changes(watcher, 0.1, threading.Event())
+            # files created in a fresh dir are picked up by its new watch
+            (dotfiles / "commands" / "new" / "x.md").write_text("x\n")
+            changed |= _collect_changes(watcher, 0.1, threading.Event())
+        finally:
+            watcher.close()
+            (dotfiles / "commands" / "new" / "x.md").unlink()
+            (dotfiles / "commands" / "new").rmdir()
+
+        assert {"commands/a.md", "commands/new/x.md"} <= changed, watcher.kind
+        assert "README.md" not in changed
+
+
+def test_sync_changed_items_touches_only_the_batch(
+    world: tuple[Path, AgentTarget],
+) -> None:
+    # given: one source edit, one source removal, one unrelated target edit
+    dotfiles, agent = world
+    (dotfiles / "commands" / "a.md").write_text("a2\n")
+    (dotfiles / "commands" / "b.md").unlink()
+    (agent.directory / "AGENTS.md").write_text("# drifted\n")
+    (agent.directory / "commands" / "stray.md").write_text("mine\n")
+
+    # when
+    applied = _sync_changed_items(dotfiles, [agent], {"commands/a.md", "commands/b.md"})
+
+    # then: the batch is applied; the base is always replanned; orphans stay
+    assert applied == 3
+    assert (agent.directory / "commands" / "a.md").read_text() == "a2\n"
+    assert not (agent.directory / "commands" / "b.md").exists()
+    assert (agent.directory / "AGENTS.md").read_text() == "# base\n"
+    assert (agent.directory / "commands" / "stray.md").exists()
+    assert _sync_changed_items(dotfiles, [agent], {"commands/a.md"}) == 0
+
+
+def test_watch_mode_propagates_edits(
+    world: tuple[Path, AgentTarget], capsys: pytest.CaptureFixture[str]
+) -> None:
+    dotfiles, agent = world
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch_mode,
+        args=(dotfiles, [agent]),
+        kwargs={"debounce": 0.05, "poll_interval": 0.05, "stop": stop},
+    )
+    thread.start()
+    target = agent.directory / "commands" / "a.md"
+    try:
+        deadline = time.monotonic() + 10
+        while target.read_text() != "edited\n" and time.monotonic() < deadline:
+            # rewrite until the watcher (started concurrently) has seen it
+            (dotfiles / "commands" / "a.md").write_text(f"edited {time.time()}\n")
+            time.sleep(0.1)
+            (dotfiles / "commands" / "a.md").write_text("edited\n")
+            time.sleep(0.3)
+    finally:
+        stop.set()
+        thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert target.read_text() == "edited\n"
+    assert "🔁 Changed: commands/a.md" in capsys.readouterr().out